@@ -0,0 +1,497 @@
+"""Asyncio adapter for the Todo REST API built on aiohttp."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import aiohttp
+import backoff
+
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limit import (
+    REFRESH,
+    AdaptiveConcurrencyLimiter,
+    LoadShedError,
+    request_priority,
+)
+from .json_stream import aiter_json_array
+from .observability import emit_metric, record_latency, timed_stage, traced_span
+from .rate_limit import RateLimiter
+from .replica import TodoReplica
+from .safety import SafetyPolicy
+from .singleflight import AsyncSingleFlight
+from .todo_cache import TodoCache
+from .todo_tool import (
+    _LIST_KEY,
+    _RETRY_MAX_SECONDS,
+    _STREAM_CHUNK_BYTES,
+    BulkResult,
+    TodoItem,
+    _give_up,
+    _on_backoff,
+    _retry_wait,
+    _Slot,
+    _TodoToolBase,
+)
+
+_STREAM_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=10)
+
+
+class _Reply(NamedTuple):
+    status: int
+    body: Any
+    headers: Mapping[str, str]
+    next_link: Optional[str]
+
+    @classmethod
+    def of(cls, response: aiohttp.ClientResponse, body: Any) -> "_Reply":
+        link = response.links.get("next")
+        return cls(
+            response.status,
+            body,
+            response.headers,
+            str(link["url"]) if link and "url" in link else None,
+        )
+
+
+async def _prepend(first: bytes, rest: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    if first:
+        yield first
+    async for chunk in rest:
+        yield chunk
+
+
+class AsyncTodoServiceTool(_TodoToolBase):
+    """Non-blocking counterpart of ``TodoServiceTool`` for use on an event loop."""
+
+    def __init__(
+        self,
+        base_url: str,
+        rate_limit_per_minute: int = 30,
+        cache_ttl_seconds: int = 10,
+        pool_maxsize: int = 10,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limit_wait_seconds: float = 0,
+        cache: Optional[TodoCache[TodoItem]] = None,
+        stale_while_revalidate_seconds: float = 0,
+        stale_if_error_seconds: float = 0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        bulk_max_workers: int = 4,
+        replica: Optional[TodoReplica] = None,
+        replica_sync_seconds: float = 30,
+        safety_policy: Optional[SafetyPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            rate_limit_per_minute=rate_limit_per_minute,
+            cache_ttl_seconds=cache_ttl_seconds,
+            rate_limiter=rate_limiter,
+            rate_limit_wait_seconds=rate_limit_wait_seconds,
+            cache=cache,
+            stale_while_revalidate_seconds=stale_while_revalidate_seconds,
+            stale_if_error_seconds=stale_if_error_seconds,
+            circuit_breaker=circuit_breaker,
+            bulk_max_workers=bulk_max_workers,
+            replica=replica,
+            replica_sync_seconds=replica_sync_seconds,
+            safety_policy=safety_policy,
+            concurrency_limiter=concurrency_limiter,
+        )
+        self.pool_maxsize = pool_maxsize
+        self._session = session
+        self._inflight = AsyncSingleFlight()
+        self._background: Set["asyncio.Future[Any]"] = set()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # ClientSession binds to the running loop, so it is created on first use.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_maxsize, limit_per_host=self.pool_maxsize
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=aiohttp.ClientTimeout(total=10)
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Release pooled connections held by the underlying session."""
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self) -> "AsyncTodoServiceTool":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def _request(
+        self, method: str, path: str, *, rate_limited: bool = True, **kwargs: Any
+    ) -> "_Reply":
+        self.circuit_breaker.before_call()
+        slot = self._slot(method)
+        try:
+            with timed_stage("concurrency_limit"):
+                await slot.acquire_async()
+            if rate_limited:
+                with timed_stage("rate_limit"):
+                    await self._ensure_rate_limit_async()
+        except BaseException:
+            # Shed or rate limited: free the slot and any half-open probe.
+            slot.abandon()
+            self.circuit_breaker.abandon_call()
+            raise
+        url = f"{self.base_url}{path}"
+        self.logger.debug("tool_call_start", tool_name=method, url=url)
+        with traced_span(f"todo.{method}", url=url) as span:
+            start = time.perf_counter()
+            try:
+                with timed_stage("http"):
+                    reply = await self._execute_request(method, url, slot, **kwargs)
+            except LoadShedError:
+                self.circuit_breaker.abandon_call()  # a retry was shed
+                raise
+            except Exception as exc:
+                self._record_outcome(span, exc)
+                raise
+            except BaseException:
+                self.circuit_breaker.abandon_call()  # cancelled mid-call
+                raise
+            latency = (time.perf_counter() - start) * 1000
+            self._record_outcome(span)
+            self.logger.debug(
+                "tool_call_complete",
+                tool_name=method,
+                url=url,
+                status_code=reply.status,
+                latency_ms=latency,
+            )
+            emit_metric("todo_tool_call", 1, method=method, status=str(reply.status))
+            record_latency("todo_tool_latency_ms", latency, method=method)
+            return reply
+
+    @backoff.on_exception(
+        _retry_wait,
+        aiohttp.ClientResponseError,
+        max_time=_RETRY_MAX_SECONDS,
+        jitter=None,
+        giveup=_give_up,
+        on_backoff=_on_backoff,
+    )
+    async def _execute_request(
+        self, method: str, url: str, slot: _Slot, **kwargs: Any
+    ) -> "_Reply":
+        await slot.acquire_async()
+        try:
+            reply = await self._send(method, url, **kwargs)
+        except BaseException as exc:  # a cancellation too must return the slot
+            slot.release(exc)
+            raise
+        slot.release()
+        return reply
+
+    async def _send(
+        self, method: str, url: str, *, stream: bool = False, **kwargs: Any
+    ) -> "_Reply":
+        session = self._get_session()
+        if stream:
+            # The caller reads and releases the body; only reads are bounded so
+            # a very large list is not cut off by the total request timeout.
+            response = await session.request(
+                method.upper(), url, timeout=_STREAM_TIMEOUT, **kwargs
+            )
+            try:
+                response.raise_for_status()
+            except aiohttp.ClientResponseError:
+                response.release()  # hand the connection back to the pool
+                raise
+            return _Reply.of(response, response)
+        async with session.request(method.upper(), url, **kwargs) as response:
+            response.raise_for_status()
+            return _Reply.of(response, await response.json(content_type=None))
+
+    async def list_todos(
+        self,
+        use_cache: bool = True,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[TodoItem]:
+        params = self._list_params(status, limit, cursor)
+        if params:
+            cached = self._cached_query(params, limit) if use_cache else None
+            if cached is not None:
+                return cached
+            return [todo async for todo in self._iter_pages(params, limit, use_cache)]
+        if not use_cache:
+            return await self._inflight.do(_LIST_KEY, self._fetch_todos)
+        cached, revalidate = self._cached_todos()
+        if revalidate:
+            self._revalidate_in_background()
+        if cached is not None:
+            return cached
+        return await self._fetch_or_stale()
+
+    async def _fetch_or_stale(self) -> List[TodoItem]:
+        try:
+            return await self._inflight.do(_LIST_KEY, self._fetch_todos)
+        except Exception as exc:
+            stale = self._stale_on_error(exc)
+            if stale is None:
+                raise
+            return stale
+
+    async def iter_todos(
+        self,
+        limit: Optional[int] = None,
+        use_cache: bool = True,
+        status: Optional[str] = None,
+    ) -> AsyncIterator[TodoItem]:
+        """Async counterpart of ``TodoServiceTool.iter_todos``."""
+
+        if use_cache:
+            cached, revalidate = self._cached_todos()
+            if revalidate:
+                self._revalidate_in_background()
+            if cached is not None:
+                if status is not None:
+                    cached = [todo for todo in cached if todo["status"] == status]
+                for todo in cached[:limit]:
+                    yield todo
+                return
+        if limit is not None and limit <= 0:
+            return
+        if status is not None:
+            params = self._list_params(status, limit, None)
+            async for todo in self._iter_pages(params, limit, use_cache):
+                yield todo
+            return
+        if self._inflight.in_flight(_LIST_KEY) or self._holds_list():
+            if use_cache:
+                todos = await self._fetch_or_stale()
+            else:
+                todos = await self._inflight.do(_LIST_KEY, self._fetch_todos)
+            for todo in todos[:limit]:
+                yield todo
+            return
+        reply = await self._request("get", "/todos", stream=True)
+        response = reply.body
+        seen: List[TodoItem] = []
+        try:
+            chunks = response.content.iter_chunked(_STREAM_CHUNK_BYTES)
+            first = b""
+            async for first in chunks:
+                break
+            if first.lstrip()[:1] == b"{":
+                # A paginated envelope rather than a bare array: read it whole.
+                body = json.loads(first + await response.content.read())
+                items, next_params = self._parse_page(body, {}, reply.next_link)
+                seen.extend(items[:limit])
+                for todo in seen:
+                    yield todo
+                if next_params is not None and (limit is None or len(seen) < limit):
+                    remaining = None if limit is None else limit - len(seen)
+                    async for todo in self._iter_pages(
+                        next_params, remaining, use_cache
+                    ):
+                        yield todo
+                return
+            async for item in aiter_json_array(_prepend(first, chunks)):
+                todo = self._normalize(item)
+                seen.append(todo)
+                yield todo
+                if limit is not None and len(seen) >= limit:
+                    return
+        finally:
+            response.release()
+        self._store_todos(
+            seen, reply.headers.get("ETag"), reply.headers.get("Last-Modified")
+        )
+
+    async def _iter_pages(
+        self, params: Dict[str, str], limit: Optional[int], use_cache: bool
+    ) -> AsyncIterator[TodoItem]:
+        count = 0
+        page_params: Optional[Dict[str, str]] = params
+        while page_params is not None:
+            items, page_params = await self._fetch_page(page_params, use_cache)
+            for todo in items:
+                yield todo
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    async def _fetch_page(
+        self, params: Dict[str, str], use_cache: bool
+    ) -> Tuple[List[TodoItem], Optional[Dict[str, str]]]:
+        key = self._query_key(params)
+        if use_cache:
+            view = self._cache.view(key)
+            if view is not None:
+                return view.items, view.next_params
+        stale = self._cache.view(key, allow_stale=True)
+        headers = (
+            self._conditional_headers(stale.etag, stale.last_modified) if stale else {}
+        )
+        reply = await self._request("get", "/todos", params=params, headers=headers)
+        if reply.status == 304 and stale is not None:
+            emit_metric("todo_cache", 1, result="not_modified")
+            view = self._cache.revalidated_view(key) or stale
+            return view.items, view.next_params
+        items, next_params = self._parse_page(reply.body, params, reply.next_link)
+        self._cache.put_view(
+            key,
+            items,
+            next_params,
+            etag=reply.headers.get("ETag"),
+            last_modified=reply.headers.get("Last-Modified"),
+        )
+        return items, next_params
+
+    def _revalidate_in_background(self) -> None:
+        if self._inflight.in_flight(_LIST_KEY):
+            return
+        task = asyncio.ensure_future(self._revalidate())
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _revalidate(self) -> None:
+        try:
+            with request_priority(REFRESH):
+                await self._inflight.do(_LIST_KEY, self._fetch_todos)
+        except LoadShedError:
+            pass  # counted as todo_api_shed; the next read tries again
+        except Exception as exc:
+            self.logger.warning("list_todos_revalidate_failed", error=str(exc))
+
+    async def _fetch_todos(self) -> List[TodoItem]:
+        headers = self._conditional_headers(*self._validators())
+        reply = await self._request("get", "/todos", headers=headers)
+        if reply.status == 304:
+            todos = self._revalidated()
+            if todos is not None:
+                emit_metric("todo_cache", 1, result="not_modified")
+                return todos
+            reply = await self._request("get", "/todos")  # evicted in the meantime
+        etag = reply.headers.get("ETag")
+        last_modified = reply.headers.get("Last-Modified")
+        todos, next_params = self._parse_page(reply.body, {}, reply.next_link)
+        while next_params is not None:
+            reply = await self._request("get", "/todos", params=next_params)
+            page, next_params = self._parse_page(
+                reply.body, next_params, reply.next_link
+            )
+            todos.extend(page)
+        self._store_todos(todos, etag, last_modified)
+        return todos
+
+    async def create_todo(
+        self, data: Dict[str, Any], rate_limited: bool = True
+    ) -> TodoItem:
+        payload = self._validate_payload(data)
+        reply = await self._request(
+            "post", "/todos", json=payload, rate_limited=rate_limited
+        )
+        return self._written(self._normalize(reply.body))
+
+    async def update_todo(self, todo_id: str, data: Dict[str, Any]) -> TodoItem:
+        return await self._put(todo_id, self._validate_payload(data))
+
+    async def _put(
+        self, todo_id: str, payload: Dict[str, Any], rate_limited: bool = True
+    ) -> TodoItem:
+        todo_id = self._sanitize(todo_id)
+        with self._optimistic(todo_id, payload):
+            reply = await self._request(
+                "put", f"/todos/{todo_id}", json=payload, rate_limited=rate_limited
+            )
+            return self._written(self._normalize(reply.body))
+
+    async def delete_todo(self, todo_id: str, rate_limited: bool = True) -> TodoItem:
+        todo_id = self._sanitize(todo_id)
+        with self._optimistic(todo_id, None):
+            reply = await self._request(
+                "delete", f"/todos/{todo_id}", rate_limited=rate_limited
+            )
+            return self._deleted(todo_id, self._normalize(reply.body))
+
+    async def bulk_create(self, items: Sequence[Dict[str, Any]]) -> BulkResult:
+        calls = {
+            str(index): partial(self.create_todo, item, rate_limited=False)
+            for index, item in enumerate(items)
+        }
+        return await self._run_bulk("create", calls)
+
+    async def bulk_update(self, updates: Mapping[str, Dict[str, Any]]) -> BulkResult:
+        """Apply per-id changes; fields left out keep their current values."""
+
+        fetched: Dict[str, TodoItem] = {}
+        if any(self._cache.get(str(todo_id)) is None for todo_id in updates):
+            # One fetch fills the missing items; see TodoServiceTool.bulk_update.
+            todos = await self.list_todos(use_cache=False)
+            fetched = {str(todo.id): todo for todo in todos}
+        calls = {
+            str(todo_id): partial(self._bulk_update_one, str(todo_id), data, fetched)
+            for todo_id, data in updates.items()
+        }
+        return await self._run_bulk("update", calls)
+
+    async def bulk_delete(self, todo_ids: Iterable[str]) -> BulkResult:
+        calls = {
+            str(todo_id): partial(self.delete_todo, str(todo_id), rate_limited=False)
+            for todo_id in todo_ids
+        }
+        return await self._run_bulk("delete", calls)
+
+    async def _bulk_update_one(
+        self, todo_id: str, data: Dict[str, Any], fetched: Mapping[str, TodoItem]
+    ) -> TodoItem:
+        payload = self._bulk_update_payload(todo_id, data, fetched)
+        return await self._put(todo_id, payload, rate_limited=False)
+
+    async def _run_bulk(
+        self,
+        operation: str,
+        calls: Mapping[str, Callable[..., Awaitable[TodoItem]]],
+    ) -> BulkResult:
+        """Run item calls concurrently (bounded), charging one token per batch."""
+
+        if not calls:
+            return BulkResult()
+        await self._ensure_rate_limit_async()
+        semaphore = asyncio.Semaphore(self.bulk_max_workers)
+
+        async def bounded(call: Callable[..., Awaitable[TodoItem]]) -> Any:
+            async with semaphore:
+                return await call()
+
+        with traced_span(f"todo.bulk_{operation}", items=len(calls)):
+            outcomes = await asyncio.gather(
+                *(bounded(call) for call in calls.values()), return_exceptions=True
+            )
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException) and not isinstance(
+                outcome, Exception
+            ):
+                raise outcome
+        return self._collect_bulk(operation, list(calls), list(outcomes))
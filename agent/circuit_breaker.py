@@ -0,0 +1,130 @@
+"""Circuit breaker guarding calls to the Todo API."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Optional
+
+from .observability import annotate_span, emit_metric, get_logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the backend while the circuit is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            f"Todo API circuit is open; retry in {retry_after:.1f} seconds."
+        )
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker with a consecutive-failure threshold.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast with ``CircuitOpenError``. Once ``reset_timeout`` seconds
+    have passed a single probe call is let through (half-open); its outcome
+    closes the circuit again or re-opens it for another cool-down.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        name: str = "todo_api",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self.logger = get_logger("circuit_breaker")
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go to the backend now."""
+
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            now = self._clock()
+            if self._state == OPEN:
+                remaining = self._opened_at + self.reset_timeout - now
+                if remaining > 0:
+                    self._fail_fast(remaining)
+                self._transition(HALF_OPEN)
+            # Half-open admits one probe; a probe that never reports back is
+            # abandoned after another cool-down so the breaker cannot wedge.
+            if (
+                self._probe_started is not None
+                and now - self._probe_started < self.reset_timeout
+            ):
+                self._fail_fast(self._probe_started + self.reset_timeout - now)
+            self._probe_started = now
+
+    def abandon_call(self) -> None:
+        """Forget a call ``before_call`` let through that never reached the backend.
+
+        Frees the half-open probe for the next call instead of holding it
+        until the probe times out.
+        """
+
+        with self._lock:
+            self._probe_started = None
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probe_started = None
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_started = None
+            if self._state == HALF_OPEN or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._opened_at = self._clock()
+                self._transition(OPEN)
+
+    def _fail_fast(self, retry_after: float) -> None:
+        emit_metric("circuit_breaker_rejected", 1, breaker=self.name)
+        annotate_span(**{"circuit.state": self._state})
+        raise CircuitOpenError(retry_after)
+
+    def _transition(self, new_state: str) -> None:
+        old_state, self._state = self._state, new_state
+        self.logger.warning(
+            "circuit_breaker_transition",
+            breaker=self.name,
+            from_state=old_state,
+            to_state=new_state,
+        )
+        emit_metric(
+            "circuit_breaker_transition",
+            1,
+            breaker=self.name,
+            from_state=old_state,
+            to_state=new_state,
+        )
+        annotate_span(
+            **{
+                "circuit.state": new_state,
+                "circuit.transition": f"{old_state}->{new_state}",
+            }
+        )
@@ -0,0 +1,331 @@
+"""Adaptive cap on concurrent calls to the Todo API, with priority load shedding."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Callable, Deque, Iterator, Optional, Tuple
+
+from .observability import annotate_span, emit_metric, get_logger, record_gauge
+
+if TYPE_CHECKING:
+    import asyncio
+
+REFRESH = "refresh"
+READ = "read"
+WRITE = "write"
+# Share of the limit each priority may fill before its calls are shed, so
+# background refreshes give way first and writes keep the last headroom.
+_SHED_AT = {REFRESH: 0.5, READ: 0.9, WRITE: 1.0}
+_RANK = {REFRESH: 0, READ: 1, WRITE: 2}
+
+_current_priority: ContextVar[Optional[str]] = ContextVar(
+    "request_priority", default=None
+)
+
+
+@contextmanager
+def request_priority(priority: str) -> Iterator[None]:
+    """Give Todo API calls made inside the block ``priority``."""
+
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_request_priority() -> Optional[str]:
+    return _current_priority.get()
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a ``Retry-After`` header (delay-seconds or an HTTP date)."""
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from datetime import timezone  # only dates need these; kept off import time
+    from email.utils import parsedate_to_datetime
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - time.time())
+
+
+class LoadShedError(RuntimeError):
+    """Raised instead of calling the backend when the call is shed."""
+
+    def __init__(self, priority: str, retry_after: float) -> None:
+        super().__init__(
+            f"Todo API is saturated; {priority} call shed, "
+            f"retry in {retry_after:.1f} seconds."
+        )
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit on in-flight calls, driven by their latency and outcome.
+
+    ``acquire`` takes a slot and ``release`` returns it with the call's
+    latency. Latencies feed two moving averages: a short one over roughly the
+    last ten calls and a long-term baseline over the last few hundred. While
+    the short one stays within ``latency_tolerance`` times the baseline and the
+    limit is actually in use, the limit grows by one per limit's worth of
+    calls. A slowdown, a failure or a 429/503 multiplies it by
+    ``backoff_ratio``, at most once per limit's worth of calls, so one burst
+    of slow replies counts once. A slowdown that lasts becomes the new
+    baseline, and the limit then grows again.
+
+    Each priority may fill only its share of the limit. Reads and writes
+    over their share wait up to ``max_wait`` seconds for a slot, and a
+    ``Retry-After`` from the server (capped at ``max_retry_after`` seconds)
+    holds every call back until it has passed. A call that cannot go out in
+    that time is shed with ``LoadShedError``. Background refreshes are shed
+    straight away.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        latency_tolerance: float = 2.0,
+        backoff_ratio: float = 0.7,
+        min_latency_ms: float = 10.0,
+        max_retry_after: float = 60.0,
+        max_wait: float = 1.0,
+        name: str = "todo_api",
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.backoff_ratio = backoff_ratio
+        self.min_latency_ms = min_latency_ms
+        self.max_retry_after = max_retry_after
+        self.max_wait = max_wait
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+        # Event-loop waiters, oldest first, each woken through its own loop.
+        self._async_waiters: Deque[
+            Tuple["asyncio.AbstractEventLoop", "asyncio.Future[None]"]
+        ] = deque()
+        self._limit = float(min(max(initial_limit, min_limit), max_limit))
+        self._in_flight = 0
+        self._waiting = {priority: 0 for priority in _RANK}
+        self._recent_ms: Optional[float] = None
+        self._baseline_ms: Optional[float] = None
+        self._since_decrease = int(self._limit)
+        self._blocked_until = 0.0
+        self.logger = get_logger("concurrency_limit")
+        record_gauge("todo_api_concurrency_limit", self.limit, limiter=name)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self, priority: str = WRITE) -> None:
+        """Take a slot, or raise ``LoadShedError`` if ``priority`` must give way."""
+
+        deadline = self._clock() + self._max_wait(priority)
+        with self._lock:
+            queued = False
+            try:
+                while True:
+                    wait = self._take_or_queue(priority, queued, deadline)
+                    if wait is None:
+                        return
+                    if queued and priority != WRITE and self._waiting[WRITE]:
+                        self._wake_next()  # a write may fit where this does not
+                    queued = True
+                    self._released.wait(wait)
+            finally:
+                if queued:
+                    self._waiting[priority] -= 1
+
+    async def acquire_async(self, priority: str = WRITE) -> None:
+        """Like ``acquire`` but yields to the event loop while waiting."""
+
+        import asyncio  # already loaded whenever this runs; kept off import time
+
+        loop = asyncio.get_running_loop()
+        deadline = self._clock() + self._max_wait(priority)
+        queued = False
+        try:
+            while True:
+                with self._lock:
+                    wait = self._take_or_queue(priority, queued, deadline)
+                    if wait is None:
+                        return
+                    if queued and priority != WRITE and self._waiting[WRITE]:
+                        self._wake_next()
+                    queued = True
+                    waiter = (loop, loop.create_future())
+                    self._async_waiters.append(waiter)
+                try:
+                    await asyncio.wait([waiter[1]], timeout=wait)
+                except BaseException:
+                    with self._lock:
+                        if waiter in self._async_waiters:
+                            self._async_waiters.remove(waiter)
+                        else:
+                            self._wake_next()  # pass on a wake-up meant for us
+                    raise
+                with self._lock:
+                    if waiter in self._async_waiters:
+                        self._async_waiters.remove(waiter)
+        finally:
+            if queued:
+                with self._lock:
+                    self._waiting[priority] -= 1
+
+    def _max_wait(self, priority: str) -> float:
+        return 0.0 if priority == REFRESH else self.max_wait
+
+    def _take_or_queue(
+        self, priority: str, queued: bool, deadline: float
+    ) -> Optional[float]:
+        """Take a slot (None), shed, or join the queue and return how long to wait.
+
+        Call under the lock. Callers already queued go before newcomers of the
+        same or lower priority, so a steady stream of new calls cannot starve
+        them.
+        """
+
+        reason, wait = self._try_take(priority, queued)
+        if reason is None:
+            if queued and self._in_flight < self._limit:
+                self._wake_next()  # room for the next one in line too
+            return None
+        remaining = deadline - self._clock()
+        if remaining <= 0 or (reason == "retry_after" and wait > remaining):
+            self._shed(priority, reason, wait)
+        if not queued:
+            self._waiting[priority] += 1
+        return min(wait, remaining)
+
+    def _try_take(self, priority: str, queued: bool) -> Tuple[Optional[str], float]:
+        blocked_for = self._blocked_until - self._clock()
+        if blocked_for > 0:
+            return "retry_after", blocked_for
+        share = max(1, int(self._limit * _SHED_AT.get(priority, 1.0)))
+        rank = _RANK.get(priority, 0)
+        ahead = not queued and any(
+            count for other, count in self._waiting.items() if _RANK[other] >= rank
+        )
+        if self._in_flight >= share or ahead:
+            return "saturated", self._retry_hint()
+        self._in_flight += 1
+        return None, 0.0
+
+    def release(
+        self,
+        latency_ms: Optional[float],
+        overloaded: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Return a slot; ``overloaded`` marks a timeout, 5xx or 429 reply.
+
+        Pass ``latency_ms=None`` for a call abandoned before it finished.
+        """
+
+        with self._lock:
+            busy = self._in_flight >= self._limit / 2
+            self._in_flight -= 1
+            self._wake_next()
+            self._since_decrease += 1
+            if retry_after is not None:
+                until = self._clock() + min(retry_after, self.max_retry_after)
+                self._blocked_until = max(self._blocked_until, until)
+            if overloaded:
+                self._decrease("overloaded")
+                return
+            if latency_ms is None:
+                return
+            recent, baseline = self._observe(latency_ms)
+            if recent > self.latency_tolerance * baseline:
+                self._decrease("latency")
+            elif busy:
+                self._set_limit(self._limit + 1 / self._limit)
+
+    def _wake_next(self) -> None:
+        """Wake the oldest waiting thread and event-loop task; call under the lock.
+
+        Whichever cannot take the slot goes back to waiting.
+        """
+
+        self._released.notify()
+        if self._async_waiters:
+            loop, future = self._async_waiters.popleft()
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:  # that loop has been closed
+                pass
+
+    def _observe(self, latency_ms: float) -> Tuple[float, float]:
+        """Update and return the short average and the baseline (floored)."""
+
+        if self._recent_ms is None or self._baseline_ms is None:
+            self._recent_ms = self._baseline_ms = latency_ms
+        else:
+            self._recent_ms += (latency_ms - self._recent_ms) * 0.1
+            self._baseline_ms += (latency_ms - self._baseline_ms) * 0.005
+            # Recover at once when the API gets faster again.
+            self._baseline_ms = min(self._baseline_ms, self._recent_ms)
+        return self._recent_ms, max(self._baseline_ms, self.min_latency_ms)
+
+    def _retry_hint(self) -> float:
+        baseline = self._baseline_ms or self.min_latency_ms
+        return max(0.1, self.latency_tolerance * baseline / 1000)
+
+    def _decrease(self, reason: str) -> None:
+        if self._since_decrease < self._limit:
+            return
+        self._since_decrease = 0
+        old_limit = self.limit
+        self._set_limit(self._limit * self.backoff_ratio)
+        emit_metric(
+            "todo_api_concurrency_decrease", 1, limiter=self.name, reason=reason
+        )
+        self.logger.info(
+            "todo_api_concurrency_decreased",
+            limiter=self.name,
+            reason=reason,
+            from_limit=old_limit,
+            to_limit=self.limit,
+        )
+
+    def _set_limit(self, limit: float) -> None:
+        old_limit = self.limit
+        self._limit = min(max(limit, float(self.min_limit)), float(self.max_limit))
+        if self.limit != old_limit:
+            record_gauge("todo_api_concurrency_limit", self.limit, limiter=self.name)
+
+    def _shed(self, priority: str, reason: str, retry_after: float) -> None:
+        emit_metric(
+            "todo_api_shed", 1, limiter=self.name, priority=priority, reason=reason
+        )
+        annotate_span(**{"concurrency.shed": reason})
+        raise LoadShedError(priority, retry_after)
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
@@ -9,6 +9,8 @@ from typing import Optional
 
 
 _VALID_URL_RE = re.compile(r"^https?://[\w\.-]+(:\d+)?(/.*)?$")
+_TRACING_EXPORTERS = ("console", "otlp", "none")
+_PROFILE_MODES = ("off", "sample", "cprofile")
 
 
 @dataclass
@@ -22,6 +24,48 @@ class Config:
     max_context_tokens: int
     rate_limit_per_minute: int
     cache_ttl_seconds: int
+    http_pool_connections: int = 10
+    http_pool_maxsize: int = 10
+    rate_limit_per_session_per_minute: int = 0
+    rate_limit_wait_seconds: int = 0
+    cache_max_items: int = 10_000
+    cache_stale_while_revalidate_seconds: int = 0
+    cache_stale_if_error_seconds: int = 0
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: int = 30
+    api_concurrency_initial: int = 20
+    api_concurrency_min: int = 1
+    api_concurrency_max: int = 200
+    api_concurrency_wait_seconds: int = 1
+    bulk_max_workers: int = 4
+    server_max_concurrency: int = 32
+    server_max_queue: int = 128
+    server_drain_seconds: int = 10
+    server_workers: int = 1
+    session_max_count: int = 10_000
+    session_idle_seconds: int = 1800
+    session_snapshot_path: Optional[str] = None
+    replica_path: Optional[str] = None
+    replica_sync_seconds: int = 30
+    write_behind_path: Optional[str] = None
+    write_behind_concurrency: int = 4
+    write_behind_retry_seconds: int = 5
+    tracing_enabled: bool = True
+    tracing_sample_percent: int = 100
+    metrics_flush_seconds: int = 60
+    tracing_exporter: str = "console"
+    otlp_traces_endpoint: Optional[str] = None
+    tracing_max_queue_size: int = 2048
+    tracing_max_export_batch_size: int = 512
+    log_queue_size: int = 10_000
+    profile_mode: str = "off"
+    profile_dir: Optional[str] = None
+    profile_dump_seconds: int = 0
+    profile_sample_interval_ms: int = 10
+    profile_every_n_calls: int = 100
+    intent_routes_path: Optional[str] = None
+    safety_policy_path: Optional[str] = None
+    safety_reload_seconds: int = 5
 
     @classmethod
     def from_env(cls) -> "Config":
@@ -68,6 +112,89 @@ class Config:
         max_context_tokens = bounded_int("MAX_CONTEXT_TOKENS", 8192)
         rate_limit_per_minute = bounded_int("RATE_LIMIT_PER_MINUTE", 30)
         cache_ttl_seconds = bounded_int("CACHE_TTL_SECONDS", 10, positive=False)
+        cache_max_items = bounded_int("CACHE_MAX_ITEMS", 10_000)
+        cache_stale_while_revalidate_seconds = bounded_int(
+            "CACHE_STALE_WHILE_REVALIDATE_SECONDS", 0, positive=False
+        )
+        cache_stale_if_error_seconds = bounded_int(
+            "CACHE_STALE_IF_ERROR_SECONDS", 0, positive=False
+        )
+        circuit_failure_threshold = bounded_int("CIRCUIT_FAILURE_THRESHOLD", 5)
+        circuit_reset_seconds = bounded_int("CIRCUIT_RESET_SECONDS", 30)
+        api_concurrency_initial = bounded_int("API_CONCURRENCY_INITIAL", 20)
+        api_concurrency_min = bounded_int("API_CONCURRENCY_MIN", 1)
+        api_concurrency_max = bounded_int("API_CONCURRENCY_MAX", 200)
+        api_concurrency_wait_seconds = bounded_int(
+            "API_CONCURRENCY_WAIT_SECONDS", 1, positive=False
+        )
+        if not api_concurrency_min <= api_concurrency_initial <= api_concurrency_max:
+            raise ValueError(
+                "API_CONCURRENCY_INITIAL must lie between API_CONCURRENCY_MIN and API_CONCURRENCY_MAX"
+            )
+        bulk_max_workers = bounded_int("BULK_MAX_WORKERS", 4)
+        server_max_concurrency = bounded_int("SERVER_MAX_CONCURRENCY", 32)
+        server_max_queue = bounded_int("SERVER_MAX_QUEUE", 128, positive=False)
+        server_drain_seconds = bounded_int("SERVER_DRAIN_SECONDS", 10, positive=False)
+        server_workers = bounded_int("SERVER_WORKERS", 1)
+        session_max_count = bounded_int("SESSION_MAX_COUNT", 10_000)
+        session_idle_seconds = bounded_int("SESSION_IDLE_SECONDS", 1800)
+        session_snapshot_path = getenv_str("SESSION_SNAPSHOT_PATH") or None
+        replica_path = getenv_str("REPLICA_PATH") or None
+        replica_sync_seconds = bounded_int("REPLICA_SYNC_SECONDS", 30, positive=False)
+        write_behind_path = getenv_str("WRITE_BEHIND_PATH") or None
+        write_behind_concurrency = bounded_int("WRITE_BEHIND_CONCURRENCY", 4)
+        write_behind_retry_seconds = bounded_int("WRITE_BEHIND_RETRY_SECONDS", 5)
+        tracing_enabled = (getenv_str("TRACING_ENABLED", "true") or "true").lower()
+        if tracing_enabled not in ("true", "false", "1", "0"):
+            raise ValueError("TRACING_ENABLED must be true or false")
+        tracing_sample_percent = bounded_int(
+            "TRACING_SAMPLE_PERCENT", 100, positive=False
+        )
+        if tracing_sample_percent > 100:
+            raise ValueError("TRACING_SAMPLE_PERCENT must be between 0 and 100")
+        metrics_flush_seconds = bounded_int("METRICS_FLUSH_SECONDS", 60)
+        tracing_exporter = (getenv_str("TRACING_EXPORTER", "console") or "").lower()
+        if tracing_exporter not in _TRACING_EXPORTERS:
+            raise ValueError(
+                f"TRACING_EXPORTER must be one of {', '.join(_TRACING_EXPORTERS)}"
+            )
+        otlp_traces_endpoint = getenv_str("OTLP_TRACES_ENDPOINT") or None
+        if otlp_traces_endpoint and not _VALID_URL_RE.match(otlp_traces_endpoint):
+            raise ValueError(
+                f"OTLP_TRACES_ENDPOINT '{otlp_traces_endpoint}' is not a valid HTTP(S) URL."
+            )
+        tracing_max_queue_size = bounded_int("TRACING_MAX_QUEUE_SIZE", 2048)
+        tracing_max_export_batch_size = bounded_int(
+            "TRACING_MAX_EXPORT_BATCH_SIZE", 512
+        )
+        if tracing_max_export_batch_size > tracing_max_queue_size:
+            raise ValueError(
+                "TRACING_MAX_EXPORT_BATCH_SIZE must not exceed TRACING_MAX_QUEUE_SIZE"
+            )
+        log_queue_size = bounded_int("LOG_QUEUE_SIZE", 10_000)
+        profile_mode = (getenv_str("PROFILE_MODE", "off") or "off").lower()
+        if profile_mode not in _PROFILE_MODES:
+            raise ValueError(f"PROFILE_MODE must be one of {', '.join(_PROFILE_MODES)}")
+        profile_dir = getenv_str("PROFILE_DIR") or None
+        profile_dump_seconds = bounded_int("PROFILE_DUMP_SECONDS", 0, positive=False)
+        profile_sample_interval_ms = bounded_int("PROFILE_SAMPLE_INTERVAL_MS", 10)
+        profile_every_n_calls = bounded_int("PROFILE_EVERY_N_CALLS", 100)
+        http_pool_connections = bounded_int("HTTP_POOL_CONNECTIONS", 10)
+        http_pool_maxsize = bounded_int("HTTP_POOL_MAXSIZE", 10)
+        rate_limit_per_session_per_minute = bounded_int(
+            "RATE_LIMIT_PER_SESSION_PER_MINUTE", 0, positive=False
+        )
+        rate_limit_wait_seconds = bounded_int(
+            "RATE_LIMIT_WAIT_SECONDS", 0, positive=False
+        )
+
+        intent_routes_path = getenv_str("INTENT_ROUTES_PATH") or None
+        if intent_routes_path and not os.path.isfile(intent_routes_path):
+            raise ValueError("INTENT_ROUTES_PATH points to a non-existent file.")
+        safety_policy_path = getenv_str("SAFETY_POLICY_PATH") or None
+        if safety_policy_path and not os.path.isfile(safety_policy_path):
+            raise ValueError("SAFETY_POLICY_PATH points to a non-existent file.")
+        safety_reload_seconds = bounded_int("SAFETY_RELOAD_SECONDS", 5)
 
         if google_application_credentials and not os.path.isfile(
             google_application_credentials
@@ -84,4 +211,46 @@ class Config:
             max_context_tokens=max_context_tokens,
             rate_limit_per_minute=rate_limit_per_minute,
             cache_ttl_seconds=cache_ttl_seconds,
+            http_pool_connections=http_pool_connections,
+            http_pool_maxsize=http_pool_maxsize,
+            rate_limit_per_session_per_minute=rate_limit_per_session_per_minute,
+            rate_limit_wait_seconds=rate_limit_wait_seconds,
+            cache_max_items=cache_max_items,
+            cache_stale_while_revalidate_seconds=cache_stale_while_revalidate_seconds,
+            cache_stale_if_error_seconds=cache_stale_if_error_seconds,
+            circuit_failure_threshold=circuit_failure_threshold,
+            circuit_reset_seconds=circuit_reset_seconds,
+            api_concurrency_initial=api_concurrency_initial,
+            api_concurrency_min=api_concurrency_min,
+            api_concurrency_max=api_concurrency_max,
+            api_concurrency_wait_seconds=api_concurrency_wait_seconds,
+            bulk_max_workers=bulk_max_workers,
+            server_max_concurrency=server_max_concurrency,
+            server_max_queue=server_max_queue,
+            server_drain_seconds=server_drain_seconds,
+            server_workers=server_workers,
+            session_max_count=session_max_count,
+            session_idle_seconds=session_idle_seconds,
+            session_snapshot_path=session_snapshot_path,
+            replica_path=replica_path,
+            replica_sync_seconds=replica_sync_seconds,
+            write_behind_path=write_behind_path,
+            write_behind_concurrency=write_behind_concurrency,
+            write_behind_retry_seconds=write_behind_retry_seconds,
+            tracing_enabled=tracing_enabled in ("true", "1"),
+            tracing_sample_percent=tracing_sample_percent,
+            metrics_flush_seconds=metrics_flush_seconds,
+            tracing_exporter=tracing_exporter,
+            otlp_traces_endpoint=otlp_traces_endpoint,
+            tracing_max_queue_size=tracing_max_queue_size,
+            tracing_max_export_batch_size=tracing_max_export_batch_size,
+            log_queue_size=log_queue_size,
+            profile_mode=profile_mode,
+            profile_dir=profile_dir,
+            profile_dump_seconds=profile_dump_seconds,
+            profile_sample_interval_ms=profile_sample_interval_ms,
+            profile_every_n_calls=profile_every_n_calls,
+            intent_routes_path=intent_routes_path,
+            safety_policy_path=safety_policy_path,
+            safety_reload_seconds=safety_reload_seconds,
         )
@@ -0,0 +1,85 @@
+"""Pooled keep-alive HTTP sessions for the Todo API client."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, cast
+from urllib.parse import urlsplit
+
+import requests
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool
+
+from .observability import emit_metric
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that records whether each request reused a pooled connection."""
+
+    def __init__(
+        self, pool_connections: int, pool_maxsize: int, pool_block: bool
+    ) -> None:
+        super().__init__(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+
+    def get_connection_with_tls_context(self, *args: Any, **kwargs: Any) -> Any:
+        # Typed as the ConnectionPool base, but HTTP(S) pools are always these.
+        pool = cast(
+            HTTPConnectionPool,
+            super().get_connection_with_tls_context(*args, **kwargs),
+        )
+        self._local.pool = pool
+        self._local.opened_before = pool.num_connections
+        return pool
+
+    def send(  # type: ignore[override]
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        self._local.pool = None
+        response = super().send(request, **kwargs)
+        pool = self._local.pool
+        reused = pool is None or pool.num_connections == self._local.opened_before
+        with self._stats_lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+        host = urlsplit(request.url or "").hostname or ""
+        emit_metric("http_pool_hit" if reused else "http_pool_miss", 1, host=host)
+        return response
+
+
+class PooledSession(requests.Session):
+    """A ``requests.Session`` with a bounded, keep-alive connection pool.
+
+    ``pool_connections`` caps how many per-host pools are kept, ``pool_maxsize``
+    caps open connections per host and ``pool_block`` makes callers wait for a
+    free connection instead of opening extra, unpooled ones.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = True,
+    ) -> None:
+        super().__init__()
+        self.adapter = CountingHTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self.mount("http://", self.adapter)
+        self.mount("https://", self.adapter)
+        self.headers["Connection"] = "keep-alive"
+
+    def pool_stats(self) -> Dict[str, int]:
+        return {"hits": self.adapter.hits, "misses": self.adapter.misses}
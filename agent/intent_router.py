@@ -0,0 +1,114 @@
+"""Table-driven intent routing for incoming chat messages."""
+
+from __future__ import annotations
+
+import json
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .patterns import is_word_char, normalize_phrase, trie_pattern
+from .safety import DEFAULT_BLOCKED_PHRASES, SafetyPolicy
+
+BLOCKED = "blocked"
+CLARIFY = "clarify"
+
+DEFAULT_ROUTES: Dict[str, Tuple[str, ...]] = {
+    "list": ("list", "show"),
+    "create": ("create", "add"),
+    "update": ("update", "edit", "mark"),
+    "delete": ("delete", "remove"),
+}
+DEFAULT_BLOCKED: Tuple[str, ...] = DEFAULT_BLOCKED_PHRASES
+
+
+@dataclass(frozen=True)
+class RouteMatch:
+    intent: str
+    spans: Tuple[Tuple[int, int], ...] = ()
+    rule: Optional[str] = None
+
+
+class IntentRouter:
+    """Route a message to an intent with one precompiled regex pass.
+
+    Synonyms match whole words only, so "address" does not count as "add". The
+    intent whose synonym appears first in the message wins. Anything the
+    safety ``policy`` (by default one built from ``blocked``) matches
+    overrides any intent, wherever it appears.
+    """
+
+    def __init__(
+        self,
+        routes: Optional[Mapping[str, Iterable[str]]] = None,
+        blocked: Iterable[str] = DEFAULT_BLOCKED,
+        policy: Optional[SafetyPolicy] = None,
+    ) -> None:
+        source = DEFAULT_ROUTES if routes is None else routes
+        self._routes: Dict[str, List[str]] = {
+            intent: list(synonyms) for intent, synonyms in source.items()
+        }
+        self.policy = policy if policy is not None else SafetyPolicy(blocked)
+        self._compile()
+
+    @classmethod
+    def from_file(
+        cls, path: str, policy: Optional[SafetyPolicy] = None
+    ) -> "IntentRouter":
+        """Load ``{"intents": {name: [synonyms]}, "blocked": [phrases]}`` from JSON."""
+
+        with open(path, encoding="utf-8") as handle:
+            table = json.load(handle)
+        return cls(
+            routes=table.get("intents", DEFAULT_ROUTES),
+            blocked=table.get("blocked", DEFAULT_BLOCKED),
+            policy=policy,
+        )
+
+    @property
+    def intents(self) -> Tuple[str, ...]:
+        return tuple(self._routes)
+
+    def register(self, intent: str, *synonyms: str) -> None:
+        """Add synonyms for ``intent`` (creating it if needed) and recompile."""
+
+        self._routes.setdefault(intent, []).extend(synonyms)
+        self._compile()
+
+    def _compile(self) -> None:
+        # Every synonym lives in one trie-shaped regex; the matched text is
+        # mapped back to its intent.
+        self._phrases: Dict[str, str] = {}
+        for intent, synonyms in self._routes.items():
+            for phrase in synonyms:
+                self._phrases.setdefault(normalize_phrase(phrase), intent)
+        self._pattern = re.compile(trie_pattern(self._phrases))
+
+    def route(self, text: str) -> RouteMatch:
+        unsafe = self.policy.check(text)
+        if unsafe is not None:
+            return RouteMatch(BLOCKED, (unsafe.span,), unsafe.rule)
+        lowered = text.lower()
+        length = len(lowered)
+        search = self._pattern.search
+        intent: Optional[str] = None
+        spans: List[Tuple[int, int]] = []
+        position = 0
+        while True:
+            match = search(lowered, position)
+            if match is None:
+                break
+            start, end = match.span()
+            matched = self._phrases[" ".join(match.group().split())]
+            # Resume one character on rather than at ``end`` so a synonym that
+            # starts inside a rejected match is still seen.
+            position = start + 1
+            if (start and is_word_char(lowered[start - 1])) or (
+                end < length and is_word_char(lowered[end])
+            ):
+                continue  # part of a longer word, e.g. "add" in "address"
+            if intent is None:
+                intent = matched
+            if matched == intent:
+                spans.append((start, end))
+        return RouteMatch(intent or CLARIFY, tuple(spans))
@@ -0,0 +1,98 @@
+"""Incremental parsing of a JSON array arriving in chunks."""
+
+from __future__ import annotations
+
+import codecs
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, List, Union
+
+Chunk = Union[bytes, str]
+
+_WHITESPACE = " \t\r\n"
+
+
+class JSONArrayParser:
+    """Feed chunks of a top-level JSON array and collect each element once complete.
+
+    Only the current, not yet complete element is buffered, so memory stays
+    proportional to the largest element rather than to the whole document.
+    """
+
+    def __init__(self) -> None:
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+
+    def feed(self, chunk: Chunk) -> List[Any]:
+        text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self._buffer = self._buffer + text if self._buffer else text
+        return self._drain(final=False)
+
+    def close(self) -> List[Any]:
+        self._buffer += self._utf8.decode(b"", final=True)
+        items = self._drain(final=True)
+        if not self._finished:
+            raise ValueError("JSON array is truncated")
+        return items
+
+    def _drain(self, final: bool) -> List[Any]:
+        items: List[Any] = []
+        buffer = self._buffer
+        position = 0
+        length = len(buffer)
+        while True:
+            while position < length and buffer[position] in _WHITESPACE:
+                position += 1
+            if position >= length:
+                break
+            char = buffer[position]
+            if self._finished:
+                raise ValueError("unexpected data after the JSON array")
+            if not self._started:
+                if char != "[":
+                    raise ValueError("expected a JSON array")
+                self._started = True
+                position += 1
+                continue
+            if char == "]":
+                self._finished = True
+                position += 1
+                continue
+            if char == ",":
+                position += 1
+                continue
+            try:
+                item, end = self._decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # element continues in the next chunk
+            if end == length and not final:
+                # A number such as "12" may still grow to "123"; wait for more.
+                break
+            items.append(item)
+            position = end
+        self._buffer = buffer[position:]
+        return items
+
+
+def iter_json_array(chunks: Iterable[Chunk]) -> Iterator[Any]:
+    """Yield the elements of a JSON array read from ``chunks`` one at a time."""
+
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+
+async def aiter_json_array(chunks: AsyncIterable[Chunk]) -> AsyncIterator[Any]:
+    """Asyncio flavour of ``iter_json_array``."""
+
+    parser = JSONArrayParser()
+    async for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+    for item in parser.close():
+        yield item
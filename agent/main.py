@@ -2,122 +2,638 @@
 
 from __future__ import annotations
 
+import argparse
 import json
 import re
-from dataclasses import dataclass
-from typing import Dict, Optional
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limit import AdaptiveConcurrencyLimiter
 from .config import Config
-from .observability import configure_logging, configure_tracing, get_logger, traced_span
-from .todo_tool import TodoServiceTool
+from .intent_router import BLOCKED, IntentRouter
+from .models import BulkResult, TodoItem
+from .observability import (
+    configure_logging,
+    configure_metrics,
+    configure_tracing,
+    emit_metric,
+    get_logger,
+    stage_timings,
+    timed_stage,
+    traced_span,
+)
+from .payload_parser import (
+    ParsedPayload,
+    PayloadParser,
+    parse_id_list,
+    parse_status_word,
+)
+from .profiling import Profiler
+from .rate_limit import RateLimiter, rate_limit_scope
+from .replica import TodoReplica
+from .safety import ReloadingSafetyPolicy
+from .sessions import Session, SessionStore
+from .todo_cache import TodoCache
+from .write_behind import WriteBehindQueue
+
+if TYPE_CHECKING:
+    from .async_todo_tool import AsyncTodoServiceTool
+    from .todo_tool import TodoServiceTool
+
+# "that one", "those"... only as the object right after the verb ("delete that
+# one", "mark those done"), not an "it" or "that" anywhere in the message.
+_REFERENCE_RE = re.compile(
+    r"^\s*(?:please\s+)?\w+\s+"
+    r"(?:that one|this one|the last one|that|it|those|these|them)\b",
+    re.IGNORECASE,
+)
+_LIMIT_RE = re.compile(r"\b(?:first|top|limit:?)\s*(\d+)\b", re.IGNORECASE)
+_ERROR_REPLY = "I ran into an error while processing your request. Please try again."
+_EMPTY_LIST_REPLY = "You have no todos yet. Want me to add one?"
+_STREAM_BATCH = 100
+_WRITE_METHODS = frozenset(
+    ("create_todo", "update_todo", "delete_todo", "bulk_update", "bulk_delete")
+)
 
 
 @dataclass
 class Message:
     role: str
     content: str
+    session_id: Optional[str] = None
+
+
+@dataclass
+class _ToolCall:
+    action: str
+    method: str
+    args: Tuple[Any, ...]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+
+
+class _ListStream:
+    """Batch compact ``- id [status] title`` lines into reply chunks."""
+
+    def __init__(self, limit: Optional[int]) -> None:
+        self.limit = limit
+        self.count = 0
+        self._first: Optional[Mapping[str, Any]] = None
+        self._lines: List[str] = ["Here are your todos:\n"]
+
+    def add(self, todo: Mapping[str, Any]) -> str:
+        if self._first is None:
+            self._first = todo
+        self.count += 1
+        self._lines.append(f"- {todo['id']} [{todo['status']}] {todo['title']}\n")
+        return self.flush() if len(self._lines) >= _STREAM_BATCH else ""
+
+    def flush(self) -> str:
+        chunk = "".join(self._lines) if self.count else ""
+        self._lines.clear()
+        return chunk
+
+    def finish(self) -> str:
+        if not self.count:
+            return _EMPTY_LIST_REPLY
+        chunk = self.flush()
+        if self.limit is not None and self.count >= self.limit:
+            chunk += f"Showing the first {self.count} todos.\n"
+        return chunk
+
+    def summary(self) -> str:
+        return f"Listed {self.count} todo{'' if self.count == 1 else 's'}."
+
+    def only_todo(self) -> List[Mapping[str, Any]]:
+        return [self._first] if self.count == 1 and self._first else []
 
 
 class TodoOrchestrator:
     """A minimal Vertex ADK-like orchestrator with ReAct-style prompting."""
 
-    def __init__(self, config: Config) -> None:
+    def __init__(
+        self,
+        config: Config,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[TodoCache[TodoItem]] = None,
+    ) -> None:
         self.config = config
-        self.tool = TodoServiceTool(
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(
+                config.rate_limit_per_minute,
+                per_key_rate_per_minute=config.rate_limit_per_session_per_minute,
+            )
+        if cache is None:
+            cache = TodoCache(
+                config.cache_ttl_seconds, max_items=config.cache_max_items
+            )
+        circuit_breaker = CircuitBreaker(
+            failure_threshold=config.circuit_failure_threshold,
+            reset_timeout=config.circuit_reset_seconds,
+        )
+        concurrency_limiter = AdaptiveConcurrencyLimiter(
+            initial_limit=config.api_concurrency_initial,
+            min_limit=config.api_concurrency_min,
+            max_limit=config.api_concurrency_max,
+            max_wait=config.api_concurrency_wait_seconds,
+        )
+        policy = (
+            ReloadingSafetyPolicy(
+                config.safety_policy_path,
+                check_interval=config.safety_reload_seconds,
+            )
+            if config.safety_policy_path
+            else None
+        )
+        self.router = (
+            IntentRouter.from_file(config.intent_routes_path, policy=policy)
+            if config.intent_routes_path
+            else IntentRouter(policy=policy)
+        )
+        # Shared by both tools; the tools themselves (and requests/aiohttp)
+        # are only imported and built when a message first needs them.
+        self._tool_options: Dict[str, Any] = dict(
             base_url=config.todo_api_base_url,
-            rate_limit_per_minute=config.rate_limit_per_minute,
             cache_ttl_seconds=config.cache_ttl_seconds,
+            pool_maxsize=config.http_pool_maxsize,
+            rate_limiter=rate_limiter,
+            rate_limit_wait_seconds=config.rate_limit_wait_seconds,
+            cache=cache,
+            stale_while_revalidate_seconds=config.cache_stale_while_revalidate_seconds,
+            stale_if_error_seconds=config.cache_stale_if_error_seconds,
+            circuit_breaker=circuit_breaker,
+            concurrency_limiter=concurrency_limiter,
+            bulk_max_workers=config.bulk_max_workers,
+            replica=TodoReplica(config.replica_path) if config.replica_path else None,
+            replica_sync_seconds=config.replica_sync_seconds,
+            safety_policy=self.router.policy,
+        )
+        self._tool: Optional[TodoServiceTool] = None
+        self._async_tool: Optional[AsyncTodoServiceTool] = None
+        self._tools_lock = threading.Lock()
+        self.payload_parser = PayloadParser()
+        self.sessions = SessionStore(
+            config.max_context_tokens,
+            max_sessions=config.session_max_count,
+            idle_timeout=config.session_idle_seconds,
+            snapshot_path=config.session_snapshot_path,
         )
+        self.profiler = Profiler(
+            config.profile_mode,
+            dump_dir=config.profile_dir,
+            dump_interval_seconds=config.profile_dump_seconds,
+            sample_interval_ms=config.profile_sample_interval_ms,
+            every_n_calls=config.profile_every_n_calls,
+        )
+        self.profiler.start()
+        self.write_behind = (
+            WriteBehindQueue(
+                lambda: self.tool,
+                config.write_behind_path,
+                max_concurrency=config.write_behind_concurrency,
+                retry_seconds=config.write_behind_retry_seconds,
+            )
+            if config.write_behind_path
+            else None
+        )
+        if self.write_behind is not None:
+            self.write_behind.start()
         self.logger = get_logger("agent")
 
+    @property
+    def tool(self) -> TodoServiceTool:
+        if self._tool is None:
+            with self._tools_lock:
+                if self._tool is None:
+                    from .todo_tool import TodoServiceTool
+
+                    self._tool = TodoServiceTool(
+                        pool_connections=self.config.http_pool_connections,
+                        **self._tool_options,
+                    )
+        return self._tool
+
+    @tool.setter
+    def tool(self, tool: TodoServiceTool) -> None:
+        self._tool = tool
+
+    @property
+    def async_tool(self) -> AsyncTodoServiceTool:
+        if self._async_tool is None:
+            with self._tools_lock:
+                if self._async_tool is None:
+                    from .async_todo_tool import AsyncTodoServiceTool
+
+                    self._async_tool = AsyncTodoServiceTool(**self._tool_options)
+        return self._async_tool
+
+    @async_tool.setter
+    def async_tool(self, tool: AsyncTodoServiceTool) -> None:
+        self._async_tool = tool
+
+    def warm_up(self) -> threading.Thread:
+        """Import and build both tools on a background thread.
+
+        Call once the process is up so the first message does not pay for
+        loading the HTTP stack.
+        """
+
+        def build() -> None:
+            self.tool
+            self.async_tool
+
+        thread = threading.Thread(target=build, name="agent-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self) -> None:
+        if self.write_behind is not None:
+            self.write_behind.close(self.config.server_drain_seconds)
+        if self._tool is not None:
+            self._tool.close()
+        self.sessions.save()
+        self.profiler.stop()
+
+    async def aclose(self) -> None:
+        if self._async_tool is not None:
+            await self._async_tool.aclose()
+
     def _decide_action(self, message: str) -> Dict[str, str]:
-        lowered = message.lower()
-        if any(unsafe in lowered for unsafe in ["/rm", "drop table", "delete from"]):
+        route = self.router.route(message)
+        if route.intent == BLOCKED:
+            self.logger.warning("unsafe_message_blocked", rule=route.rule)
+            emit_metric("unsafe_input_blocked", 1, field="message")
             raise ValueError(
                 "Unsafe instruction detected. Please rephrase your request."
             )
-        if "list" in lowered or "show" in lowered:
-            return {"action": "list"}
-        if "create" in lowered or "add" in lowered:
-            return {"action": "create"}
-        if "update" in lowered or "edit" in lowered:
-            return {"action": "update"}
-        if "delete" in lowered or "remove" in lowered:
-            return {"action": "delete"}
-        return {"action": "clarify"}
+        return {"action": route.intent}
+
+    def _plan(
+        self, text: str, session: Optional[Session] = None
+    ) -> Union[str, _ToolCall]:
+        """Turn a message into a tool call, or a direct reply when none is needed."""
+
+        with timed_stage("route"):
+            action = self._decide_action(text)["action"]
+        if action == "clarify":
+            return "I can manage your todos (list, create, update, delete). What would you like to do?"
+        if action not in ("list", "create", "update", "delete"):
+            return "I could not determine your intent."
+        with timed_stage("parse"):
+            return self._plan_action(action, text, session)
+
+    def _plan_action(
+        self, action: str, text: str, session: Optional[Session]
+    ) -> Union[str, _ToolCall]:
+        if action == "list":
+            return _ToolCall(action, "list_todos", (), self._list_filters(text))
+        parsed = self.payload_parser.parse(text)
+        if parsed.errors:
+            name, error = next(iter(parsed.errors.items()))
+            return f"I could not read the {name} field ({error}). Please fix it and try again."
+        if action == "create":
+            return _ToolCall(action, "create_todo", (self._extract_payload(parsed),))
+        bulk = self._plan_bulk(action, text[: parsed.command_end], parsed, session)
+        if bulk is not None:
+            return bulk
+        if action == "update":
+            payload = self._extract_payload(parsed)
+            todo_id = payload.pop("id", None)
+            if not todo_id:
+                return "Please provide the todo id to update."
+            return _ToolCall(action, "update_todo", (todo_id, payload))
+        if action == "delete":
+            todo_id = self._extract_id(parsed)
+            if not todo_id:
+                return "Please provide the todo id to delete."
+            return _ToolCall(action, "delete_todo", (todo_id,))
+        return "I could not determine your intent."
+
+    @staticmethod
+    def _list_filters(text: str) -> Dict[str, Any]:
+        """Pick "done"/"open" and "first N" out of a list request."""
+
+        filters: Dict[str, Any] = {}
+        status = parse_status_word(text)
+        if status:
+            filters["status"] = status
+        limit = _LIMIT_RE.search(text)
+        if limit and int(limit.group(1)) > 0:
+            filters["limit"] = int(limit.group(1))
+        return filters
+
+    def _plan_bulk(
+        self,
+        action: str,
+        command: str,
+        parsed: ParsedPayload,
+        session: Optional[Session] = None,
+    ) -> Union[None, str, _ToolCall]:
+        """Plan "mark 3-5 done" or "delete 1, 4 and 9" as one bulk call.
+
+        "that one" or "those" refer to the todos the session touched last,
+        unless the message names an id itself.
+        """
+
+        try:
+            todo_ids = parse_id_list(command)
+        except ValueError as exc:
+            return f"I can only do that for a limited batch: {exc}."
+        if (
+            not todo_ids
+            and "id" not in parsed.fields
+            and session is not None
+            and _REFERENCE_RE.search(command)
+        ):
+            todo_ids = list(session.last_todo_ids)
+        if not todo_ids or (len(todo_ids) == 1 and "id" in parsed.fields):
+            return None
+        if action == "delete":
+            return _ToolCall(action, "bulk_delete", (todo_ids,))
+        changes = {
+            name: parsed.fields[name]
+            for name in ("title", "description", "status")
+            if name in parsed.fields
+        }
+        status = parse_status_word(command)
+        if status and "status" not in changes:
+            changes["status"] = status
+        if not changes:
+            return "What should I change on those todos? For example: mark 3-5 done."
+        return _ToolCall(
+            action, "bulk_update", ({todo_id: dict(changes) for todo_id in todo_ids},)
+        )
+
+    def _render_bulk(self, call: _ToolCall, result: BulkResult) -> str:
+        verb = "Updated" if call.action == "update" else "Deleted"
+        done = list(result.succeeded)
+        reply = f"{verb} {len(done)} todo{'' if len(done) == 1 else 's'}"
+        if done:
+            reply += f" ({', '.join(done)})"
+        if call.action == "update" and done:
+            status = next(iter(call.args[0].values())).get("status")
+            if status:
+                reply += f" to status {status}"
+        reply += "."
+        if result.failed:
+            failures = "; ".join(f"{key}: {err}" for key, err in result.failed.items())
+            reply += f" Failed: {failures}."
+        return reply
+
+    def _render(self, call: _ToolCall, result: Any) -> str:
+        if isinstance(result, BulkResult):
+            return self._render_bulk(call, result)
+        if call.action == "list":
+            if not result:
+                return _EMPTY_LIST_REPLY
+            reply = "Here are your todos:\n" + json.dumps(
+                [dict(todo) for todo in result], indent=2
+            )
+            limit = call.kwargs.get("limit")
+            if limit is not None and len(result) >= limit:
+                reply += f"\nShowing the first {limit} todos."
+            return reply
+        if call.action == "create":
+            return f"Created todo '{result['title']}' with id {result['id']}."
+        if call.action == "update":
+            return f"Updated todo {result['id']} to status {result['status']}."
+        return f"Deleted todo {result.get('id', call.args[0])}."
+
+    @contextmanager
+    def _request_scope(self, name: str, message: Message) -> Iterator[None]:
+        """Span, per-stage timings and rate-limit key for handling one message."""
+
+        with traced_span(name, role=message.role) as span, stage_timings(span):
+            with rate_limit_scope(message.session_id), self.profiler.call():
+                yield
+
+    def _writer(self, plan: _ToolCall) -> Optional[WriteBehindQueue]:
+        """The write-behind queue, when it should take this call."""
+
+        if self.write_behind is not None and plan.method in _WRITE_METHODS:
+            return self.write_behind
+        return None
+
+    def _failed_writes_note(self, session_id: Optional[str]) -> str:
+        if self.write_behind is None:
+            return ""
+        failures = self.write_behind.take_failures(session_id)
+        if not failures:
+            return ""
+        return "\nAn earlier change did not go through: " + "; ".join(failures) + "."
 
     def handle(self, message: Message) -> str:
-        with traced_span("agent.handle", role=message.role):
-            decision = self._decide_action(message.content)
-            action = decision["action"]
-            if action == "clarify":
-                return "I can manage your todos (list, create, update, delete). What would you like to do?"
+        with self._request_scope("agent.handle", message):
+            plan = self._plan(message.content, self.sessions.get(message.session_id))
+            return self._run(message, plan)
+
+    def _run(self, message: Message, plan: Union[str, _ToolCall]) -> str:
+        if isinstance(plan, str):
+            return self._remember(message, plan)
+        try:
+            result = getattr(self._writer(plan) or self.tool, plan.method)(
+                *plan.args, **plan.kwargs
+            )
+        except Exception as exc:  # pragma: no cover - defensive
+            self.logger.error("agent_error", error=str(exc))
+            return self._remember(message, _ERROR_REPLY)
+        with timed_stage("render"):
+            reply = self._render(plan, result)
+        return self._remember(message, reply, plan, result)
+
+    async def handle_async(self, message: Message) -> str:
+        """Event-loop friendly ``handle`` that awaits the async tool."""
+
+        with self._request_scope("agent.handle", message):
+            plan = self._plan(message.content, self.sessions.get(message.session_id))
+            return await self._run_async(message, plan)
+
+    async def _run_async(self, message: Message, plan: Union[str, _ToolCall]) -> str:
+        if isinstance(plan, str):
+            return self._remember(message, plan)
+        try:
+            writer = self._writer(plan)
+            if writer is not None:
+                result = getattr(writer, plan.method)(*plan.args, **plan.kwargs)
+            else:
+                result = await getattr(self.async_tool, plan.method)(
+                    *plan.args, **plan.kwargs
+                )
+        except Exception as exc:  # pragma: no cover - defensive
+            self.logger.error("agent_error", error=str(exc))
+            return self._remember(message, _ERROR_REPLY)
+        with timed_stage("render"):
+            reply = self._render(plan, result)
+        return self._remember(message, reply, plan, result)
+
+    def handle_stream(self, message: Message) -> Iterator[str]:
+        """Like ``handle`` but yield the reply in chunks.
+
+        Lists are rendered one compact line per todo while the API response is
+        still being read, so the first lines go out before the last todo
+        arrives. Other replies are yielded as a single chunk.
+        """
+
+        with self._request_scope("agent.handle_stream", message):
+            plan = self._plan(message.content, self.sessions.get(message.session_id))
+            if not isinstance(plan, _ToolCall) or plan.action != "list":
+                yield self._run(message, plan)
+                return
+            lines = _ListStream(plan.kwargs.get("limit"))
             try:
-                if action == "list":
-                    todos = self.tool.list_todos()
-                    if not todos:
-                        return "You have no todos yet. Want me to add one?"
-                    return "Here are your todos:\n" + json.dumps(todos, indent=2)
-                if action == "create":
-                    payload = self._extract_payload(message.content)
-                    created = self.tool.create_todo(payload)
-                    return f"Created todo '{created['title']}' with id {created['id']}."
-                if action == "update":
-                    payload = self._extract_payload(message.content)
-                    todo_id = payload.pop("id", None)
-                    if not todo_id:
-                        return "Please provide the todo id to update."
-                    updated = self.tool.update_todo(todo_id, payload)
-                    return (
-                        f"Updated todo {updated['id']} to status {updated['status']}."
-                    )
-                if action == "delete":
-                    todo_id = self._extract_id(message.content)
-                    if not todo_id:
-                        return "Please provide the todo id to delete."
-                    deleted = self.tool.delete_todo(todo_id)
-                    return f"Deleted todo {deleted.get('id', todo_id)}."
+                for todo in self.tool.iter_todos(**plan.kwargs):
+                    chunk = lines.add(todo)
+                    if chunk:
+                        yield chunk
             except Exception as exc:  # pragma: no cover - defensive
                 self.logger.error("agent_error", error=str(exc))
-                return "I ran into an error while processing your request. Please try again."
-            return "I could not determine your intent."
+                yield lines.flush() + _ERROR_REPLY
+                self._remember(message, _ERROR_REPLY)
+                return
+            yield lines.finish() + self._failed_writes_note(message.session_id)
+            self._remember(message, lines.summary(), plan, lines.only_todo())
 
-    def _extract_payload(self, text: str) -> Dict[str, str]:
-        payload: Dict[str, str] = {}
-        patterns = {
-            "title": r"title:\s*([^;]+)",
-            "description": r"description:\s*([^;]+)",
-            "status": r"status:\s*([^;]+)",
-            "id": r"id:\s*([^;\s]+)",
-        }
-        for key, pattern in patterns.items():
-            match = re.search(pattern, text, flags=re.IGNORECASE)
-            if match:
-                payload[key] = match.group(1).strip()
+    async def handle_stream_async(self, message: Message) -> AsyncIterator[str]:
+        """Async counterpart of ``handle_stream`` backed by the async tool."""
+
+        with self._request_scope("agent.handle_stream", message):
+            plan = self._plan(message.content, self.sessions.get(message.session_id))
+            if not isinstance(plan, _ToolCall) or plan.action != "list":
+                yield await self._run_async(message, plan)
+                return
+            lines = _ListStream(plan.kwargs.get("limit"))
+            try:
+                async for todo in self.async_tool.iter_todos(**plan.kwargs):
+                    chunk = lines.add(todo)
+                    if chunk:
+                        yield chunk
+            except Exception as exc:  # pragma: no cover - defensive
+                self.logger.error("agent_error", error=str(exc))
+                yield lines.flush() + _ERROR_REPLY
+                self._remember(message, _ERROR_REPLY)
+                return
+            yield lines.finish() + self._failed_writes_note(message.session_id)
+            self._remember(message, lines.summary(), plan, lines.only_todo())
+
+    def _remember(
+        self,
+        message: Message,
+        reply: str,
+        call: Optional[_ToolCall] = None,
+        result: Any = None,
+    ) -> str:
+        """Append the exchange to the session and note which todos it touched."""
+
+        reply += self._failed_writes_note(message.session_id)
+        todo_ids: Tuple[str, ...] = ()
+        if isinstance(result, BulkResult):
+            todo_ids = tuple(result.succeeded)
+        elif call is not None and call.action == "list":
+            if isinstance(result, list) and len(result) == 1:
+                todo_ids = (str(result[0].get("id")),)
+        elif isinstance(result, Mapping) and result.get("id") is not None:
+            todo_ids = (str(result["id"]),)
+        elif call is not None and call.args and isinstance(call.args[0], str):
+            todo_ids = (call.args[0],)
+        with timed_stage("session"):
+            self.sessions.record(message.session_id, message.role, message.content)
+            self.sessions.record(message.session_id, "assistant", reply, todo_ids)
+        return reply
+
+    def _extract_payload(self, parsed: ParsedPayload) -> Dict[str, Any]:
+        payload = dict(parsed.fields)
         if not payload.get("title"):
             payload["title"] = "Untitled"
         return payload
 
-    def _extract_id(self, text: str) -> Optional[str]:
-        match = re.search(r"id:\s*([^;\s]+)", text, flags=re.IGNORECASE)
-        return match.group(1).strip() if match else None
+    def _extract_id(self, parsed: ParsedPayload) -> Optional[str]:
+        return parsed.fields.get("id")
+
+
+def configure_observability(config: Config) -> None:
+    configure_logging(config.log_queue_size)
+    configure_tracing(
+        sample_ratio=config.tracing_sample_percent / 100,
+        enabled=config.tracing_enabled,
+        exporter=config.tracing_exporter,
+        otlp_endpoint=config.otlp_traces_endpoint,
+        max_queue_size=config.tracing_max_queue_size,
+        max_export_batch_size=config.tracing_max_export_batch_size,
+        background=True,
+    )
+    configure_metrics(config.metrics_flush_seconds)
 
 
-def main() -> None:
-    configure_logging()
-    configure_tracing()
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run the TodoOrchestrator agent.")
+    parser.add_argument(
+        "--serve", action="store_true", help="serve HTTP instead of the REPL"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="server processes for --serve (default: SERVER_WORKERS)",
+    )
+    args = parser.parse_args(argv)
+
     config = Config.from_env()
+    configure_observability(config)
+    workers = args.workers or config.server_workers
+    if args.serve and workers > 1:
+        from .workers import serve_workers
+
+        get_logger("cli").info(
+            "todo_orchestrator_serving", host=args.host, port=args.port, workers=workers
+        )
+        serve_workers(config, workers, host=args.host, port=args.port)
+        return
     agent = TodoOrchestrator(config)
+    agent.profiler.install_signal_handlers()
+    agent.warm_up()
     logger = get_logger("cli")
     logger.info("todo_orchestrator_ready", base_url=config.todo_api_base_url)
+    if args.serve:
+        from .server import serve
+
+        logger.info("todo_orchestrator_serving", host=args.host, port=args.port)
+        serve(
+            agent,
+            host=args.host,
+            port=args.port,
+            max_concurrency=config.server_max_concurrency,
+            max_queue=config.server_max_queue,
+            drain_seconds=config.server_drain_seconds,
+        )
+        return
     print("TodoOrchestrator is running. Type 'quit' to exit.")
-    while True:
-        user_input = input("You: ")
-        if user_input.lower().strip() == "quit":
-            break
-        message = Message(role="user", content=user_input)
-        reply = agent.handle(message)
-        print(f"Agent: {reply}")
+    try:
+        while True:
+            user_input = input("You: ")
+            if user_input.lower().strip() == "quit":
+                break
+            message = Message(role="user", content=user_input, session_id="cli")
+            print("Agent: ", end="", flush=True)
+            for chunk in agent.handle_stream(message):
+                print(chunk, end="", flush=True)
+            print()
+    finally:
+        agent.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+"""Todo data types shared by the tools and the orchestrator.
+
+Kept free of HTTP and tracing imports so ``agent.main`` can use them without
+loading the tool stack.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import abc
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+
+class TodoStatus(StrEnum):
+    OPEN = "open"
+    IN_PROGRESS = "in_progress"
+    DONE = "done"
+
+
+_STATUSES: Dict[Any, str] = {status.value: status for status in TodoStatus}
+_TODO_FIELDS = ("id", "title", "description", "status")
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class TodoItem(abc.Mapping):
+    """One todo, read-only and slotted; also reads like the dict it replaced.
+
+    ``todo["title"]``, ``todo.get("id")`` and ``todo == {...}`` keep working so
+    callers that treated todos as dicts need no change; ``to_dict`` is only
+    needed where a real dict is required, such as JSON rendering.
+    """
+
+    id: Any
+    title: Optional[str]
+    description: str = ""
+    status: str = TodoStatus.OPEN
+
+    @classmethod
+    def from_api(cls, payload: Mapping[str, Any]) -> "TodoItem":
+        get = payload.get
+        status = get("status", "open")
+        # Known statuses share one enum member; others are interned strings.
+        status = _STATUSES.get(status) or sys.intern(str(status))
+        # Fill the slots directly: the frozen ``__init__`` costs about 3x more.
+        todo = _new_object(cls)
+        _set_id(todo, get("id") or get("ID"))
+        _set_title(todo, get("title"))
+        _set_description(todo, get("description", ""))
+        _set_status(todo, status)
+        return todo
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "description": self.description,
+            "status": str(self.status),
+        }
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in _TODO_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_TODO_FIELDS)
+
+    def __len__(self) -> int:
+        return len(_TODO_FIELDS)
+
+
+_new_object = object.__new__
+# The slot descriptors, looked up in the class dict: attribute access on the
+# class would be typed as the field's default value.
+_slots = vars(TodoItem)
+_set_id = _slots["id"].__set__
+_set_title = _slots["title"].__set__
+_set_description = _slots["description"].__set__
+_set_status = _slots["status"].__set__
+
+
+@dataclass
+class BulkResult:
+    """Per-item outcome of a bulk call, keyed by todo id (input index for creates)."""
+
+    succeeded: Dict[str, TodoItem] = field(default_factory=dict)
+    failed: Dict[str, str] = field(default_factory=dict)
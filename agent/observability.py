@@ -2,63 +2,258 @@
 
 from __future__ import annotations
 
+import atexit
+import bisect
 import logging
+import queue
 import sys
+import threading
 import time
 from contextlib import contextmanager
-from typing import Iterator, Sequence, Union
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    TextIO,
+    Tuple,
+    Union,
+)
 
-import structlog
-from opentelemetry import trace
-from opentelemetry.sdk.resources import SERVICE_NAME, Resource
-from opentelemetry.sdk.trace import TracerProvider
-from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
-from pythonjsonlogger import jsonlogger
+if TYPE_CHECKING:
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.trace import Span, Tracer
+    from structlog.stdlib import BoundLogger
 
+# OpenTelemetry and structlog are imported on first use rather than here:
+# together they are a large share of the agent's cold-start import time.
 
 AttributeValue = Union[
     str, bool, int, float, Sequence[str], Sequence[bool], Sequence[int], Sequence[float]
 ]
 
+_tracer: Optional[Tracer] = None
+_tracing_enabled = True
 
-def configure_logging() -> None:
-    """Configure structured logging for the application."""
 
-    handler = logging.StreamHandler(sys.stdout)
-    formatter = jsonlogger.JsonFormatter(
-        "%(asctime)s %(levelname)s %(name)s %(message)s"
-    )
-    handler.setFormatter(formatter)
+class _NonRecordingSpan:
+    """Stand-in span used while tracing is disabled; every call is a no-op."""
+
+    __slots__ = ()
+
+    def is_recording(self) -> bool:
+        return False
+
+    def set_attribute(self, key: str, value: AttributeValue) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, AttributeValue]) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException, **kwargs: Any) -> None:
+        pass
+
+
+NON_RECORDING_SPAN: Any = _NonRecordingSpan()
+
+
+def _shared_processors() -> List[Any]:
+    """Applied to every record, whether it comes from structlog or stdlib logging."""
+
+    import structlog
+
+    return [
+        structlog.stdlib.add_log_level,
+        structlog.processors.TimeStamper(fmt="iso"),
+    ]
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """Queue records without blocking; count the ones that do not fit."""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Rendering happens on the listener thread, not in the caller.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            emit_metric("log_dropped", 1)
+
+
+class LogSink:
+    """Bounded queue between loggers and a background thread writing JSON lines.
+
+    Callers only pay for an enqueue; a slow ``stream`` makes the queue fill up
+    and further records are dropped (and counted) instead of blocking.
+    """
+
+    def __init__(self, queue_size: int = 10_000, stream: Optional[TextIO] = None):
+        import structlog
+
+        self.handler = _DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(
+            structlog.stdlib.ProcessorFormatter(
+                processor=structlog.processors.JSONRenderer(),
+                foreign_pre_chain=_shared_processors(),
+            )
+        )
+        self._listener = QueueListener(self.handler.queue, output)
+        self._started = False
+
+    @property
+    def dropped(self) -> int:
+        return self.handler.dropped
+
+    def start(self) -> None:
+        if not self._started:
+            self._listener.start()
+            self._started = True
+
+    def stop(self) -> None:
+        """Write out everything queued so far and stop the background thread."""
+
+        if self._started:
+            self._listener.stop()
+            self._started = False
 
-    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+_log_sink: Optional[LogSink] = None
+
+
+def _stop_log_sink() -> None:
+    if _log_sink is not None:
+        _log_sink.stop()
+
+
+def configure_logging(
+    queue_size: int = 10_000, stream: Optional[TextIO] = None
+) -> LogSink:
+    """Configure structured logging for the application.
+
+    Both structlog and stdlib records go through one ``LogSink``, so the
+    request path never waits on stdout.
+    """
+
+    global _log_sink
+    if _log_sink is None:
+        atexit.register(_stop_log_sink)
+    _stop_log_sink()
+    import structlog
+
+    _log_sink = LogSink(queue_size, stream)
+    _log_sink.start()
+
+    logging.basicConfig(level=logging.INFO, handlers=[_log_sink.handler], force=True)
     structlog.configure(
+        logger_factory=structlog.stdlib.LoggerFactory(),
         wrapper_class=structlog.make_filtering_bound_logger(logging.INFO),
         processors=[
-            structlog.processors.add_log_level,
-            structlog.processors.TimeStamper(fmt="iso"),
-            structlog.processors.JSONRenderer(),
+            *_shared_processors(),
+            structlog.stdlib.add_logger_name,
+            # Tracebacks must be captured while the exception is still current.
+            structlog.processors.format_exc_info,
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
     )
+    return _log_sink
+
+
+def configure_tracing(
+    service_name: str = "todo-agent",
+    sample_ratio: float = 1.0,
+    enabled: bool = True,
+    exporter: str = "console",
+    otlp_endpoint: Optional[str] = None,
+    max_queue_size: int = 2048,
+    max_export_batch_size: int = 512,
+    export_timeout_seconds: int = 10,
+    background: bool = False,
+) -> Optional[TracerProvider]:
+    """Configure the OpenTelemetry tracer provider and span exporter.
+
+    ``exporter`` is ``"console"`` (stdout), ``"otlp"`` (OTLP/HTTP to
+    ``otlp_endpoint``, or the exporter's own default) or ``"none"``. Spans are
+    batched off the request path; once ``max_queue_size`` spans are waiting,
+    new ones are dropped and counted as ``span_dropped``.
+
+    ``sample_ratio`` is a head sampler on new traces (children follow their
+    parent's decision). With ``enabled=False`` or ``exporter="none"`` no
+    provider is installed and ``traced_span`` hands out a shared
+    non-recording span instead.
+
+    With ``background=True`` the SDK is imported and the provider installed
+    on a daemon thread and ``None`` is returned; spans started before it is
+    ready are simply not recorded.
+    """
 
+    global _tracer, _tracing_enabled
+    _tracing_enabled = enabled and exporter != "none"
+    _tracer = None
+    if not _tracing_enabled:
+        return None
 
-def configure_tracing(service_name: str = "todo-agent") -> None:
-    """Configure a basic OpenTelemetry tracer with stdout export."""
+    def install() -> TracerProvider:
+        from opentelemetry import trace
 
-    resource = Resource(attributes={SERVICE_NAME: service_name})
-    provider = TracerProvider(resource=resource)
-    processor = BatchSpanProcessor(ConsoleSpanExporter())
-    provider.add_span_processor(processor)
-    trace.set_tracer_provider(provider)
+        from .tracing import build_tracer_provider
 
+        provider = build_tracer_provider(
+            service_name,
+            sample_ratio,
+            exporter,
+            otlp_endpoint,
+            max_queue_size,
+            max_export_batch_size,
+            export_timeout_seconds,
+        )
+        trace.set_tracer_provider(provider)
+        return provider
+
+    if background:
+        threading.Thread(target=install, name="tracing-setup", daemon=True).start()
+        return None
+    return install()
+
+
+def _get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        from opentelemetry import trace
+
+        _tracer = trace.get_tracer(__name__)
+    return _tracer
+
+
+def get_logger(name: str) -> BoundLogger:
+    import structlog
 
-def get_logger(name: str) -> structlog.stdlib.BoundLogger:
     return structlog.get_logger(name)
 
 
 @contextmanager
-def traced_span(name: str, **attributes: AttributeValue) -> Iterator[trace.Span]:
-    tracer = trace.get_tracer(__name__)
-    with tracer.start_as_current_span(name) as span:
+def traced_span(name: str, **attributes: AttributeValue) -> Iterator[Span]:
+    if not _tracing_enabled:
+        yield NON_RECORDING_SPAN
+        return
+    with _get_tracer().start_as_current_span(name) as span:
+        if not span.is_recording():
+            # Sampled out: skip attribute and timing work nobody will export.
+            yield span
+            return
         for key, value in attributes.items():
             span.set_attribute(key, value)
         start_time = time.perf_counter()
@@ -69,8 +264,260 @@ def traced_span(name: str, **attributes: AttributeValue) -> Iterator[trace.Span]
             span.set_attribute("latency_ms", latency_ms)
 
 
+class StageTimings:
+    """Where one request spent its time, filled in by ``timed_stage`` blocks."""
+
+    __slots__ = ("durations_ms", "retries")
+
+    def __init__(self) -> None:
+        self.durations_ms: Dict[str, float] = {}
+        self.retries = 0
+
+    def add(self, stage: str, elapsed_ms: float) -> None:
+        self.durations_ms[stage] = self.durations_ms.get(stage, 0.0) + elapsed_ms
+
+
+_stage_timings: ContextVar[Optional[StageTimings]] = ContextVar(
+    "stage_timings", default=None
+)
+
+
+@contextmanager
+def stage_timings(span: Span) -> Iterator[StageTimings]:
+    """Collect ``timed_stage`` durations for one request.
+
+    On exit each stage becomes a ``stage.<name>_ms`` attribute on ``span`` and
+    an ``agent_stage_ms`` histogram observation. Stages run more than once
+    (several HTTP calls, pages) are summed.
+    """
+
+    timings = StageTimings()
+    token = _stage_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _stage_timings.reset(token)
+        recording = span.is_recording()
+        for stage, elapsed_ms in timings.durations_ms.items():
+            _metrics.observe("agent_stage_ms", elapsed_ms, stage=stage)
+            if recording:
+                span.set_attribute(f"stage.{stage}_ms", elapsed_ms)
+        if recording and timings.retries:
+            span.set_attribute("stage.retries", timings.retries)
+
+
+@contextmanager
+def timed_stage(stage: str) -> Iterator[None]:
+    """Time a block as ``stage`` of the current request; free when none is active."""
+
+    timings = _stage_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(stage, (time.perf_counter() - start) * 1000)
+
+
+def note_retry(wait_seconds: float) -> None:
+    """Count a retry of the current request and the backoff it sleeps for."""
+
+    timings = _stage_timings.get()
+    if timings is not None:
+        timings.retries += 1
+        timings.add("retry_wait", wait_seconds * 1000)
+
+
+def annotate_span(**attributes: AttributeValue) -> None:
+    """Attach attributes to the currently active span, if any."""
+
+    if not _tracing_enabled:
+        return
+    from opentelemetry import trace
+
+    span = trace.get_current_span()
+    for key, value in attributes.items():
+        span.set_attribute(key, value)
+
+
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1000.0,
+    2500.0,
+    5000.0,
+)
+
+_SeriesKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the ``q`` quantile."""
+
+        rank = q * self.count
+        seen = 0
+        for bound, bucket in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += bucket
+            if seen >= rank:
+                return bound
+        return self.max
+
+
+class MetricAggregator:
+    """In-process counters, gauges and latency histograms, one log line each.
+
+    ``emit_metric``, ``record_gauge`` and ``record_latency`` only update memory
+    under a lock; ``flush`` (called every ``flush_interval`` seconds by
+    ``start``, and at exit) logs the totals accumulated since the previous
+    flush and the latest value of every gauge.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters: Dict[_SeriesKey, float] = {}
+        self._histograms: Dict[_SeriesKey, _Histogram] = {}
+        self._gauges: Dict[_SeriesKey, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(name: str, labels: Dict[str, str]) -> _SeriesKey:
+        return name, tuple(sorted(labels.items())) if labels else ()
+
+    def increment(self, name: str, value: float = 1, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value_ms: float, **labels: str) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(value_ms)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {
+                    key: (hist.count, hist.total, hist.max)
+                    for key, hist in self._histograms.items()
+                },
+                "gauges": dict(self._gauges),
+            }
+
+    def flush(self) -> None:
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            histograms, self._histograms = self._histograms, {}
+            gauges = dict(self._gauges)
+        logger = get_logger("metrics")
+        for (name, labels), value in counters.items():
+            logger.info("metric", metric_name=name, value=value, labels=dict(labels))
+        for (name, labels), value in gauges.items():
+            logger.info(
+                "metric_gauge", metric_name=name, value=value, labels=dict(labels)
+            )
+        for (name, labels), hist in histograms.items():
+            logger.info(
+                "metric_histogram",
+                metric_name=name,
+                labels=dict(labels),
+                count=hist.count,
+                mean_ms=hist.total / hist.count,
+                p50_ms=hist.quantile(0.5),
+                p95_ms=hist.quantile(0.95),
+                p99_ms=hist.quantile(0.99),
+                max_ms=hist.max,
+            )
+
+    def start(self) -> None:
+        """Flush every ``flush_interval`` seconds on a daemon thread, and at exit."""
+
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="metric-flush", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+_metrics = MetricAggregator()
+
+
+def configure_metrics(flush_interval: float = 60.0) -> MetricAggregator:
+    """Start periodic flushing of the process-wide metric aggregator."""
+
+    _metrics.flush_interval = flush_interval
+    _metrics.start()
+    return _metrics
+
+
+def get_metrics() -> MetricAggregator:
+    return _metrics
+
+
 def emit_metric(metric_name: str, value: float, **labels: str) -> None:
-    """Stub for pushing metrics to Cloud Monitoring."""
+    """Add ``value`` to a counter; totals reach the logs on the next flush."""
+
+    _metrics.increment(metric_name, value, **labels)
+
+
+def record_gauge(metric_name: str, value: float, **labels: str) -> None:
+    """Set a gauge; its latest value reaches the logs on every flush."""
+
+    _metrics.set_gauge(metric_name, value, **labels)
+
+
+def record_latency(metric_name: str, latency_ms: float, **labels: str) -> None:
+    """Record one latency observation in a histogram."""
 
-    logger = get_logger("metrics")
-    logger.info("metric_emit", metric_name=metric_name, value=value, labels=labels)
+    _metrics.observe(metric_name, latency_ms, **labels)
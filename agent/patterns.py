@@ -0,0 +1,42 @@
+"""Shared helpers for building fast phrase-matching regular expressions."""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable
+
+
+def normalize_phrase(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+def trie_pattern(phrases: Iterable[str]) -> str:
+    """Build a prefix-factored regex so each offset is tried against one branch.
+
+    Spaces inside a phrase match any run of whitespace. Longer phrases win over
+    their prefixes because the continuation is an optional greedy group.
+    """
+
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: Dict[str, Any]) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + emit(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie) or "(?!)"
+
+
+def is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
@@ -0,0 +1,163 @@
+"""Single-pass ``key: value`` field extraction for chat messages."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .patterns import normalize_phrase, trie_pattern
+
+_QUOTED_RE = re.compile(r"\"((?:[^\"\\]|\\.)*)\"|'((?:[^'\\]|\\.)*)'", re.S)
+_UNQUOTED_RE = re.compile(r"[^;\\]*(?:\\.[^;\\]*)*", re.S)
+_ESCAPE_RE = re.compile(r"\\(.)", re.S)
+_ID_RANGE_RE = re.compile(
+    r"(?<![\w.:-])(\d+)(?:\s*(?:-|\.\.|to)\s*(\d+))?(?![\w.])", re.IGNORECASE
+)
+_STATUS_WORD_RE = re.compile(r"(?<!\w)(done|open|in[\s_]+progress)(?!\w)", re.I)
+
+MAX_BULK_IDS = 100
+
+
+def _status(value: str) -> str:
+    return "_".join(value.lower().split())
+
+
+def _tags(value: str) -> List[str]:
+    return [tag.strip() for tag in value.split(",") if tag.strip()]
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """A recognised ``name: value`` field.
+
+    ``convert`` turns the raw text into a typed value (raising ValueError on bad
+    input) and ``single_token`` stops the value at the first whitespace.
+    """
+
+    name: str
+    convert: Callable[[str], Any] = str
+    aliases: Tuple[str, ...] = ()
+    single_token: bool = False
+
+
+DEFAULT_FIELDS: Tuple[FieldSpec, ...] = (
+    FieldSpec("title"),
+    FieldSpec("description", aliases=("desc",)),
+    FieldSpec("status", convert=_status),
+    FieldSpec("id", single_token=True),
+    FieldSpec("priority", convert=int),
+    FieldSpec("due", convert=date.fromisoformat, aliases=("due date", "due_date")),
+    FieldSpec("tags", convert=_tags, aliases=("tag",)),
+)
+
+
+@dataclass
+class ParsedPayload:
+    fields: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+    # Offset of the first field name; text before it is the free-form command.
+    command_end: int = 0
+
+
+def parse_id_list(text: str, limit: int = MAX_BULK_IDS) -> List[str]:
+    """Expand "1, 4, 7 and 9" or "3-12" into ordered, de-duplicated ids."""
+
+    ids: Dict[str, None] = {}
+    for match in _ID_RANGE_RE.finditer(text):
+        low = int(match.group(1))
+        high = int(match.group(2)) if match.group(2) else low
+        if high < low:
+            low, high = high, low
+        if len(ids) + (high - low + 1) > limit:
+            raise ValueError(f"at most {limit} todos can be changed at once")
+        for todo_id in range(low, high + 1):
+            ids[str(todo_id)] = None
+    return list(ids)
+
+
+def parse_status_word(text: str) -> Optional[str]:
+    """Find a bare status such as "done" or "in progress" in free text."""
+
+    match = _STATUS_WORD_RE.search(text)
+    return _status(match.group(1)) if match else None
+
+
+class PayloadParser:
+    """Extract registered fields from free text in one left-to-right pass.
+
+    Field names are found with a single precompiled regex. Each value runs until
+    an unescaped ``;`` or the next field name, may be single- or double-quoted,
+    and ``\\;`` yields a literal semicolon. The first occurrence of a field wins.
+    """
+
+    def __init__(self, fields: Iterable[FieldSpec] = DEFAULT_FIELDS) -> None:
+        self._specs: Dict[str, FieldSpec] = {}
+        for spec in fields:
+            self.register(spec, compile_pattern=False)
+        self._compile()
+
+    def register(self, spec: FieldSpec, compile_pattern: bool = True) -> None:
+        for name in (spec.name, *spec.aliases):
+            self._specs[normalize_phrase(name)] = spec
+        if compile_pattern:
+            self._compile()
+
+    def _compile(self) -> None:
+        # Field names are only looked for right before a colon, so long values
+        # without colons cost a single C-level ``str.find`` scan.
+        self._name_re = re.compile(
+            rf"(?<!\w)({trie_pattern(self._specs)})\s*$", re.IGNORECASE
+        )
+        self._window = max(len(name) for name in self._specs) + 8
+
+    def _keys(self, text: str) -> List[Tuple[FieldSpec, int, int]]:
+        keys = []
+        length = len(text)
+        colon = text.find(":")
+        while colon >= 0:
+            match = self._name_re.search(text, max(0, colon - self._window), colon)
+            if match:
+                value_start = colon + 1
+                while value_start < length and text[value_start].isspace():
+                    value_start += 1
+                name = match.group(1).lower()
+                spec = self._specs.get(name) or self._specs[normalize_phrase(name)]
+                keys.append((spec, match.start(), value_start))
+            colon = text.find(":", colon + 1)
+        return keys
+
+    def parse(self, text: str) -> ParsedPayload:
+        keys = self._keys(text)
+        result = ParsedPayload(command_end=keys[0][1] if keys else len(text))
+        consumed = 0
+        for index, (spec, start, value_start) in enumerate(keys):
+            if start < consumed:
+                continue  # this "name:" sat inside an earlier quoted value
+            limit = keys[index + 1][1] if index + 1 < len(keys) else len(text)
+            quoted = _QUOTED_RE.match(text, value_start)
+            if quoted:
+                raw = (
+                    quoted.group(1) if quoted.group(1) is not None else quoted.group(2)
+                )
+                consumed = quoted.end()
+            else:
+                end = text.find(";", value_start, limit)
+                raw = text[value_start : limit if end < 0 else end]
+                if "\\" in raw:
+                    unquoted = _UNQUOTED_RE.match(text, value_start, limit)
+                    raw = unquoted.group(0) if unquoted else ""
+                consumed = value_start + len(raw)
+                raw = raw.strip()
+                if spec.single_token:
+                    raw = raw.split(None, 1)[0] if raw else ""
+            if "\\" in raw:
+                raw = _ESCAPE_RE.sub(r"\1", raw)
+            if not raw or spec.name in result.fields or spec.name in result.errors:
+                continue
+            try:
+                result.fields[spec.name] = spec.convert(raw)
+            except ValueError as exc:
+                result.errors[spec.name] = str(exc)
+        return result
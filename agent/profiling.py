@@ -0,0 +1,263 @@
+"""Opt-in profiling that can stay switched on in production.
+
+``PROFILE_MODE=sample`` runs ``StackSampler``: a background thread that looks
+at every thread's stack at a fixed interval, so overhead depends on the
+sampling rate rather than on how much code runs. ``PROFILE_MODE=cprofile``
+runs ``cProfile`` on one handled message in every ``PROFILE_EVERY_N_CALLS``.
+Either way the aggregated profile is written to ``PROFILE_DIR`` every
+``PROFILE_DUMP_SECONDS``, on ``SIGUSR1`` and at shutdown; ``SIGUSR2`` pauses
+and resumes collection.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import itertools
+import os
+import pstats
+import signal
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from types import FrameType
+from typing import ContextManager, Iterator, List, Optional
+
+from .observability import get_logger
+
+PROFILE_MODES = ("off", "sample", "cprofile")
+
+
+class StackSampler:
+    """Count how often each call stack is seen across all threads.
+
+    Stacks are kept in collapsed form (``outer;inner;leaf``), which is what
+    flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval_seconds: float = 0.01, max_depth: int = 64) -> None:
+        self.interval_seconds = interval_seconds
+        self.max_depth = max_depth
+        self.samples = 0
+        self._counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take(self) -> Counter[str]:
+        """Return the stacks counted so far and start a new window."""
+
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self.samples = 0
+        return counts
+
+    def write(self, path: str) -> int:
+        """Write the current window to ``path``; nothing is written if it is empty."""
+
+        counts = self.take()
+        if not counts:
+            return 0
+        with open(path, "w", encoding="utf-8") as handle:
+            for stack, count in counts.most_common():
+                handle.write(f"{stack} {count}\n")
+        return sum(counts.values())
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            stacks = [
+                self._collapse(frame)
+                for thread_id, frame in sys._current_frames().items()
+                if thread_id != own
+            ]
+            with self._lock:
+                self._counts.update(stacks)
+                self.samples += 1
+
+    def _collapse(self, frame: Optional[FrameType]) -> str:
+        names: List[str] = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+class CallProfiler:
+    """Profile one call in every ``every`` with ``cProfile`` and merge the results.
+
+    Only one call is profiled at a time; a sampled call that overlaps one
+    already being profiled is skipped.
+    """
+
+    def __init__(self, every: int = 100) -> None:
+        self.every = every
+        self.profiled = 0
+        self._calls = itertools.count(1)
+        self._busy = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats: Optional[pstats.Stats] = None
+
+    @contextmanager
+    def profile(self) -> Iterator[None]:
+        if next(self._calls) % self.every or not self._busy.acquire(blocking=False):
+            yield
+            return
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+            with self._stats_lock:
+                if self._stats is None:
+                    self._stats = pstats.Stats(profiler)
+                else:
+                    self._stats.add(profiler)
+                self.profiled += 1
+        finally:
+            self._busy.release()
+
+    def write(self, path: str) -> int:
+        with self._stats_lock:
+            stats, self._stats = self._stats, None
+            profiled, self.profiled = self.profiled, 0
+        if stats is None:
+            return 0
+        stats.dump_stats(path)
+        return profiled
+
+
+class Profiler:
+    """The profiler selected by ``PROFILE_MODE`` plus its dump schedule."""
+
+    def __init__(
+        self,
+        mode: str = "off",
+        dump_dir: Optional[str] = None,
+        dump_interval_seconds: float = 0.0,
+        sample_interval_ms: int = 10,
+        every_n_calls: int = 100,
+    ) -> None:
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"unknown profile mode {mode!r}")
+        self.mode = mode
+        self.dump_dir = dump_dir or os.path.join(
+            tempfile.gettempdir(), "todo-agent-profiles"
+        )
+        self.dump_interval_seconds = dump_interval_seconds
+        self.paused = False
+        self._sampler = (
+            StackSampler(sample_interval_ms / 1000) if mode == "sample" else None
+        )
+        self._calls = CallProfiler(every_n_calls) if mode == "cprofile" else None
+        self._stop = threading.Event()
+        self._dumper: Optional[threading.Thread] = None
+        self._dumps = itertools.count(1)
+        self.logger = get_logger("profiling")
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def call(self) -> ContextManager[None]:
+        """Wrap the handling of one message; a no-op unless in cprofile mode."""
+
+        if self._calls is None or self.paused:
+            return nullcontext()
+        return self._calls.profile()
+
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        os.makedirs(self.dump_dir, exist_ok=True)
+        if self._sampler is not None:
+            self._sampler.start()
+        if self.dump_interval_seconds > 0 and self._dumper is None:
+            self._dumper = threading.Thread(
+                target=self._dump_periodically, name="profile-dump", daemon=True
+            )
+            self._dumper.start()
+        self.logger.info("profiling_started", mode=self.mode, dump_dir=self.dump_dir)
+
+    def stop(self) -> None:
+        if not self.enabled:
+            return
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.dump()
+
+    def toggle(self) -> None:
+        """Pause or resume collection; what was collected so far is kept."""
+
+        self.paused = not self.paused
+        if self._sampler is not None:
+            if self.paused:
+                self._sampler.stop()
+            else:
+                self._sampler.start()
+        self.logger.info("profiling_toggled", paused=self.paused)
+
+    def dump(self) -> Optional[str]:
+        """Write what was collected since the last dump; return the file path."""
+
+        # The sequence number keeps a SIGUSR1 dump and a timer dump landing in
+        # the same second from overwriting each other.
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        name = f"profile-{os.getpid()}-{stamp}-{next(self._dumps):04d}"
+        base = os.path.join(self.dump_dir, name)
+        if self._sampler is not None:
+            path = base + ".collapsed"
+            count = self._sampler.write(path)
+        elif self._calls is not None:
+            path = base + ".pstats"
+            count = self._calls.write(path)
+        else:
+            return None
+        if not count:
+            return None
+        self.logger.info("profile_dumped", path=path, samples=count)
+        return path
+
+    def install_signal_handlers(self) -> None:
+        """``SIGUSR1`` dumps now, ``SIGUSR2`` pauses or resumes (main thread only)."""
+
+        if not self.enabled or not hasattr(signal, "SIGUSR1"):
+            return
+        # Work off the signal handler so it never waits on a lock the
+        # interrupted main thread may be holding.
+        signal.signal(
+            signal.SIGUSR1,
+            lambda *_: threading.Thread(target=self.dump, daemon=True).start(),
+        )
+        signal.signal(
+            signal.SIGUSR2,
+            lambda *_: threading.Thread(target=self.toggle, daemon=True).start(),
+        )
+
+    def _dump_periodically(self) -> None:
+        while not self._stop.wait(self.dump_interval_seconds):
+            try:
+                self.dump()
+            except OSError as exc:
+                self.logger.warning("profile_dump_failed", error=str(exc))
@@ -0,0 +1,146 @@
+"""Token-bucket rate limiting shared by the Todo tools."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+_current_key: ContextVar[Optional[str]] = ContextVar("rate_limit_key", default=None)
+
+
+@contextmanager
+def rate_limit_scope(key: Optional[str]) -> Iterator[None]:
+    """Charge tool calls made inside the block to the bucket for ``key``."""
+
+    token = _current_key.set(key)
+    try:
+        yield
+    finally:
+        _current_key.reset(token)
+
+
+def current_rate_limit_key() -> Optional[str]:
+    return _current_key.get()
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Thread-safe token bucket with continuous refill and optional per-key buckets.
+
+    Every call draws from a global bucket of ``rate_per_minute`` tokens. When
+    ``per_key_rate_per_minute`` is set, calls made with a key (a user or
+    session id) must also find a token in that key's bucket; at most
+    ``max_keys`` key buckets are kept, least recently used first out.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: int,
+        per_key_rate_per_minute: int = 0,
+        max_keys: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.capacity = float(rate_per_minute)
+        self.per_key_capacity = float(per_key_rate_per_minute)
+        self.max_keys = max_keys
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._global = _Bucket(self.capacity, clock())
+        self._buckets: "OrderedDict[str, _Bucket]" = OrderedDict()
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(self._global, self.capacity, self._clock())
+            return self._global.tokens
+
+    @tokens.setter
+    def tokens(self, value: float) -> None:
+        with self._lock:
+            self._global.tokens = float(value)
+            self._global.updated = self._clock()
+
+    @staticmethod
+    def _refill(bucket: _Bucket, capacity: float, now: float) -> None:
+        elapsed = now - bucket.updated
+        if elapsed > 0:
+            bucket.tokens = min(capacity, bucket.tokens + elapsed * capacity / 60)
+            bucket.updated = now
+
+    def _key_bucket(self, key: str, now: float) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(self.per_key_capacity, now)
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def _try_acquire(self, key: Optional[str]) -> float:
+        """Take a token if one is available; otherwise return seconds to wait."""
+
+        with self._lock:
+            now = self._clock()
+            buckets = [(self._global, self.capacity)]
+            if key is not None and self.per_key_capacity > 0:
+                buckets.append((self._key_bucket(key, now), self.per_key_capacity))
+            wait = 0.0
+            for bucket, capacity in buckets:
+                self._refill(bucket, capacity, now)
+                if bucket.tokens < 1:
+                    wait = max(wait, (1 - bucket.tokens) * 60 / capacity)
+            if wait:
+                return wait
+            for bucket, _ in buckets:
+                bucket.tokens -= 1
+            return 0.0
+
+    def allow(self, key: Optional[str] = None) -> bool:
+        return self._try_acquire(key) == 0.0
+
+    def acquire(
+        self, timeout: Optional[float] = None, key: Optional[str] = None
+    ) -> bool:
+        """Block until a token is available or ``timeout`` seconds have passed."""
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._try_acquire(key)
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            time.sleep(wait)
+
+    async def acquire_async(
+        self, timeout: Optional[float] = None, key: Optional[str] = None
+    ) -> bool:
+        """Like ``acquire`` but yields to the event loop while waiting."""
+
+        import asyncio  # already loaded whenever this runs; kept off import time
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = self._try_acquire(key)
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or wait > remaining:
+                    return False
+            await asyncio.sleep(wait)
@@ -0,0 +1,244 @@
+"""Durable local replica of the todo collection, kept current by delta sync."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .models import TodoItem
+from .observability import emit_metric, get_logger
+
+
+class _Pending:
+    __slots__ = ("writes", "previous")
+
+    def __init__(self, previous: Optional[TodoItem]) -> None:
+        self.writes = 1
+        self.previous = previous
+
+
+class TodoReplica:
+    """Local copy of the whole collection in sqlite, read from memory.
+
+    Reads never touch the network or the disk: they return a snapshot of an
+    in-memory dict that is replaced, not mutated, on every change, so they
+    need no lock. A sync (``apply_sync`` after a 200, ``mark_synced`` after a
+    304 on the stored ETag) writes only the rows that changed. A new replica
+    on the same ``path`` starts from what was last written, so a restart does
+    not need a full fetch.
+
+    Writes may be shown before the API confirms them: ``begin_write`` applies
+    one locally, ``commit_write`` stores the server's answer and
+    ``rollback_write`` undoes it. While a write is pending, syncs leave that
+    todo alone.
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._todos: Dict[str, TodoItem] = {}
+        self._positions: Dict[str, int] = {}  # as stored in sqlite
+        self._validators: Tuple[Optional[str], Optional[str]] = (None, None)
+        self._synced_at: Optional[float] = None
+        self._pending: Dict[str, _Pending] = {}
+        self.logger = get_logger("replica")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._todos)
+
+    @property
+    def ready(self) -> bool:
+        """Whether the replica has ever been synced, here or before a restart."""
+
+        return self._synced_at is not None
+
+    def age(self) -> float:
+        """Seconds since the last successful sync (infinite if never synced)."""
+
+        synced_at = self._synced_at
+        return float("inf") if synced_at is None else self._clock() - synced_at
+
+    def list(self, status: Optional[str] = None) -> List[TodoItem]:
+        todos = self._todos.values()
+        if status is None:
+            return list(todos)
+        return [todo for todo in todos if todo.status == status]
+
+    def get(self, todo_id: str) -> Optional[TodoItem]:
+        return self._todos.get(str(todo_id))
+
+    def validators(self) -> Tuple[Optional[str], Optional[str]]:
+        return self._validators
+
+    def apply_sync(
+        self,
+        todos: Iterable[TodoItem],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> int:
+        """Reconcile with a full listing from the API; return the rows changed."""
+
+        with self._lock:
+            current = self._todos
+            merged: Dict[str, TodoItem] = {}
+            for todo in todos:
+                if todo.id is None:
+                    continue
+                todo_id = str(todo.id)
+                if todo_id in self._pending:
+                    local = current.get(todo_id)
+                    if local is None:
+                        continue  # deleted locally; the delete is in flight
+                    todo = local
+                merged[todo_id] = todo
+            for todo_id in self._pending:
+                if todo_id not in merged and todo_id in current:
+                    merged[todo_id] = current[todo_id]
+            changed = [
+                todo_id
+                for todo_id, todo in merged.items()
+                if current.get(todo_id) != todo
+            ]
+            removed = [todo_id for todo_id in current if todo_id not in merged]
+            self._todos = merged
+            self._validators = (etag, last_modified)
+            self._synced_at = self._clock()
+            self._persist(changed, removed)
+        emit_metric("todo_replica_sync", 1, result="changed" if changed else "same")
+        if changed or removed:
+            self.logger.info(
+                "replica_synced", changed=len(changed), removed=len(removed)
+            )
+        return len(changed) + len(removed)
+
+    def mark_synced(self) -> Optional[List[TodoItem]]:
+        """Record a 304 for the stored validators; return the todos if ready."""
+
+        if not self.ready:
+            return None
+        with self._lock:
+            self._synced_at = self._clock()
+            self._persist((), ())
+        emit_metric("todo_replica_sync", 1, result="not_modified")
+        return self.list()
+
+    def begin_write(self, todo_id: str, optimistic: Optional[TodoItem]) -> None:
+        """Show ``optimistic`` (None for a delete) until the write settles."""
+
+        todo_id = str(todo_id)
+        with self._lock:
+            pending = self._pending.get(todo_id)
+            if pending is None:
+                self._pending[todo_id] = _Pending(self._todos.get(todo_id))
+            else:
+                pending.writes += 1
+            self._todos = self._replaced(todo_id, optimistic)
+
+    def commit_write(self, todo_id: str, todo: Optional[TodoItem]) -> None:
+        """Store the API's view of a finished write (None once deleted)."""
+
+        todo_id = str(todo_id)
+        with self._lock:
+            self._settle(todo_id)
+            self._todos = self._replaced(todo_id, todo)
+            if todo is None:
+                self._persist((), (todo_id,))
+            else:
+                self._persist((todo_id,), ())
+
+    def rollback_write(self, todo_id: str) -> None:
+        """Undo a failed ``begin_write``; later writes to the same id win."""
+
+        todo_id = str(todo_id)
+        with self._lock:
+            pending = self._settle(todo_id)
+            if pending is not None and todo_id not in self._pending:
+                self._todos = self._replaced(todo_id, pending.previous)
+
+    def _settle(self, todo_id: str) -> Optional[_Pending]:
+        pending = self._pending.get(todo_id)
+        if pending is not None:
+            pending.writes -= 1
+            if not pending.writes:
+                del self._pending[todo_id]
+        return pending
+
+    def _replaced(self, todo_id: str, todo: Optional[TodoItem]) -> Dict[str, TodoItem]:
+        # Copy on write so readers can iterate the old dict without a lock.
+        todos = dict(self._todos)
+        if todo is None:
+            todos.pop(todo_id, None)
+        else:
+            todos[todo_id] = todo
+        return todos
+
+    def _persist(self, upserts: Sequence[str], removed: Sequence[str]) -> None:
+        """Write ``upserts``, drop ``removed`` and renumber rows that moved.
+
+        Stored positions only have to increase along the list. Rows that
+        already do keep theirs; an inserted or moved row and every row after
+        it that it pushed out of order get the next free position.
+        """
+
+        wanted = set(upserts)
+        rows = []
+        last = -1
+        for todo_id, todo in self._todos.items():
+            stored = self._positions.get(todo_id)
+            if stored is not None and stored > last:
+                last = position = stored
+                if todo_id not in wanted:
+                    continue
+            else:
+                last = position = last + 1
+                if stored is None and todo_id not in wanted:
+                    continue  # an optimistic write the API has not confirmed
+            rows.append((todo_id, position, json.dumps(todo.to_dict())))
+        etag, last_modified = self._validators
+        meta = [
+            ("etag", etag),
+            ("last_modified", last_modified),
+            ("synced_at", None if self._synced_at is None else str(self._synced_at)),
+        ]
+        with closing(self._connect()) as db, db:
+            db.executemany("INSERT OR REPLACE INTO todos VALUES (?, ?, ?)", rows)
+            db.executemany(
+                "DELETE FROM todos WHERE id = ?", [(todo_id,) for todo_id in removed]
+            )
+            db.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta)
+        for todo_id, position, _ in rows:
+            self._positions[todo_id] = position
+        for todo_id in removed:
+            self._positions.pop(todo_id, None)
+
+    def _load(self) -> None:
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT id, position, payload FROM todos ORDER BY position"
+            ).fetchall()
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+        self._todos = {}
+        for todo_id, position, payload in rows:
+            self._todos[todo_id] = TodoItem.from_api(json.loads(payload))
+            self._positions[todo_id] = position
+        self._validators = (meta.get("etag"), meta.get("last_modified"))
+        synced_at = meta.get("synced_at")
+        self._synced_at = float(synced_at) if synced_at else None
+        self.logger.info("replica_loaded", count=len(rows), ready=self.ready)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS todos"
+            " (id TEXT PRIMARY KEY, position INTEGER, payload TEXT)"
+        )
+        db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return db
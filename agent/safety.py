@@ -0,0 +1,175 @@
+"""One compiled policy for rejecting unsafe input in messages and todo fields."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .observability import emit_metric, get_logger
+from .patterns import normalize_phrase, trie_pattern
+
+DEFAULT_BLOCKED_PHRASES: Tuple[str, ...] = ("/rm", "drop table", "delete from")
+# Checked only in todo fields: "a -- b" is a fine message but no title needs it.
+DEFAULT_FIELD_PHRASES: Tuple[str, ...] = ("--",)
+
+
+@dataclass(frozen=True)
+class SafetyMatch:
+    rule: str
+    span: Tuple[int, int]
+
+
+class UnsafeContentError(ValueError):
+    def __init__(self, message: str, match: SafetyMatch) -> None:
+        super().__init__(message)
+        self.match = match
+
+
+class SafetyPolicy:
+    """Blocked phrases and named regex rules, checked against lowercased text.
+
+    Phrases match anywhere in the text, with any run of whitespace standing in
+    for a space. They are compiled into one prefix-factored regex, so adding
+    phrases barely changes the cost of a check. ``patterns`` maps rule names
+    to regexes, which see the text lowercased. Each runs as its own compiled
+    search so ``re`` can skip ahead on its literal prefix; measured, that
+    beats one big alternation. ``check`` reports the first rule that matches.
+    ``field_phrases`` apply only to todo fields (``in_field=True``, as
+    ``validate`` does), not to whole messages.
+    """
+
+    def __init__(
+        self,
+        phrases: Iterable[str] = DEFAULT_BLOCKED_PHRASES,
+        patterns: Optional[Mapping[str, str]] = None,
+        field_phrases: Iterable[str] = DEFAULT_FIELD_PHRASES,
+    ) -> None:
+        self._compiled = self._compile(phrases, patterns or {}, field_phrases)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SafetyPolicy":
+        """Load ``{"phrases": [...], "patterns": {...}, "field_phrases": [...]}``."""
+
+        return cls(*_read_policy(path))
+
+    @property
+    def size(self) -> int:
+        _, phrase_count, rules, _ = self._compiled
+        return phrase_count + len(rules)
+
+    def check(self, text: str, in_field: bool = False) -> Optional[SafetyMatch]:
+        phrases, _, rules, field_phrases = self._compiled
+        lowered = text.lower()
+        match = phrases.search(lowered)
+        if match is None and in_field:
+            match = field_phrases.search(lowered)
+        if match is not None:
+            return SafetyMatch(" ".join(match.group().split()), match.span())
+        for name, rule in rules:
+            match = rule.search(lowered)
+            if match is not None:
+                return SafetyMatch(name, match.span())
+        return None
+
+    def validate(self, text: str, field: str = "input") -> str:
+        """Return ``text`` unchanged, or raise ``UnsafeContentError``."""
+
+        match = self.check(text, in_field=True)
+        if match is not None:
+            emit_metric("unsafe_input_blocked", 1, field=field)
+            raise UnsafeContentError("Input rejected due to unsafe content.", match)
+        return text
+
+    @staticmethod
+    def _compile(
+        phrases: Iterable[str],
+        patterns: Mapping[str, str],
+        field_phrases: Iterable[str],
+    ) -> Tuple[
+        "re.Pattern[str]", int, List[Tuple[str, "re.Pattern[str]"]], "re.Pattern[str]"
+    ]:
+        normalized = {normalize_phrase(phrase) for phrase in phrases}
+        normalized.discard("")
+        field_only = {normalize_phrase(phrase) for phrase in field_phrases}
+        field_only -= normalized | {""}
+        rules = [(name, re.compile(regex)) for name, regex in patterns.items()]
+        return (
+            re.compile(trie_pattern(normalized)),
+            len(normalized) + len(field_only),
+            rules,
+            re.compile(trie_pattern(field_only)),
+        )
+
+
+class ReloadingSafetyPolicy(SafetyPolicy):
+    """A ``SafetyPolicy`` read from a file and reloaded when the file changes.
+
+    The file's modification time is looked at no more than once every
+    ``check_interval`` seconds. A file that fails to load is logged and the
+    rules already in force stay in place.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        check_interval: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.path = path
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.logger = get_logger("safety")
+        self._stamp = self._file_stamp()
+        super().__init__(*_read_policy(path))
+        self._next_check = clock() + check_interval
+
+    def check(self, text: str, in_field: bool = False) -> Optional[SafetyMatch]:
+        if self._clock() >= self._next_check:
+            self.reload_if_changed()
+        return super().check(text, in_field)
+
+    def reload_if_changed(self) -> bool:
+        with self._lock:
+            self._next_check = self._clock() + self.check_interval
+            try:
+                stamp = self._file_stamp()
+                if stamp == self._stamp:
+                    return False
+                self._compiled = self._compile(*_read_policy(self.path))
+            except (OSError, ValueError, re.error) as exc:
+                self.logger.warning(
+                    "safety_policy_reload_failed", path=self.path, error=str(exc)
+                )
+                return False
+            self._stamp = stamp
+        self.logger.info("safety_policy_reloaded", path=self.path, rules=self.size)
+        return True
+
+    def _file_stamp(self) -> Tuple[int, int]:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+
+def _read_policy(path: str) -> Tuple[List[str], Dict[str, str], List[str]]:
+    with open(path, encoding="utf-8") as handle:
+        table = json.load(handle)
+    phrases = table.get("phrases", list(DEFAULT_BLOCKED_PHRASES))
+    patterns = table.get("patterns", {})
+    field_phrases = table.get("field_phrases", list(DEFAULT_FIELD_PHRASES))
+    if (
+        not isinstance(phrases, list)
+        or not isinstance(field_phrases, list)
+        or not isinstance(patterns, dict)
+    ):
+        raise ValueError("phrases must be lists and patterns an object")
+    return (
+        [str(phrase) for phrase in phrases],
+        {str(name): str(regex) for name, regex in patterns.items()},
+        [str(phrase) for phrase in field_phrases],
+    )
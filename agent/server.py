@@ -0,0 +1,201 @@
+"""Async HTTP front end exposing the deployed ``{"query"} -> {"reply"}`` contract."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import socket
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from aiohttp import web
+
+from .main import Message, TodoOrchestrator
+from .observability import emit_metric, get_logger
+
+MAX_QUERY_CHARS = 4_000
+
+
+class ServerBusy(Exception):
+    """Raised when the admission queue is full; surfaced as HTTP 429."""
+
+
+class AgentServer:
+    """Serve ``TodoOrchestrator.handle_async`` to many sessions at once.
+
+    At most ``max_concurrency`` messages are handled at a time and at most
+    ``max_queue`` more may wait for a slot; anything beyond that is rejected
+    with 429 and a ``Retry-After`` hint. On shutdown new requests get 503
+    while in-flight ones are given ``drain_seconds`` to finish. A body with
+    ``"stream": true`` gets the reply as chunked plain text instead of JSON.
+    """
+
+    def __init__(
+        self,
+        agent: TodoOrchestrator,
+        max_concurrency: int = 32,
+        max_queue: int = 128,
+        drain_seconds: float = 10.0,
+        retry_after_seconds: int = 1,
+    ) -> None:
+        self.agent = agent
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.drain_seconds = drain_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._waiting = 0
+        self._active = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._draining = False
+        self.logger = get_logger("server")
+
+    def build_app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024)
+        app.router.add_post("/", self.handle_query)
+        app.router.add_post("/query", self.handle_query)
+        app.router.add_get("/healthz", self.handle_health)
+        app.on_shutdown.append(self._drain)
+        app.on_cleanup.append(self._close_agent)
+        return app
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "waiting": self._waiting,
+            "draining": self._draining,
+        }
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        status = 503 if self._draining else 200
+        return web.json_response(self.stats(), status=status)
+
+    async def handle_query(self, request: web.Request) -> web.StreamResponse:
+        if self._draining:
+            return self._reject(503, "Server is shutting down.")
+        try:
+            body = await request.json()
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return web.json_response({"error": "Body must be JSON."}, status=400)
+        query = body.get("query") if isinstance(body, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            return web.json_response({"error": "'query' is required."}, status=400)
+        if len(query) > MAX_QUERY_CHARS:
+            return web.json_response({"error": "'query' is too long."}, status=413)
+        session_id = body.get("session_id")
+        if session_id is not None and not isinstance(session_id, str):
+            return web.json_response(
+                {"error": "'session_id' must be a string."}, status=400
+            )
+        message = Message(role="user", content=query, session_id=session_id)
+        try:
+            async with self._admitted():
+                if body.get("stream"):
+                    return await self._stream_reply(request, message)
+                reply = await self.agent.handle_async(message)
+        except ServerBusy:
+            return self._reject(429, "Too many requests in flight; retry shortly.")
+        except ValueError as exc:  # unsafe input rejected by the orchestrator
+            return web.json_response({"error": str(exc)}, status=400)
+        return web.json_response({"reply": reply})
+
+    async def _stream_reply(
+        self, request: web.Request, message: Message
+    ) -> web.StreamResponse:
+        """Send the reply as chunked plain text while it is being produced."""
+
+        response = web.StreamResponse(
+            headers={"Content-Type": "text/plain; charset=utf-8"}
+        )
+        response.enable_chunked_encoding()
+        chunks = self.agent.handle_stream_async(message)
+        # Take the first chunk before sending headers so that a rejected
+        # message still becomes a 400 rather than a cut-off 200.
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = ""
+        await response.prepare(request)
+        await response.write(first.encode("utf-8"))
+        async for chunk in chunks:
+            await response.write(chunk.encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    @asynccontextmanager
+    async def _admitted(self) -> AsyncIterator[None]:
+        if self._slots.locked():
+            if self._waiting >= self.max_queue:
+                emit_metric("server_rejected", 1, reason="queue_full")
+                raise ServerBusy()
+            self._waiting += 1
+            try:
+                await self._slots.acquire()
+            finally:
+                self._waiting -= 1
+        else:
+            await self._slots.acquire()
+        self._active += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            if not self._active:
+                self._idle.set()
+            self._slots.release()
+
+    def _reject(self, status: int, message: str) -> web.Response:
+        return web.json_response(
+            {"error": message},
+            status=status,
+            headers={"Retry-After": str(self.retry_after_seconds)},
+        )
+
+    async def _drain(self, app: web.Application) -> None:
+        self._draining = True
+        self.logger.info("server_draining", active=self._active, waiting=self._waiting)
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=self.drain_seconds)
+        except asyncio.TimeoutError:
+            self.logger.warning("server_drain_timeout", active=self._active)
+
+    async def _close_agent(self, app: web.Application) -> None:
+        await self.agent.aclose()
+        self.agent.close()
+
+
+def serve(
+    agent: TodoOrchestrator,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_concurrency: int = 32,
+    max_queue: int = 128,
+    drain_seconds: float = 10.0,
+    keepalive_seconds: float = 75.0,
+    sock: Optional[socket.socket] = None,
+) -> None:
+    """Run the HTTP front end until interrupted.
+
+    Pass ``sock`` to accept on an already bound socket instead of ``host:port``.
+    """
+
+    async def build() -> web.Application:
+        # Created inside the running loop so the semaphore binds to it.
+        return AgentServer(
+            agent,
+            max_concurrency=max_concurrency,
+            max_queue=max_queue,
+            drain_seconds=drain_seconds,
+        ).build_app()
+
+    address: Dict[str, Any] = {"sock": sock} if sock else {"host": host, "port": port}
+    web.run_app(
+        build(),
+        **address,
+        shutdown_timeout=drain_seconds,
+        keepalive_timeout=keepalive_seconds,
+        access_log=None,
+        print=None,
+    )
@@ -0,0 +1,206 @@
+"""Per-session conversation state bounded by ``MAX_CONTEXT_TOKENS``."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Iterable, List, Optional, Set, Tuple
+
+from .observability import emit_metric, get_logger
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate: roughly four characters per token, at least one."""
+
+    return len(text) // 4 + 1
+
+
+class Turn:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role: str, content: str, tokens: int) -> None:
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+
+
+class Session:
+    """One conversation: recent turns within a token budget and the last todo ids."""
+
+    __slots__ = ("session_id", "turns", "tokens", "last_active", "last_todo_ids")
+
+    def __init__(self, session_id: str, last_active: float) -> None:
+        self.session_id = session_id
+        self.turns: Deque[Turn] = deque()
+        self.tokens = 0
+        self.last_active = last_active
+        self.last_todo_ids: Tuple[str, ...] = ()
+
+    def append(self, role: str, content: str, max_tokens: int) -> None:
+        turn = Turn(role, content, estimate_tokens(content))
+        self.turns.append(turn)
+        self.tokens += turn.tokens
+        # Drop the oldest turns first but always keep the newest one.
+        while self.tokens > max_tokens and len(self.turns) > 1:
+            self.tokens -= self.turns.popleft().tokens
+
+    def context(self) -> List[Tuple[str, str]]:
+        return [(turn.role, turn.content) for turn in self.turns]
+
+
+class SessionStore:
+    """LRU of sessions with idle expiry and an optional sqlite snapshot.
+
+    Each session keeps only as many recent turns as fit in
+    ``max_context_tokens``. Sessions idle for ``idle_timeout`` seconds, or the
+    least recently used ones beyond ``max_sessions``, are evicted whole. With
+    ``snapshot_path`` set, ``save`` writes changed sessions to sqlite and a new
+    store reloads them, so a restart keeps conversations going.
+    """
+
+    def __init__(
+        self,
+        max_context_tokens: int,
+        max_sessions: int = 10_000,
+        idle_timeout: float = 1800.0,
+        snapshot_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.max_context_tokens = max_context_tokens
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.snapshot_path = snapshot_path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._dirty: Set[str] = set()
+        self._evicted: Set[str] = set()
+        self.evictions = 0
+        self.logger = get_logger("sessions")
+        if snapshot_path:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: Optional[str]) -> Session:
+        """Return the live session for ``session_id``, creating it if needed.
+
+        Without an id the caller gets a fresh session that is never stored, so
+        unrelated anonymous requests cannot see each other's context.
+        """
+
+        if not session_id:
+            return Session("", self._clock())
+        with self._lock:
+            now = self._clock()
+            self._evict_idle(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Session(session_id, now)
+                self._evicted.discard(session_id)
+                self._evict_overflow()
+            else:
+                self._sessions.move_to_end(session_id)
+                session.last_active = now
+            return session
+
+    def record(
+        self,
+        session_id: Optional[str],
+        role: str,
+        content: str,
+        todo_ids: Iterable[str] = (),
+    ) -> None:
+        if not session_id:
+            return
+        session = self.get(session_id)
+        with self._lock:
+            session.append(role, content, self.max_context_tokens)
+            todo_ids = tuple(todo_ids)
+            if todo_ids:
+                session.last_todo_ids = todo_ids
+            self._dirty.add(session.session_id)
+
+    def evict_idle(self) -> int:
+        with self._lock:
+            return self._evict_idle(self._clock())
+
+    def _evict_idle(self, now: float) -> int:
+        evicted = 0
+        # The OrderedDict is in least-recently-used order, so stop at the first
+        # session that is still active.
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_active < self.idle_timeout:
+                break
+            self._evict(session_id, "idle")
+            evicted += 1
+        return evicted
+
+    def _evict_overflow(self) -> None:
+        while len(self._sessions) > self.max_sessions:
+            self._evict(next(iter(self._sessions)), "lru")
+
+    def _evict(self, session_id: str, reason: str) -> None:
+        del self._sessions[session_id]
+        self._dirty.discard(session_id)
+        self._evicted.add(session_id)
+        self.evictions += 1
+        emit_metric("session_evicted", 1, reason=reason)
+
+    def save(self) -> None:
+        """Persist changed sessions and drop evicted ones from the snapshot."""
+
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            rows = [
+                (
+                    session.session_id,
+                    session.last_active,
+                    json.dumps(
+                        {
+                            "turns": session.context(),
+                            "last_todo_ids": session.last_todo_ids,
+                        }
+                    ),
+                )
+                for session in map(self._sessions.__getitem__, self._dirty)
+            ]
+            evicted = [(session_id,) for session_id in self._evicted]
+            self._dirty.clear()
+            self._evicted.clear()
+        with closing(self._connect()) as db, db:
+            db.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?)", rows)
+            db.executemany("DELETE FROM sessions WHERE session_id = ?", evicted)
+        self.logger.info("sessions_saved", saved=len(rows), removed=len(evicted))
+
+    def _load(self) -> None:
+        cutoff = self._clock() - self.idle_timeout
+        with closing(self._connect()) as db:
+            rows = db.execute(
+                "SELECT session_id, last_active, payload FROM sessions"
+                " WHERE last_active > ? ORDER BY last_active DESC LIMIT ?",
+                (cutoff, self.max_sessions),
+            ).fetchall()
+        for session_id, last_active, payload in reversed(rows):
+            data = json.loads(payload)
+            session = Session(session_id, last_active)
+            for role, content in data["turns"]:
+                session.append(role, content, self.max_context_tokens)
+            session.last_todo_ids = tuple(data["last_todo_ids"])
+            self._sessions[session_id] = session
+        self.logger.info("sessions_loaded", count=len(rows))
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.snapshot_path or ":memory:")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions"
+            " (session_id TEXT PRIMARY KEY, last_active REAL, payload TEXT)"
+        )
+        return db
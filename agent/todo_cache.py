@@ -0,0 +1,287 @@
+"""Per-item, write-through cache for todos fetched from the Todo API."""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from .observability import emit_metric
+
+Todo = Mapping[str, Any]
+TodoT = TypeVar("TodoT", bound=Todo)
+
+
+class _Entry(Generic[TodoT]):
+    __slots__ = ("item", "expires_at", "seq")
+
+    def __init__(self, item: TodoT, expires_at: float, seq: int) -> None:
+        self.item = item
+        self.expires_at = expires_at
+        self.seq = seq
+
+
+class QueryView(Generic[TodoT]):
+    """One cached page of a filtered query plus the validators it came with."""
+
+    __slots__ = ("items", "next_params", "etag", "last_modified", "expires_at")
+
+    def __init__(
+        self,
+        items: List[TodoT],
+        next_params: Optional[Dict[str, str]],
+        etag: Optional[str],
+        last_modified: Optional[str],
+        expires_at: float,
+    ) -> None:
+        self.items = items
+        self.next_params = next_params
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+
+
+class TodoCache(Generic[TodoT]):
+    """Todos keyed by id with a status index, per-entry TTL and LRU eviction.
+
+    The cache also remembers whether it holds the complete collection (set by
+    ``replace_all`` and lost on eviction), which is what allows ``list`` to be
+    answered without a round trip. Writes patch single entries via ``put`` and
+    ``remove`` so a create or update does not force the next list to refetch.
+
+    Filtered or paginated queries are cached separately as ``QueryView``s keyed
+    by their query string, together with the ETag/Last-Modified they were served
+    with. Expired views are kept (up to ``max_views``) so the next request can
+    be made conditional; any local write expires every view.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_items: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        max_views: int = 256,
+    ) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.max_views = max_views
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[str, _Entry[TodoT]]" = OrderedDict()
+        self._by_status: Dict[str, Set[str]] = {}
+        self._complete_until: Optional[float] = None
+        self._validators: Tuple[Optional[str], Optional[str]] = (None, None)
+        self._views: "OrderedDict[str, QueryView[TodoT]]" = OrderedDict()
+        self._seq = itertools.count()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def get(self, todo_id: str) -> Optional[TodoT]:
+        with self._lock:
+            entry = self._entries.get(todo_id)
+            if entry is None or entry.expires_at <= self._clock():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(todo_id)
+            self.hits += 1
+            return entry.item
+
+    def staleness(self) -> Optional[float]:
+        """Seconds since the complete collection expired (negative while fresh).
+
+        Returns None when the cache does not hold the complete collection.
+        """
+
+        with self._lock:
+            if self._complete_until is None:
+                return None
+            return self._clock() - self._complete_until
+
+    def list(
+        self, status: Optional[str] = None, max_stale: float = 0.0
+    ) -> Optional[List[TodoT]]:
+        """Return the cached collection (optionally one status), or None on a miss.
+
+        ``max_stale`` accepts a collection that expired up to that many seconds ago.
+        """
+
+        with self._lock:
+            if (
+                self._complete_until is None
+                or self._complete_until + max_stale <= self._clock()
+            ):
+                self.misses += 1
+                return None
+            self.hits += 1
+            if status is None:
+                entries = list(self._entries.values())
+            else:
+                ids = self._by_status.get(status, ())
+                entries = [self._entries[todo_id] for todo_id in ids]
+            entries.sort(key=lambda entry: entry.seq)
+            return [entry.item for entry in entries]
+
+    def validators(self) -> Tuple[Optional[str], Optional[str]]:
+        """ETag and Last-Modified of the complete collection, if it is still held."""
+
+        with self._lock:
+            if self._complete_until is None:
+                return None, None
+            return self._validators
+
+    def revalidated(self) -> Optional[List[TodoT]]:
+        """Extend the complete collection after a 304 and return it (None if gone)."""
+
+        with self._lock:
+            if self._complete_until is None:
+                return None
+            expires_at = self._clock() + self.ttl_seconds
+            self._complete_until = expires_at
+            for entry in self._entries.values():
+                entry.expires_at = expires_at
+            entries = sorted(self._entries.values(), key=lambda entry: entry.seq)
+            return [entry.item for entry in entries]
+
+    def replace_all(
+        self,
+        items: Sequence[TodoT],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Replace the cache with a freshly fetched, complete collection."""
+
+        with self._lock:
+            self._entries.clear()
+            self._by_status.clear()
+            self._complete_until = None
+            self._validators = (etag, last_modified)
+            expires_at = self._clock() + self.ttl_seconds
+            for item in items:
+                self._insert(item, expires_at)
+            if len(self._entries) == len(items):
+                self._complete_until = expires_at
+
+    def view(self, key: str, allow_stale: bool = False) -> Optional[QueryView[TodoT]]:
+        """Return the cached view for a query key; expired ones only if ``allow_stale``."""
+
+        with self._lock:
+            view = self._views.get(key)
+            if view is None or (not allow_stale and view.expires_at <= self._clock()):
+                if not allow_stale:
+                    self.misses += 1
+                return None
+            self._views.move_to_end(key)
+            if not allow_stale:
+                self.hits += 1
+            return view
+
+    def put_view(
+        self,
+        key: str,
+        items: List[TodoT],
+        next_params: Optional[Dict[str, str]] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> QueryView[TodoT]:
+        with self._lock:
+            view = QueryView(
+                items,
+                next_params,
+                etag,
+                last_modified,
+                self._clock() + self.ttl_seconds,
+            )
+            self._views[key] = view
+            self._views.move_to_end(key)
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+            return view
+
+    def revalidated_view(self, key: str) -> Optional[QueryView[TodoT]]:
+        """Extend a stored view after the server answered 304 Not Modified."""
+
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                view.expires_at = self._clock() + self.ttl_seconds
+            return view
+
+    def put(self, item: TodoT) -> None:
+        """Insert or patch one todo, e.g. from a create/update response."""
+
+        with self._lock:
+            self._insert(item, self._clock() + self.ttl_seconds)
+            self._expire_views()
+
+    def remove(self, todo_id: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(todo_id, None)
+            if entry is not None:
+                self._unindex(todo_id, entry.item)
+            self._expire_views()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_status.clear()
+            self._complete_until = None
+            self._views.clear()
+
+    def _expire_views(self) -> None:
+        # Keep the validators: the server decides whether the query changed.
+        for view in self._views.values():
+            view.expires_at = float("-inf")
+
+    def _insert(self, item: TodoT, expires_at: float) -> None:
+        todo_id = item.get("id")
+        if todo_id is None:
+            # Without an id the entry cannot be patched later; drop completeness.
+            self._complete_until = None
+            return
+        todo_id = str(todo_id)
+        existing = self._entries.get(todo_id)
+        if existing is not None:
+            self._unindex(todo_id, existing.item)
+            existing.item = item
+            existing.expires_at = expires_at
+            self._entries.move_to_end(todo_id)
+        else:
+            self._entries[todo_id] = _Entry(item, expires_at, next(self._seq))
+        self._by_status.setdefault(str(item.get("status")), set()).add(todo_id)
+        while len(self._entries) > self.max_items:
+            evicted_id, evicted = self._entries.popitem(last=False)
+            self._unindex(evicted_id, evicted.item)
+            self.evictions += 1
+            self._complete_until = None
+            emit_metric("todo_cache_eviction", 1)
+
+    def _unindex(self, todo_id: str, item: TodoT) -> None:
+        ids = self._by_status.get(str(item.get("status")))
+        if ids is not None:
+            ids.discard(todo_id)
@@ -2,91 +2,280 @@
 
 from __future__ import annotations
 
+import abc
+import contextvars
+import itertools
+import json
+import random
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
+from urllib.parse import parse_qs, urlencode, urlsplit
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 import backoff
 import requests
 from requests import HTTPError, Response
 
-from .observability import emit_metric, get_logger, traced_span
+if TYPE_CHECKING:
+    from opentelemetry.trace import Span
+
+from .circuit_breaker import CircuitBreaker
+from .concurrency_limit import (
+    READ,
+    REFRESH,
+    WRITE,
+    AdaptiveConcurrencyLimiter,
+    LoadShedError,
+    current_request_priority,
+    request_priority,
+    retry_after_seconds,
+)
+from .http_pool import PooledSession
+from .json_stream import iter_json_array
+from .models import BulkResult, TodoItem, TodoStatus  # noqa: F401 - re-exported
+from .observability import (
+    annotate_span,
+    emit_metric,
+    get_logger,
+    note_retry,
+    record_latency,
+    timed_stage,
+    traced_span,
+)
+from .rate_limit import RateLimiter, current_rate_limit_key
+from .replica import TodoReplica
+from .safety import SafetyPolicy
+from .singleflight import SingleFlight
+from .todo_cache import TodoCache
 
 _ALLOWED_STATUS = {"open", "in_progress", "done"}
+_LIST_KEY = "GET /todos"
+_STREAM_CHUNK_BYTES = 64 * 1024
+
+
+_THROTTLED_STATUSES = (429, 503)
+_RETRY_MAX_SECONDS = 8
+
+
+def _error_status(exc: Optional[Exception]) -> Optional[int]:
+    if isinstance(exc, HTTPError):
+        response = exc.response
+        return None if response is None else response.status_code
+    # aiohttp.ClientResponseError carries the status code directly.
+    status = getattr(exc, "status", None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(exc: Optional[Exception]) -> Optional[float]:
+    """Seconds the server asked us to wait in a 429/503 reply, if it said."""
+
+    if _error_status(exc) not in _THROTTLED_STATUSES:
+        return None
+    if isinstance(exc, HTTPError):
+        headers = exc.response.headers if exc.response is not None else None
+    else:
+        headers = getattr(exc, "headers", None)
+    return retry_after_seconds(headers.get("Retry-After")) if headers else None
 
 
 def _non_retryable_http_error(exc: Exception) -> bool:
     """Return True when the HTTP error should not be retried."""
 
-    if not isinstance(exc, HTTPError):
-        return False
-    response = exc.response
-    return response is not None and 400 <= response.status_code < 500
+    status = _error_status(exc)
+    return status is not None and 400 <= status < 500
 
 
-@dataclass
-class TodoItem:
-    id: str
-    title: str
-    description: str
-    status: str
+def _give_up(exc: Exception) -> bool:
+    """Stop retrying on a 4xx, or when ``Retry-After`` outlasts the retry budget."""
 
+    retry_after = _retry_after(exc)
+    return _non_retryable_http_error(exc) or (
+        retry_after is not None and retry_after > _RETRY_MAX_SECONDS
+    )
 
-class RateLimiter:
-    """Simple token-bucket rate limiter."""
 
-    def __init__(self, rate_per_minute: int) -> None:
-        self.capacity = rate_per_minute
-        self.tokens = rate_per_minute
-        self.last_refill = time.monotonic()
+def _retry_wait() -> Generator[float, Any, None]:
+    """Full-jitter exponential backoff, or exactly the server's ``Retry-After``."""
 
-    def allow(self) -> bool:
-        now = time.monotonic()
-        elapsed = now - self.last_refill
-        if elapsed > 60:
-            refill = int(elapsed // 60) * self.capacity
-            self.tokens = min(self.capacity, self.tokens + refill)
-            self.last_refill = now
-        if self.tokens > 0:
-            self.tokens -= 1
-            return True
-        return False
+    exc = yield 0.0
+    for attempt in itertools.count():
+        retry_after = _retry_after(exc)
+        exc = yield (
+            random.uniform(0, 2**attempt) if retry_after is None else retry_after
+        )
 
 
-class TodoServiceTool:
-    """A tool that talks to the Todo HTTP service."""
+def _on_backoff(details: Mapping[str, Any]) -> None:
+    emit_metric("todo_tool_retry", 1)
+    note_retry(details.get("wait") or 0.0)
+
+
+class _Slot:
+    """One call's claim on the concurrency limit, returned after every attempt.
+
+    The first slot is taken before the rate-limit token, so a shed call does
+    not spend one; retries take a fresh slot and so wait behind other calls
+    instead of holding one through their backoff.
+    """
+
+    __slots__ = ("limiter", "priority", "held", "started")
+
+    def __init__(self, limiter: AdaptiveConcurrencyLimiter, priority: str) -> None:
+        self.limiter = limiter
+        self.priority = priority
+        self.held = False
+        self.started = 0.0
+
+    def acquire(self) -> None:
+        if not self.held:
+            self.limiter.acquire(self.priority)
+            self.held = True
+        self.started = time.perf_counter()
+
+    async def acquire_async(self) -> None:
+        if not self.held:
+            await self.limiter.acquire_async(self.priority)
+            self.held = True
+        self.started = time.perf_counter()
+
+    def release(self, exc: Optional[BaseException] = None) -> None:
+        """Return the slot, reporting a timeout, 5xx or 429 as overload."""
+
+        if not self.held:
+            return
+        if exc is not None and not isinstance(exc, Exception):
+            self.abandon()  # a cancellation says nothing about the API
+            return
+        self.held = False
+        overloaded = exc is not None and (
+            _error_status(exc) == 429 or not _non_retryable_http_error(exc)
+        )
+        self.limiter.release(
+            (time.perf_counter() - self.started) * 1000,
+            overloaded=overloaded,
+            retry_after=_retry_after(exc),
+        )
+
+    def abandon(self) -> None:
+        """Return the slot of a call that never reached the API."""
+
+        if self.held:
+            self.held = False
+            self.limiter.release(None)
+
+
+def _next_link(response: Response) -> Optional[str]:
+    return response.links.get("next", {}).get("url")
+
+
+class _TodoToolBase(abc.ABC):
+    """Validation, normalization, caching and rate limiting shared by the tools."""
 
     def __init__(
         self,
         base_url: str,
         rate_limit_per_minute: int = 30,
         cache_ttl_seconds: int = 10,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limit_wait_seconds: float = 0,
+        cache: Optional[TodoCache[TodoItem]] = None,
+        stale_while_revalidate_seconds: float = 0,
+        stale_if_error_seconds: float = 0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        bulk_max_workers: int = 4,
+        replica: Optional[TodoReplica] = None,
+        replica_sync_seconds: float = 30,
+        safety_policy: Optional[SafetyPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
     ) -> None:
         self.base_url = base_url.rstrip("/")
         self.logger = get_logger("todo_tool")
-        self.rate_limiter = RateLimiter(rate_limit_per_minute)
+        self.rate_limiter = rate_limiter or RateLimiter(rate_limit_per_minute)
+        self.rate_limit_wait_seconds = rate_limit_wait_seconds
         self.cache_ttl_seconds = cache_ttl_seconds
-        self._cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._cache: TodoCache[TodoItem] = (
+            cache if cache is not None else TodoCache(cache_ttl_seconds)
+        )
+        self.stale_while_revalidate_seconds = stale_while_revalidate_seconds
+        self.stale_if_error_seconds = stale_if_error_seconds
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.bulk_max_workers = bulk_max_workers
+        self.replica = replica
+        self.replica_sync_seconds = replica_sync_seconds
+        self.safety_policy = safety_policy or SafetyPolicy()
+        self.concurrency_limiter = concurrency_limiter or AdaptiveConcurrencyLimiter()
+
+    @abc.abstractmethod
+    def _revalidate_in_background(self) -> None:
+        """Refresh the list cache or replica without blocking the caller."""
+
+    def _rate_limit_exceeded(self) -> RuntimeError:
+        emit_metric("rate_limit_exceeded", 1)
+        return RuntimeError("Rate limit exceeded. Please retry in a moment.")
 
     def _ensure_rate_limit(self) -> None:
-        if not self.rate_limiter.allow():
-            emit_metric("rate_limit_exceeded", 1)
-            raise RuntimeError("Rate limit exceeded. Please retry in a moment.")
-
-    def _sanitize(self, text: str) -> str:
-        lowered = text.lower()
-        if any(
-            token in lowered for token in ["/rm", "drop table", "delete from", "--"]
-        ):
-            raise ValueError("Input rejected due to unsafe content.")
-        return text.strip()[:500]
+        key = current_rate_limit_key()
+        if self.rate_limit_wait_seconds > 0:
+            allowed = self.rate_limiter.acquire(self.rate_limit_wait_seconds, key=key)
+        else:
+            allowed = self.rate_limiter.allow(key)
+        if not allowed:
+            raise self._rate_limit_exceeded()
+
+    async def _ensure_rate_limit_async(self) -> None:
+        key = current_rate_limit_key()
+        if self.rate_limit_wait_seconds > 0:
+            allowed = await self.rate_limiter.acquire_async(
+                self.rate_limit_wait_seconds, key=key
+            )
+        else:
+            allowed = self.rate_limiter.allow(key)
+        if not allowed:
+            raise self._rate_limit_exceeded()
+
+    def _record_outcome(self, span: Span, exc: Optional[Exception] = None) -> None:
+        """Feed the result of a backend call (after retries) to the breaker."""
+
+        if exc is None or _non_retryable_http_error(exc):
+            # A 4xx still proves the backend is up; the request was at fault.
+            self.circuit_breaker.record_success()
+        else:
+            self.circuit_breaker.record_failure()
+        span.set_attribute("circuit.state", self.circuit_breaker.state)
+
+    def _priority(self, method: str) -> str:
+        """Background list refreshes give way first, then reads, then writes."""
+
+        return current_request_priority() or (READ if method == "get" else WRITE)
+
+    def _slot(self, method: str) -> _Slot:
+        return _Slot(self.concurrency_limiter, self._priority(method))
+
+    def _sanitize(self, text: str, field: str = "id") -> str:
+        return self.safety_policy.validate(text, field).strip()[:500]
 
     def _validate_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        title = self._sanitize(str(data.get("title", "")).strip())
+        title = self._sanitize(str(data.get("title", "")).strip(), "title")
         if not title:
             raise ValueError("title is required")
         description = (
-            self._sanitize(str(data.get("description", "")).strip())
+            self._sanitize(str(data.get("description", "")).strip(), "description")
             if data.get("description")
             else ""
         )
@@ -95,75 +284,631 @@ class TodoServiceTool:
             raise ValueError(f"status must be one of {_ALLOWED_STATUS}")
         return {"title": title, "description": description, "status": status}
 
-    def _normalize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        return {
-            "id": payload.get("id") or payload.get("ID"),
-            "title": payload.get("title"),
-            "description": payload.get("description", ""),
-            "status": payload.get("status", "open"),
+    def _bulk_update_payload(
+        self,
+        todo_id: str,
+        data: Dict[str, Any],
+        fetched: Optional[Mapping[str, TodoItem]] = None,
+    ) -> Dict[str, Any]:
+        # PUT replaces the whole item, so fill unchanged fields from the cache
+        # ("mark 3 done" keeps the title). Never send a partial body.
+        cached = (fetched or {}).get(str(todo_id)) or self._cache.get(str(todo_id))
+        if cached is None and self.replica is not None:
+            cached = self.replica.get(todo_id)
+        if cached is None:
+            raise LookupError(f"todo {todo_id} not found")
+        current = {key: cached.get(key) for key in ("title", "description", "status")}
+        return self._validate_payload({**current, **data})
+
+    def _collect_bulk(
+        self, operation: str, keys: List[str], outcomes: List[Any]
+    ) -> BulkResult:
+        result = BulkResult()
+        for key, outcome in zip(keys, outcomes):
+            if isinstance(outcome, Exception):
+                result.failed[key] = str(outcome) or type(outcome).__name__
+            else:
+                result.succeeded[key] = outcome
+        emit_metric("todo_bulk_items", len(keys), operation=operation)
+        if result.failed:
+            emit_metric("todo_bulk_failures", len(result.failed), operation=operation)
+        return result
+
+    def _normalize(self, payload: Dict[str, Any]) -> TodoItem:
+        return TodoItem.from_api(payload)
+
+    def _cached_todos(self) -> Tuple[Optional[List[TodoItem]], bool]:
+        """Return cached todos and whether they are stale and need revalidating."""
+
+        replica = self._ready_replica()
+        if replica is not None:
+            emit_metric("todo_replica", 1, result="hit")
+            return replica.list(), replica.age() >= self.replica_sync_seconds
+        swr = self.stale_while_revalidate_seconds
+        staleness = self._cache.staleness()
+        if swr > 0 and staleness is not None and 0 <= staleness < swr:
+            stale = self._cache.list(max_stale=swr)
+            if stale is not None:
+                self._report_stale("revalidate", staleness)
+                return stale, True
+        cached = self._cache.list()
+        emit_metric("todo_cache", 1, result="miss" if cached is None else "hit")
+        return cached, False
+
+    def _ready_replica(self) -> Optional[TodoReplica]:
+        replica = self.replica
+        return replica if replica is not None and replica.ready else None
+
+    def _stale_on_error(self, exc: Exception) -> Optional[List[TodoItem]]:
+        """Return the last good list if it is inside the stale-if-error window."""
+
+        if self.stale_if_error_seconds <= 0:
+            return None
+        stale = self._cache.list(max_stale=self.stale_if_error_seconds)
+        if stale is not None:
+            self._report_stale("error", self._cache.staleness() or 0.0, error=str(exc))
+        return stale
+
+    def _holds_list(self) -> bool:
+        """Whether a local copy of the list exists, however old.
+
+        Such a copy can answer a conditional GET or a stale-if-error fallback,
+        so a streamed listing should take the shared list fetch instead.
+        """
+
+        return self._cache.staleness() is not None or self._validators() != (
+            None,
+            None,
+        )
+
+    def _report_stale(self, reason: str, staleness: float, **fields: Any) -> None:
+        stale_seconds = max(0.0, staleness)
+        self.logger.warning(
+            "list_todos_stale", reason=reason, stale_seconds=stale_seconds, **fields
+        )
+        attributes: Dict[str, Any] = {
+            "cache.stale": True,
+            "cache.stale_reason": reason,
+            "cache.stale_seconds": stale_seconds,
         }
+        annotate_span(**attributes)
+        emit_metric("todo_cache_stale", 1, reason=reason)
 
-    def _request(self, method: str, path: str, **kwargs: Any) -> Response:
-        self._ensure_rate_limit()
+    def _store_todos(
+        self,
+        todos: List[TodoItem],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        self._cache.replace_all(todos, etag=etag, last_modified=last_modified)
+        if self.replica is not None:
+            self.replica.apply_sync(todos, etag, last_modified)
+
+    def _validators(self) -> Tuple[Optional[str], Optional[str]]:
+        """Validators for a conditional list: the cache's, else the replica's."""
+
+        validators = self._cache.validators()
+        if validators == (None, None) and self.replica is not None:
+            return self.replica.validators()
+        return validators
+
+    def _revalidated(self) -> Optional[List[TodoItem]]:
+        """Handle a 304 on the full list; None if no local copy is left."""
+
+        todos = self._cache.revalidated()
+        if self.replica is not None:
+            replica_todos = self.replica.mark_synced()
+            if todos is None:
+                todos = replica_todos
+        return todos
+
+    def _list_params(
+        self, status: Optional[str], limit: Optional[int], cursor: Optional[str]
+    ) -> Dict[str, str]:
+        params: Dict[str, str] = {}
+        if status is not None:
+            if status not in _ALLOWED_STATUS:
+                raise ValueError(f"status must be one of {_ALLOWED_STATUS}")
+            params["status"] = status
+        if limit is not None:
+            if limit <= 0:
+                raise ValueError("limit must be positive")
+            params["limit"] = str(limit)
+        if cursor:
+            params["cursor"] = str(cursor)
+        return params
+
+    def _cached_query(
+        self, params: Dict[str, str], limit: Optional[int]
+    ) -> Optional[List[TodoItem]]:
+        """Answer a status/limit query from the cached complete collection."""
+
+        if "cursor" in params:
+            return None
+        replica = self._ready_replica()
+        if replica is not None:
+            emit_metric("todo_replica", 1, result="hit")
+            if replica.age() >= self.replica_sync_seconds:
+                self._revalidate_in_background()
+            return replica.list(status=params.get("status"))[:limit]
+        cached = self._cache.list(status=params.get("status"))
+        return None if cached is None else cached[:limit]
+
+    @staticmethod
+    def _query_key(params: Mapping[str, str]) -> str:
+        return urlencode(sorted(params.items()))
+
+    @staticmethod
+    def _conditional_headers(
+        etag: Optional[str], last_modified: Optional[str]
+    ) -> Dict[str, str]:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def _parse_page(
+        self, body: Any, params: Mapping[str, str], next_link: Optional[str]
+    ) -> Tuple[List[TodoItem], Optional[Dict[str, str]]]:
+        """Split a list response into todos and the params for the next page.
+
+        Accepts a bare array, or ``{"items": [...], "next_cursor": ...}``; a
+        ``Link: <...>; rel="next"`` header is followed when the body has no cursor.
+        """
+
+        cursor = None
+        items = body
+        if isinstance(body, dict):
+            items = body.get("items", body.get("todos", []))
+            cursor = body.get("next_cursor") or body.get("next")
+        with timed_stage("normalize"):
+            todos = [self._normalize(item) for item in items]
+        if isinstance(cursor, str) and "://" in cursor:
+            next_link, cursor = cursor, None
+        if cursor:
+            return todos, {**params, "cursor": str(cursor)}
+        if next_link:
+            query = parse_qs(urlsplit(next_link).query)
+            return todos, {name: values[-1] for name, values in query.items()}
+        return todos, None
+
+    def _written(self, todo: TodoItem) -> TodoItem:
+        self._cache.put(todo)
+        if self.replica is not None and todo.id is not None:
+            self.replica.commit_write(str(todo.id), todo)
+        return todo
+
+    def _deleted(self, todo_id: str, todo: TodoItem) -> TodoItem:
+        todo_id = str(todo.get("id") or todo_id)
+        self._cache.remove(todo_id)
+        if self.replica is not None:
+            self.replica.commit_write(todo_id, None)
+        return todo
+
+    @contextmanager
+    def _optimistic(
+        self, todo_id: str, changes: Optional[Mapping[str, Any]]
+    ) -> Iterator[None]:
+        """Show a write (``changes`` None for a delete) in replica reads early.
+
+        The write is undone if the request fails; ``_written``/``_deleted``
+        replace it with the API's answer when it succeeds.
+        """
+
+        replica = self.replica
+        current = None if replica is None else replica.get(todo_id)
+        if replica is None or current is None:
+            yield
+            return
+        optimistic = (
+            None
+            if changes is None
+            else TodoItem.from_api({**current.to_dict(), **changes})
+        )
+        replica.begin_write(todo_id, optimistic)
+        try:
+            yield
+        except BaseException:
+            replica.rollback_write(todo_id)
+            raise
+
+
+class TodoServiceTool(_TodoToolBase):
+    """A tool that talks to the Todo HTTP service."""
+
+    def __init__(
+        self,
+        base_url: str,
+        rate_limit_per_minute: int = 30,
+        cache_ttl_seconds: int = 10,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limit_wait_seconds: float = 0,
+        cache: Optional[TodoCache[TodoItem]] = None,
+        stale_while_revalidate_seconds: float = 0,
+        stale_if_error_seconds: float = 0,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        bulk_max_workers: int = 4,
+        replica: Optional[TodoReplica] = None,
+        replica_sync_seconds: float = 30,
+        safety_policy: Optional[SafetyPolicy] = None,
+        concurrency_limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            rate_limit_per_minute=rate_limit_per_minute,
+            cache_ttl_seconds=cache_ttl_seconds,
+            rate_limiter=rate_limiter,
+            rate_limit_wait_seconds=rate_limit_wait_seconds,
+            cache=cache,
+            stale_while_revalidate_seconds=stale_while_revalidate_seconds,
+            stale_if_error_seconds=stale_if_error_seconds,
+            circuit_breaker=circuit_breaker,
+            bulk_max_workers=bulk_max_workers,
+            replica=replica,
+            replica_sync_seconds=replica_sync_seconds,
+            safety_policy=safety_policy,
+            concurrency_limiter=concurrency_limiter,
+        )
+        self._session = session or PooledSession(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self._inflight = SingleFlight()
+
+    def close(self) -> None:
+        """Release pooled connections held by the underlying session."""
+
+        self._session.close()
+
+    def __enter__(self) -> "TodoServiceTool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _request(
+        self, method: str, path: str, *, rate_limited: bool = True, **kwargs: Any
+    ) -> Response:
+        self.circuit_breaker.before_call()
+        slot = self._slot(method)
+        try:
+            with timed_stage("concurrency_limit"):
+                slot.acquire()
+            if rate_limited:
+                with timed_stage("rate_limit"):
+                    self._ensure_rate_limit()
+        except BaseException:
+            # Shed or rate limited: free the slot and any half-open probe.
+            slot.abandon()
+            self.circuit_breaker.abandon_call()
+            raise
         url = f"{self.base_url}{path}"
-        self.logger.info("tool_call_start", tool_name=method, url=url)
-        with traced_span(f"todo.{method}", url=url):
-            response = self._execute_request(method, url, **kwargs)
-            latency = (
-                response.elapsed.total_seconds() * 1000 if response.elapsed else None
-            )
-            self.logger.info(
+        self.logger.debug("tool_call_start", tool_name=method, url=url)
+        with traced_span(f"todo.{method}", url=url) as span:
+            start = time.perf_counter()
+            try:
+                with timed_stage("http"):
+                    response = self._execute_request(method, url, slot, **kwargs)
+            except LoadShedError:
+                self.circuit_breaker.abandon_call()  # a retry was shed
+                raise
+            except Exception as exc:
+                self._record_outcome(span, exc)
+                raise
+            except BaseException:
+                self.circuit_breaker.abandon_call()  # cancelled mid-call
+                raise
+            latency = (time.perf_counter() - start) * 1000
+            self._record_outcome(span)
+            self.logger.debug(
                 "tool_call_complete",
                 tool_name=method,
                 url=url,
                 status_code=response.status_code,
                 latency_ms=latency,
             )
-            emit_metric(
-                "todo_tool_call", 1, method=method, status=str(response.status_code)
-            )
+            status = str(response.status_code)
+            emit_metric("todo_tool_call", 1, method=method, status=status)
+            record_latency("todo_tool_latency_ms", latency, method=method)
             return response
 
     @backoff.on_exception(
-        backoff.expo,
+        _retry_wait,
         requests.HTTPError,
-        max_time=8,
-        giveup=_non_retryable_http_error,
+        max_time=_RETRY_MAX_SECONDS,
+        jitter=None,
+        giveup=_give_up,
+        on_backoff=_on_backoff,
     )
     def _execute_request(
-        self, method: str, url: str, **kwargs: Any
+        self, method: str, url: str, slot: _Slot, **kwargs: Any
     ) -> Response:  # pragma: no cover - wrapped by backoff
-        response = requests.request(
-            method=method.upper(), url=url, timeout=10, **kwargs
-        )
-        response.raise_for_status()
+        slot.acquire()
+        try:
+            response = self._session.request(
+                method=method.upper(), url=url, timeout=10, **kwargs
+            )
+            try:
+                response.raise_for_status()
+            except HTTPError:
+                response.close()  # a streamed body would otherwise pin the connection
+                raise
+        except BaseException as exc:
+            slot.release(exc)
+            raise
+        slot.release()
         return response
 
-    def list_todos(self, use_cache: bool = True) -> List[Dict[str, Any]]:
-        if use_cache and self._cache:
-            timestamp, cached = self._cache
-            if time.time() - timestamp < self.cache_ttl_seconds:
+    def list_todos(
+        self,
+        use_cache: bool = True,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[TodoItem]:
+        """Return todos, optionally filtered by ``status`` and capped at ``limit``.
+
+        Filters are sent to the API as query parameters and further pages are
+        only fetched until ``limit`` todos have been collected.
+        """
+
+        params = self._list_params(status, limit, cursor)
+        if params:
+            cached = self._cached_query(params, limit) if use_cache else None
+            if cached is not None:
                 return cached
-        response = self._request("get", "/todos")
-        todos = [self._normalize(item) for item in response.json()]
-        self._cache = (time.time(), todos)
-        return todos
+            return list(self._iter_pages(params, limit, use_cache))
+        if not use_cache:
+            return self._inflight.do(_LIST_KEY, self._fetch_todos)
+        cached, revalidate = self._cached_todos()
+        if revalidate:
+            self._revalidate_in_background()
+        if cached is not None:
+            return cached
+        return self._fetch_or_stale()
 
-    def create_todo(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        payload = self._validate_payload(data)
-        response = self._request("post", "/todos", json=payload)
-        self._cache = None
-        return self._normalize(response.json())
+    def _fetch_or_stale(self) -> List[TodoItem]:
+        """Join the shared list fetch, falling back to a stale copy on error."""
+
+        try:
+            return self._inflight.do(_LIST_KEY, self._fetch_todos)
+        except Exception as exc:
+            stale = self._stale_on_error(exc)
+            if stale is None:
+                raise
+            return stale
+
+    def iter_todos(
+        self,
+        limit: Optional[int] = None,
+        use_cache: bool = True,
+        status: Optional[str] = None,
+    ) -> Iterator[TodoItem]:
+        """Yield normalized todos as the ``/todos`` body streams in.
+
+        Items are parsed and normalized one at a time, so the first todo is
+        available before the whole response arrives. A fully read response
+        refreshes the cache; stopping early (``limit``) leaves it untouched.
+        Filtered or paginated listings are read page by page instead, and
+        when a list fetch is already running or an expired copy is held the
+        shared, conditional fetch (with its stale-if-error fallback) is used.
+        """
+
+        if use_cache:
+            cached, revalidate = self._cached_todos()
+            if revalidate:
+                self._revalidate_in_background()
+            if cached is not None:
+                if status is not None:
+                    cached = [todo for todo in cached if todo["status"] == status]
+                yield from cached[:limit]
+                return
+        if limit is not None and limit <= 0:
+            return
+        if status is not None:
+            params = self._list_params(status, limit, None)
+            yield from self._iter_pages(params, limit, use_cache)
+            return
+        if self._inflight.in_flight(_LIST_KEY) or self._holds_list():
+            # Revalidate or wait on the fetch already running rather than
+            # streaming a second copy past the ETag and stale-if-error paths.
+            if use_cache:
+                yield from self._fetch_or_stale()[:limit]
+            else:
+                yield from self._inflight.do(_LIST_KEY, self._fetch_todos)[:limit]
+            return
+        response = self._request("get", "/todos", stream=True)
+        seen: List[TodoItem] = []
+        try:
+            chunks = response.iter_content(chunk_size=_STREAM_CHUNK_BYTES)
+            first = next(chunks, b"")
+            if first.lstrip()[:1] == b"{":
+                # A paginated envelope rather than a bare array: read it whole.
+                body = json.loads(first + b"".join(chunks))
+                items, next_params = self._parse_page(body, {}, _next_link(response))
+                seen.extend(items[:limit])
+                yield from seen
+                if next_params is not None and (limit is None or len(seen) < limit):
+                    remaining = None if limit is None else limit - len(seen)
+                    yield from self._iter_pages(next_params, remaining, use_cache)
+                return
+            for item in iter_json_array(itertools.chain((first,), chunks)):
+                todo = self._normalize(item)
+                seen.append(todo)
+                yield todo
+                if limit is not None and len(seen) >= limit:
+                    return
+        finally:
+            response.close()
+        self._store_todos(
+            seen, response.headers.get("ETag"), response.headers.get("Last-Modified")
+        )
+
+    def _iter_pages(
+        self, params: Dict[str, str], limit: Optional[int], use_cache: bool
+    ) -> Iterator[TodoItem]:
+        """Yield todos from ``params`` onwards, fetching later pages only on demand."""
+
+        count = 0
+        page_params: Optional[Dict[str, str]] = params
+        while page_params is not None:
+            items, page_params = self._fetch_page(page_params, use_cache)
+            for todo in items:
+                yield todo
+                count += 1
+                if limit is not None and count >= limit:
+                    return
 
-    def update_todo(self, todo_id: str, data: Dict[str, Any]) -> Dict[str, Any]:
+    def _fetch_page(
+        self, params: Dict[str, str], use_cache: bool
+    ) -> Tuple[List[TodoItem], Optional[Dict[str, str]]]:
+        key = self._query_key(params)
+        if use_cache:
+            view = self._cache.view(key)
+            if view is not None:
+                return view.items, view.next_params
+        stale = self._cache.view(key, allow_stale=True)
+        headers = (
+            self._conditional_headers(stale.etag, stale.last_modified) if stale else {}
+        )
+        response = self._request("get", "/todos", params=params, headers=headers)
+        if response.status_code == 304 and stale is not None:
+            emit_metric("todo_cache", 1, result="not_modified")
+            view = self._cache.revalidated_view(key) or stale
+            return view.items, view.next_params
+        items, next_params = self._parse_page(
+            response.json(), params, _next_link(response)
+        )
+        self._cache.put_view(
+            key,
+            items,
+            next_params,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return items, next_params
+
+    def _revalidate_in_background(self) -> None:
+        if self._inflight.in_flight(_LIST_KEY):
+            return
+        threading.Thread(
+            target=self._revalidate, name="todo-revalidate", daemon=True
+        ).start()
+
+    def _revalidate(self) -> None:
+        try:
+            with request_priority(REFRESH):
+                self._inflight.do(_LIST_KEY, self._fetch_todos)
+        except LoadShedError:
+            pass  # counted as todo_api_shed; the next read tries again
+        except Exception as exc:
+            self.logger.warning("list_todos_revalidate_failed", error=str(exc))
+
+    def _fetch_todos(self) -> List[TodoItem]:
+        headers = self._conditional_headers(*self._validators())
+        response = self._request("get", "/todos", headers=headers)
+        if response.status_code == 304:
+            todos = self._revalidated()
+            if todos is not None:
+                emit_metric("todo_cache", 1, result="not_modified")
+                return todos
+            response = self._request("get", "/todos")  # evicted in the meantime
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        todos, next_params = self._parse_page(response.json(), {}, _next_link(response))
+        while next_params is not None:
+            response = self._request("get", "/todos", params=next_params)
+            page, next_params = self._parse_page(
+                response.json(), next_params, _next_link(response)
+            )
+            todos.extend(page)
+        self._store_todos(todos, etag, last_modified)
+        return todos
+
+    def create_todo(self, data: Dict[str, Any], rate_limited: bool = True) -> TodoItem:
         payload = self._validate_payload(data)
         response = self._request(
-            "put", f"/todos/{self._sanitize(todo_id)}", json=payload
+            "post", "/todos", json=payload, rate_limited=rate_limited
         )
-        self._cache = None
-        return self._normalize(response.json())
+        return self._written(self._normalize(response.json()))
+
+    def update_todo(self, todo_id: str, data: Dict[str, Any]) -> TodoItem:
+        return self._put(todo_id, self._validate_payload(data))
+
+    def _put(
+        self, todo_id: str, payload: Dict[str, Any], rate_limited: bool = True
+    ) -> TodoItem:
+        todo_id = self._sanitize(todo_id)
+        with self._optimistic(todo_id, payload):
+            response = self._request(
+                "put", f"/todos/{todo_id}", json=payload, rate_limited=rate_limited
+            )
+            return self._written(self._normalize(response.json()))
+
+    def delete_todo(self, todo_id: str, rate_limited: bool = True) -> TodoItem:
+        todo_id = self._sanitize(todo_id)
+        with self._optimistic(todo_id, None):
+            response = self._request(
+                "delete", f"/todos/{todo_id}", rate_limited=rate_limited
+            )
+            return self._deleted(todo_id, self._normalize(response.json()))
+
+    def bulk_create(self, items: Sequence[Dict[str, Any]]) -> BulkResult:
+        calls = {
+            str(index): partial(self.create_todo, item, rate_limited=False)
+            for index, item in enumerate(items)
+        }
+        return self._run_bulk("create", calls)
 
-    def delete_todo(self, todo_id: str) -> Dict[str, Any]:
-        response = self._request("delete", f"/todos/{self._sanitize(todo_id)}")
-        self._cache = None
-        return self._normalize(response.json())
+    def bulk_update(self, updates: Mapping[str, Dict[str, Any]]) -> BulkResult:
+        """Apply per-id changes; fields left out keep their current values."""
+
+        fetched: Dict[str, TodoItem] = {}
+        if any(self._cache.get(str(todo_id)) is None for todo_id in updates):
+            # One fetch fills the missing items. Read them from its result:
+            # with a zero TTL the cache does not keep them.
+            todos = self.list_todos(use_cache=False)
+            fetched = {str(todo.id): todo for todo in todos}
+        calls = {
+            str(todo_id): partial(self._bulk_update_one, str(todo_id), data, fetched)
+            for todo_id, data in updates.items()
+        }
+        return self._run_bulk("update", calls)
+
+    def bulk_delete(self, todo_ids: Iterable[str]) -> BulkResult:
+        calls = {
+            str(todo_id): partial(self.delete_todo, str(todo_id), rate_limited=False)
+            for todo_id in todo_ids
+        }
+        return self._run_bulk("delete", calls)
+
+    def _bulk_update_one(
+        self, todo_id: str, data: Dict[str, Any], fetched: Mapping[str, TodoItem]
+    ) -> TodoItem:
+        payload = self._bulk_update_payload(todo_id, data, fetched)
+        return self._put(todo_id, payload, rate_limited=False)
+
+    def _run_bulk(
+        self, operation: str, calls: Mapping[str, Callable[..., TodoItem]]
+    ) -> BulkResult:
+        """Run item calls on a bounded pool, charging one rate-limit token per batch."""
+
+        if not calls:
+            return BulkResult()
+        self._ensure_rate_limit()
+        outcomes: List[Any] = []
+        with traced_span(f"todo.bulk_{operation}", items=len(calls)):
+            workers = min(self.bulk_max_workers, len(calls))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = [
+                    pool.submit(contextvars.copy_context().run, call)
+                    for call in calls.values()
+                ]
+                for future in futures:
+                    exc = future.exception()
+                    outcomes.append(exc if exc is not None else future.result())
+        return self._collect_bulk(operation, list(calls), outcomes)
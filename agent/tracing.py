@@ -0,0 +1,61 @@
+"""OpenTelemetry SDK setup, imported only when tracing is configured."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from opentelemetry.sdk.resources import SERVICE_NAME, Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+)
+from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+from .observability import emit_metric
+
+
+class _CountingBatchSpanProcessor(BatchSpanProcessor):
+    """``BatchSpanProcessor`` that counts spans dropped on a full queue."""
+
+    def on_end(self, span: ReadableSpan) -> None:
+        if span.context.trace_flags.sampled and len(self.queue) >= self.max_queue_size:
+            emit_metric("span_dropped", 1)
+        super().on_end(span)
+
+
+def _span_exporter(
+    exporter: str, otlp_endpoint: Optional[str], timeout_seconds: int
+) -> SpanExporter:
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter(endpoint=otlp_endpoint, timeout=timeout_seconds)
+    raise ValueError(f"unknown span exporter {exporter!r}")
+
+
+def build_tracer_provider(
+    service_name: str,
+    sample_ratio: float,
+    exporter: str,
+    otlp_endpoint: Optional[str],
+    max_queue_size: int,
+    max_export_batch_size: int,
+    export_timeout_seconds: int,
+) -> TracerProvider:
+    resource = Resource(attributes={SERVICE_NAME: service_name})
+    sampler = ParentBased(TraceIdRatioBased(sample_ratio))
+    provider = TracerProvider(resource=resource, sampler=sampler)
+    processor = _CountingBatchSpanProcessor(
+        _span_exporter(exporter, otlp_endpoint, export_timeout_seconds),
+        max_queue_size=max_queue_size,
+        max_export_batch_size=max_export_batch_size,
+        export_timeout_millis=export_timeout_seconds * 1000,
+    )
+    provider.add_span_processor(processor)
+    return provider
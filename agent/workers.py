@@ -0,0 +1,478 @@
+"""Run the HTTP server from several processes sharing one rate budget and cache.
+
+``serve_workers`` binds the listening socket once and starts ``workers``
+server processes that accept from it. Each process has its own orchestrator,
+sessions and event loop; two pieces of state are shared between them so that
+adding workers adds throughput without multiplying upstream traffic:
+
+* ``SharedRateLimiter`` keeps the token buckets in shared memory, so the
+  ``RATE_LIMIT_PER_MINUTE`` budget holds for the whole pool rather than per
+  process.
+* ``SharedTodoCache`` publishes the complete todo collection as a snapshot
+  file plus a journal of the writes made since; the other workers adopt it
+  instead of fetching it themselves.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import Config
+from .models import TodoItem
+from .observability import get_logger
+from .rate_limit import RateLimiter, _Bucket
+from .todo_cache import TodoCache
+
+# Shared cache slots: generation of the last change, generation of the last
+# content change, when the published collection expires (NaN: none),
+# generation of the snapshot the journal builds on, and journal length.
+_GENERATION, _CONTENT, _COMPLETE_UNTIL, _BASE, _JOURNALED = range(5)
+
+
+class _SlotBucket(_Bucket):
+    """A token bucket whose two fields live in a shared array."""
+
+    __slots__ = ("_values", "_index")
+
+    def __init__(self, values: Any, index: int) -> None:
+        self._values = values
+        self._index = index
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Pickle the location only: restoring the inherited slots would write
+        # this process's copy of the values back over the shared ones.
+        return _SlotBucket, (self._values, self._index)
+
+    @property
+    def tokens(self) -> float:
+        return self._values[self._index]
+
+    @tokens.setter
+    def tokens(self, value: float) -> None:
+        self._values[self._index] = value
+
+    @property
+    def updated(self) -> float:
+        return self._values[self._index + 1]
+
+    @updated.setter
+    def updated(self, value: float) -> None:
+        self._values[self._index + 1] = value
+
+
+class SharedRateLimiter(RateLimiter):
+    """A ``RateLimiter`` whose buckets are shared by every process it is passed to.
+
+    The global bucket and up to ``max_keys`` key buckets live in one shared
+    array guarded by a process-shared lock. Key buckets are direct-mapped by
+    hash instead of kept in LRU order: a key that lands on a slot held by
+    another key starts over with a full bucket, which only ever loosens the
+    per-key limit, never the global one. ``time.monotonic`` is system-wide, so
+    the refill arithmetic is the same as in the single-process limiter.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: int,
+        per_key_rate_per_minute: int = 0,
+        max_keys: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+        context: Any = None,
+    ) -> None:
+        super().__init__(rate_per_minute, per_key_rate_per_minute, max_keys, clock)
+        context = context or multiprocessing.get_context()
+        self._lock = context.Lock()
+        self._values = context.RawArray("d", 2 + 3 * max_keys)
+        self._values[0:2] = [self.capacity, clock()]
+        self._global = _SlotBucket(self._values, 0)
+
+    def _key_bucket(self, key: str, now: float) -> _SlotBucket:
+        key_hash = zlib.crc32(key.encode("utf-8")) + 1  # 0 marks an empty slot
+        slot = 2 + 3 * (key_hash % self.max_keys)
+        if self._values[slot] != key_hash:
+            self._values[slot : slot + 3] = [key_hash, self.per_key_capacity, now]
+        return _SlotBucket(self._values, slot + 1)
+
+
+class SharedCacheState:
+    """The part of ``SharedTodoCache`` that is common to all worker processes."""
+
+    def __init__(self, directory: str, context: Any = None) -> None:
+        context = context or multiprocessing.get_context()
+        self.snapshot_path = os.path.join(directory, "todos.json")
+        self.journal_path = os.path.join(directory, "todos.log")
+        self.lock = context.Lock()
+        self.values = context.RawArray("d", 5)
+        self.values[_COMPLETE_UNTIL] = math.nan
+
+    def write(
+        self,
+        items: Sequence[TodoItem],
+        validators: Tuple[Optional[str], Optional[str]],
+    ) -> None:
+        """Replace the snapshot and start an empty journal on top of it."""
+
+        body = {
+            "items": [item.to_dict() for item in items],
+            "etag": validators[0],
+            "last_modified": validators[1],
+        }
+        temporary = f"{self.snapshot_path}.{os.getpid()}"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(body, handle, separators=(",", ":"))
+        os.replace(temporary, self.snapshot_path)
+        open(self.journal_path, "w").close()
+
+    def append(self, change: Dict[str, Any]) -> int:
+        """Journal one change; return the journal's new length in bytes."""
+
+        with open(self.journal_path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps(change, separators=(",", ":")) + "\n")
+            return handle.tell()
+
+    def read(self) -> Tuple[List[TodoItem], Optional[str], Optional[str]]:
+        with open(self.snapshot_path, encoding="utf-8") as handle:
+            body = json.load(handle)
+        items = [TodoItem.from_api(item) for item in body["items"]]
+        return items, body["etag"], body["last_modified"]
+
+    def read_journal(self, offset: int) -> Tuple[List[Dict[str, Any]], int]:
+        """Return the changes journaled after byte ``offset`` and the new end."""
+
+        with open(self.journal_path, encoding="utf-8") as handle:
+            handle.seek(offset)
+            changes = [json.loads(line) for line in handle]
+            return changes, handle.tell()
+
+
+class SharedTodoCache(TodoCache[TodoItem]):
+    """A ``TodoCache`` that shares its complete collection with other processes.
+
+    Fetching the complete collection publishes it as a snapshot. A create,
+    update or delete patched into it is journaled as a single change, and
+    the others replay only the changes they have not seen on their next read.
+    Once the journal holds as many changes as the collection has items, the
+    next write publishes a fresh snapshot instead, so a write costs O(1)
+    amortized. A 304 only extends the expiry. A change made while this
+    process does not hold the complete collection makes the others drop
+    theirs instead. Query views stay per process, but any published change
+    expires them.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        state: SharedCacheState,
+        max_items: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        max_views: int = 256,
+    ) -> None:
+        super().__init__(ttl_seconds, max_items, clock, max_views)
+        self._state = state
+        self._seen_generation = 0.0
+        self._seen_content = 0.0
+        self._seen_base = 0.0
+        self._journal_offset = 0
+
+    def get(self, todo_id: str) -> Optional[TodoItem]:
+        self._adopt()
+        return super().get(todo_id)
+
+    def staleness(self) -> Optional[float]:
+        self._adopt()
+        return super().staleness()
+
+    def list(
+        self, status: Optional[str] = None, max_stale: float = 0.0
+    ) -> Optional[List[TodoItem]]:
+        self._adopt()
+        return super().list(status, max_stale)
+
+    def validators(self) -> Tuple[Optional[str], Optional[str]]:
+        self._adopt()
+        return super().validators()
+
+    def revalidated(self) -> Optional[List[TodoItem]]:
+        self._adopt()
+        with self._lock:
+            todos = super().revalidated()
+            if todos is not None:
+                self._publish(content=False)
+            return todos
+
+    def replace_all(
+        self,
+        items: Sequence[TodoItem],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        with self._lock:
+            super().replace_all(items, etag, last_modified)
+            self._publish(content=True, fresh=True)
+
+    def put(self, item: TodoItem) -> None:
+        self._adopt()
+        with self._lock:
+            super().put(item)
+            self._publish(content=True, change={"put": item.to_dict()})
+
+    def remove(self, todo_id: str) -> None:
+        self._adopt()
+        with self._lock:
+            super().remove(todo_id)
+            self._publish(content=True, change={"remove": todo_id})
+
+    def _adopt(self) -> None:
+        values = self._state.values
+        if values[_GENERATION] == self._seen_generation:
+            return
+        with self._state.lock:
+            generation, content, complete_until, base, _ = values[:]
+            snapshot = None
+            changes: List[Dict[str, Any]] = []
+            offset = self._journal_offset
+            if content != self._seen_content and not math.isnan(complete_until):
+                if base != self._seen_base or self._complete_until is None:
+                    snapshot = self._state.read()
+                    offset = 0
+                changes, offset = self._state.read_journal(offset)
+        with self._lock:
+            self._seen_generation = generation
+            if math.isnan(complete_until):
+                super().invalidate()
+                return
+            if snapshot is not None:
+                super().replace_all(*snapshot)
+                self._seen_base = base
+            if snapshot is not None or changes:
+                for change in changes:
+                    if "put" in change:
+                        super().put(TodoItem.from_api(change["put"]))
+                    else:
+                        super().remove(change["remove"])
+                self._journal_offset = offset
+                self._seen_content = content
+                self._expire_views()
+            if self._complete_until is not None:
+                self._complete_until = complete_until
+                for entry in self._entries.values():
+                    entry.expires_at = complete_until
+
+    def _publish(
+        self,
+        content: bool,
+        fresh: bool = False,
+        change: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Share this process's collection; call with ``self._lock`` held.
+
+        ``change`` is journaled when given; otherwise (or when the journal is
+        due for compaction) the whole collection is written as a snapshot.
+        Only ``fresh`` (just fetched) collections may overwrite a change that
+        another process published after this one last looked; anything else
+        built on top of an outdated copy makes every process drop its copy.
+        """
+
+        values = self._state.values
+        with self._state.lock:
+            current = values[_GENERATION] == self._seen_generation
+            if not content and values[_CONTENT] != self._seen_content:
+                return  # someone published a newer collection; keep theirs
+            generation = values[_GENERATION] + 1
+            if self._complete_until is None or not (current or fresh):
+                values[_COMPLETE_UNTIL] = math.nan
+            else:
+                if content:
+                    if change is None or values[_JOURNALED] >= len(self._entries):
+                        entries = sorted(self._entries.values(), key=lambda e: e.seq)
+                        self._state.write(
+                            [entry.item for entry in entries], self._validators
+                        )
+                        values[_BASE] = self._seen_base = generation
+                        values[_JOURNALED] = self._journal_offset = 0
+                    else:
+                        self._journal_offset = self._state.append(change)
+                        values[_JOURNALED] += 1
+                    values[_CONTENT] = generation
+                    self._seen_content = generation
+                values[_COMPLETE_UNTIL] = self._complete_until
+            values[_GENERATION] = generation
+            self._seen_generation = generation
+
+
+def _worker_main(
+    index: int,
+    config: Config,
+    rate_limiter: SharedRateLimiter,
+    cache_state: SharedCacheState,
+    sock: socket.socket,
+) -> None:
+    from .main import TodoOrchestrator, configure_observability
+    from .server import serve
+
+    configure_observability(config)
+    cache = SharedTodoCache(
+        config.cache_ttl_seconds, cache_state, max_items=config.cache_max_items
+    )
+    agent = TodoOrchestrator(config, rate_limiter=rate_limiter, cache=cache)
+    agent.profiler.install_signal_handlers()
+    agent.warm_up()
+    get_logger("workers").info("todo_worker_ready", worker=index, pid=os.getpid())
+    serve(
+        agent,
+        sock=sock,
+        max_concurrency=config.server_max_concurrency,
+        max_queue=config.server_max_queue,
+        drain_seconds=config.server_drain_seconds,
+    )
+
+
+class _RestartPolicy:
+    """Exponential backoff for restarting a worker that keeps dying young.
+
+    A worker that exits within ``min_uptime`` seconds of starting counts as a
+    crash; the next start waits ``base_delay`` doubled per crash in a row (up
+    to ``max_delay``). One that ran longer resets the count.
+    """
+
+    def __init__(
+        self,
+        max_crashes: int = 5,
+        min_uptime: float = 10.0,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+    ) -> None:
+        self.max_crashes = max_crashes
+        self.min_uptime = min_uptime
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.crashes = 0
+        self._started_at = 0.0
+
+    def started(self, now: float) -> None:
+        self._started_at = now
+
+    def exited(self, now: float) -> Optional[float]:
+        """Return when to start the worker again, or None to give up."""
+
+        if now - self._started_at >= self.min_uptime:
+            self.crashes = 0
+            return now
+        self.crashes += 1
+        if self.crashes >= self.max_crashes:
+            return None
+        return now + min(self.base_delay * 2 ** (self.crashes - 1), self.max_delay)
+
+
+def serve_workers(
+    config: Config,
+    workers: int,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_crashes: int = 5,
+) -> None:
+    """Serve HTTP from ``workers`` processes until SIGINT or SIGTERM.
+
+    Workers are started with ``spawn`` so none inherits this process's logging
+    or tracing threads. One that dies is started again, with exponential
+    backoff while it keeps dying within seconds of starting; after
+    ``max_crashes`` such exits in a row the pool is shut down and
+    ``RuntimeError`` raised. On shutdown each worker is sent SIGTERM and
+    given ``server_drain_seconds`` to finish its requests.
+
+    ``ValueError`` is raised up front when ``WRITE_BEHIND_PATH``,
+    ``REPLICA_PATH`` or ``SESSION_SNAPSHOT_PATH`` is set: each worker would
+    open the same file with nothing coordinating them, so journaled writes
+    would be sent once per worker and snapshots overwrite each other.
+    """
+
+    shared_files = [
+        name
+        for name, path in (
+            ("WRITE_BEHIND_PATH", config.write_behind_path),
+            ("REPLICA_PATH", config.replica_path),
+            ("SESSION_SNAPSHOT_PATH", config.session_snapshot_path),
+        )
+        if path
+    ]
+    if workers > 1 and shared_files:
+        raise ValueError(
+            f"{', '.join(shared_files)} cannot be used with more than one worker"
+        )
+    logger = get_logger("workers")
+    context = multiprocessing.get_context("spawn")
+    sock = socket.create_server((host, port), backlog=1024)
+    directory = tempfile.mkdtemp(prefix="todo-agent-")
+    rate_limiter = SharedRateLimiter(
+        config.rate_limit_per_minute,
+        per_key_rate_per_minute=config.rate_limit_per_session_per_minute,
+        context=context,
+    )
+    cache_state = SharedCacheState(directory, context)
+    stopping = threading.Event()
+    previous = {
+        signum: signal.signal(signum, lambda *_: stopping.set())
+        for signum in (signal.SIGINT, signal.SIGTERM)
+    }
+    processes: Dict[int, Any] = {}
+    restarts = {index: _RestartPolicy(max_crashes) for index in range(workers)}
+    start_at = dict.fromkeys(range(workers), 0.0)
+    try:
+        while not stopping.is_set():
+            for index in range(workers):
+                process = processes.get(index)
+                if process is not None and process.is_alive():
+                    continue
+                now = time.monotonic()
+                if process is not None:
+                    del processes[index]
+                    restart_at = restarts[index].exited(now)
+                    logger.warning(
+                        "todo_worker_exited",
+                        worker=index,
+                        exitcode=process.exitcode,
+                        crashes=restarts[index].crashes,
+                    )
+                    if restart_at is None:
+                        logger.error("todo_worker_crash_loop", worker=index)
+                        raise RuntimeError(
+                            f"worker {index} exited on start {max_crashes} times"
+                            " in a row"
+                        )
+                    start_at[index] = restart_at
+                if now < start_at[index]:
+                    continue
+                process = context.Process(
+                    target=_worker_main,
+                    args=(index, config, rate_limiter, cache_state, sock),
+                    name=f"todo-worker-{index}",
+                )
+                process.start()
+                restarts[index].started(now)
+                processes[index] = process
+            stopping.wait(1.0)
+    finally:
+        for process in processes.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + config.server_drain_seconds + 5
+        for process in processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+        sock.close()
+        shutil.rmtree(directory, ignore_errors=True)
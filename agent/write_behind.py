@@ -0,0 +1,402 @@
+"""Write-behind queue: acknowledge todo writes at once, send them in the background."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Set,
+)
+
+from .models import BulkResult, TodoItem
+from .observability import emit_metric, get_logger
+from .rate_limit import current_rate_limit_key, rate_limit_scope
+
+if TYPE_CHECKING:
+    from .todo_tool import TodoServiceTool
+
+
+class _Write:
+    __slots__ = ("seq", "op", "todo_id", "payload", "session_id", "retry_at")
+
+    def __init__(
+        self,
+        op: str,
+        todo_id: str,
+        payload: Optional[Dict[str, Any]],
+        session_id: Optional[str],
+        seq: Optional[int] = None,
+    ) -> None:
+        self.seq = seq
+        self.op = op
+        self.todo_id = todo_id
+        self.payload = payload
+        self.session_id = session_id
+        self.retry_at = 0.0
+
+
+def _coalesce(
+    queued: _Write, op: str, payload: Optional[Dict[str, Any]]
+) -> Optional[_Write]:
+    """Fold a later write into a queued one; None when both cancel out."""
+
+    if queued.op == "delete":
+        raise ValueError(f"todo {queued.todo_id} is already being deleted")
+    if op == "update":
+        queued.payload = {**(queued.payload or {}), **(payload or {})}
+        return queued
+    if queued.op == "create":
+        return None  # created and deleted before the API saw either
+    queued.op, queued.payload = "delete", None
+    return queued
+
+
+class WriteBehindQueue:
+    """Journal todo writes to sqlite and send them to the API from a worker.
+
+    ``create_todo``, ``update_todo``, ``delete_todo`` and the bulk variants
+    take the tool's arguments, validate them right away and return once the
+    write is journaled. Creates get a provisional ``local-...`` id that later
+    writes may use; it is swapped for the API's id when the create lands.
+
+    While a write waits, later writes to the same todo are merged into it:
+    updates combine, an update then a delete leaves just the delete, and a
+    create then a delete leaves nothing. At most ``max_concurrency`` writes
+    are in flight. Writes the API rejects (4xx or validation) are dropped and
+    reported through ``take_failures``; other failures stay journaled and are
+    retried after ``retry_seconds``, so a restart resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        tool: Callable[[], TodoServiceTool],
+        path: str,
+        max_concurrency: int = 4,
+        retry_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._tool = tool
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._queued: Dict[str, _Write] = {}
+        self._in_flight: Set[str] = set()
+        self._aliases: Dict[str, str] = {}
+        self._failures: Dict[str, List[str]] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.logger = get_logger("write_behind")
+        # One connection for the queue's lifetime; every use holds ``_lock``.
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS writes (seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " op TEXT, todo_id TEXT, payload TEXT, session_id TEXT)"
+        )
+        self._load()
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queued) + len(self._in_flight)
+
+    # Tool-shaped entry points ---------------------------------------------
+
+    def create_todo(self, data: Dict[str, Any], rate_limited: bool = True) -> TodoItem:
+        payload = self._tool()._validate_payload(data)
+        todo_id = f"local-{uuid.uuid4().hex[:8]}"
+        self._enqueue("create", todo_id, payload)
+        return TodoItem.from_api({**payload, "id": todo_id})
+
+    def update_todo(self, todo_id: str, data: Dict[str, Any]) -> TodoItem:
+        tool = self._tool()
+        return self._update(tool._sanitize(todo_id), tool._validate_payload(data))
+
+    def delete_todo(self, todo_id: str, rate_limited: bool = True) -> TodoItem:
+        todo_id = self._tool()._sanitize(todo_id)
+        self._enqueue("delete", todo_id, None)
+        return TodoItem.from_api({"id": todo_id})
+
+    def bulk_update(self, updates: Mapping[str, Dict[str, Any]]) -> BulkResult:
+        tool = self._tool()
+        fetched: Dict[str, TodoItem] = {}
+        if any(tool._cache.get(str(todo_id)) is None for todo_id in updates):
+            # Same as the tool: one fetch supplies the fields of uncached items.
+            todos = tool.list_todos(use_cache=False)
+            fetched = {str(todo.id): todo for todo in todos}
+        outcomes: List[Any] = []
+        for todo_id, data in updates.items():
+            try:
+                payload = tool._bulk_update_payload(str(todo_id), data, fetched)
+                outcomes.append(self._update(tool._sanitize(str(todo_id)), payload))
+            except (LookupError, ValueError) as exc:
+                outcomes.append(exc)
+        return tool._collect_bulk("update", [str(key) for key in updates], outcomes)
+
+    def bulk_delete(self, todo_ids: Iterable[str]) -> BulkResult:
+        tool = self._tool()
+        keys = [str(todo_id) for todo_id in todo_ids]
+        outcomes: List[Any] = []
+        for todo_id in keys:
+            try:
+                outcomes.append(self.delete_todo(todo_id))
+            except ValueError as exc:
+                outcomes.append(exc)
+        return tool._collect_bulk("delete", keys, outcomes)
+
+    def take_failures(self, session_id: Optional[str]) -> List[str]:
+        """Return and forget the rejected writes made from ``session_id``.
+
+        Anonymous writes (no session id) are only logged: there is no way to
+        tell which anonymous client made them.
+        """
+
+        if session_id is None:
+            return []
+        with self._lock:
+            return self._failures.pop(session_id, [])
+
+    # Worker ----------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, drain_seconds: float = 0.0) -> None:
+        """Give queued writes up to ``drain_seconds`` to land, then stop.
+
+        Whatever is still queued stays in the journal for the next start.
+        """
+
+        deadline = self._clock() + drain_seconds
+        while self.pending and self._clock() < deadline:
+            self._wake.set()
+            time.sleep(0.05)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.pending:
+            self.logger.warning("write_behind_stopped", pending=self.pending)
+
+    def close(self, drain_seconds: float = 0.0) -> None:
+        """Stop the worker and close the journal."""
+
+        self.stop(drain_seconds)
+        with self._lock:
+            self._db.close()
+
+    def _run(self) -> None:
+        with ThreadPoolExecutor(
+            self.max_concurrency, thread_name_prefix="write-behind"
+        ) as pool:
+            while not self._stop.is_set():
+                self._wake.clear()
+                for write in self._take():
+                    pool.submit(self._flush, write)
+                self._wake.wait(self.retry_seconds if self.pending else None)
+
+    def _take(self) -> List[_Write]:
+        now = self._clock()
+        with self._lock:
+            room = self.max_concurrency - len(self._in_flight)
+            ready = [
+                write
+                for todo_id, write in self._queued.items()
+                if todo_id not in self._in_flight and write.retry_at <= now
+            ][: max(0, room)]
+            for write in ready:
+                del self._queued[write.todo_id]
+                self._in_flight.add(write.todo_id)
+        return ready
+
+    def _flush(self, write: _Write) -> None:
+        try:
+            tool = self._tool()
+            with rate_limit_scope(write.session_id):
+                if write.op == "create":
+                    todo = tool.create_todo(write.payload or {})
+                elif write.op == "update":
+                    todo = tool._put(write.todo_id, write.payload or {})
+                else:
+                    todo = tool.delete_todo(write.todo_id)
+        except Exception as exc:
+            self._failed(write, exc)
+        else:
+            self._done(write, todo)
+        finally:
+            self._wake.set()
+
+    def _done(self, write: _Write, todo: TodoItem) -> None:
+        with self._lock:
+            if write.op == "create" and todo.id is not None:
+                self._resolve(write.todo_id, str(todo.id))
+            self._in_flight.discard(write.todo_id)
+            self._delete_rows([write])
+        emit_metric("write_behind", 1, op=write.op, result="flushed")
+
+    def _failed(self, write: _Write, exc: Exception) -> None:
+        from .todo_tool import _non_retryable_http_error
+
+        if isinstance(exc, ValueError) or _non_retryable_http_error(exc):
+            self._reject(write, str(exc) or type(exc).__name__)
+            return
+        with self._lock:
+            self._in_flight.discard(write.todo_id)
+            write.retry_at = self._clock() + self.retry_seconds
+            later = self._queued.pop(write.todo_id, None)
+            merged: Optional[_Write] = write
+            if later is not None:
+                try:
+                    merged = _coalesce(write, later.op, later.payload)
+                except ValueError as error:
+                    self._note_failure(later, str(error))
+                self._delete_rows([later])
+            if merged is None:
+                self._delete_rows([write])
+            else:
+                self._queued = {merged.todo_id: merged, **self._queued}
+                self._save(merged)
+        emit_metric("write_behind", 1, op=write.op, result="retry")
+        self.logger.warning(
+            "write_behind_retry", op=write.op, todo_id=write.todo_id, error=str(exc)
+        )
+
+    def _reject(self, write: _Write, error: str) -> None:
+        with self._lock:
+            self._in_flight.discard(write.todo_id)
+            rejected = [write]
+            if write.op == "create" and write.todo_id in self._queued:
+                # Later writes to a todo that was never created cannot land.
+                rejected.append(self._queued.pop(write.todo_id))
+            for failed in rejected:
+                self._note_failure(failed, error)
+            self._delete_rows(rejected)
+        emit_metric("write_behind", 1, op=write.op, result="rejected")
+        self.logger.error(
+            "write_behind_rejected", op=write.op, todo_id=write.todo_id, error=error
+        )
+
+    def _note_failure(self, write: _Write, error: str) -> None:
+        if write.session_id is None:
+            return
+        self._failures.setdefault(write.session_id, []).append(
+            f"{write.op} of todo {write.todo_id} failed: {error}"
+        )
+
+    def _resolve(self, local_id: str, todo_id: str) -> None:
+        self._aliases[local_id] = todo_id
+        queued = self._queued.pop(local_id, None)
+        if queued is not None:
+            queued.todo_id = todo_id
+            self._queued[todo_id] = queued
+            self._save(queued)
+
+    # Journal ---------------------------------------------------------------
+
+    def _update(self, todo_id: str, payload: Dict[str, Any]) -> TodoItem:
+        self._enqueue("update", todo_id, payload)
+        return TodoItem.from_api({**payload, "id": todo_id})
+
+    def _enqueue(
+        self, op: str, todo_id: str, payload: Optional[Dict[str, Any]]
+    ) -> None:
+        with self._lock:
+            todo_id = self._aliases.get(todo_id, todo_id)
+            queued = self._queued.get(todo_id)
+            if queued is None:
+                write = _Write(op, todo_id, payload, current_rate_limit_key())
+                self._queued[todo_id] = write
+                self._save(write)
+                result = "queued"
+            else:
+                merged = _coalesce(queued, op, payload)
+                if merged is None:
+                    del self._queued[todo_id]
+                    self._delete_rows([queued])
+                    result = "cancelled"
+                else:
+                    self._save(merged)
+                    result = "coalesced"
+        emit_metric("write_behind", 1, op=op, result=result)
+        self._wake.set()
+
+    def _save(self, write: _Write) -> None:
+        row = (
+            write.op,
+            write.todo_id,
+            None if write.payload is None else json.dumps(write.payload),
+            write.session_id,
+        )
+        with self._db as db:
+            if write.seq is None:
+                cursor = db.execute(
+                    "INSERT INTO writes (op, todo_id, payload, session_id)"
+                    " VALUES (?, ?, ?, ?)",
+                    row,
+                )
+                write.seq = cursor.lastrowid
+            else:
+                db.execute(
+                    "UPDATE writes SET op = ?, todo_id = ?, payload = ?,"
+                    " session_id = ? WHERE seq = ?",
+                    (*row, write.seq),
+                )
+
+    def _delete_rows(self, writes: List[_Write]) -> None:
+        seqs = [(write.seq,) for write in writes if write.seq is not None]
+        if seqs:
+            with self._db as db:
+                db.executemany("DELETE FROM writes WHERE seq = ?", seqs)
+
+    def _load(self) -> None:
+        rows = self._db.execute(
+            "SELECT seq, op, todo_id, payload, session_id FROM writes ORDER BY seq"
+        ).fetchall()
+        for seq, op, todo_id, payload, session_id in rows:
+            write = _Write(
+                op,
+                todo_id,
+                None if payload is None else json.loads(payload),
+                session_id,
+                seq,
+            )
+            queued = self._queued.get(todo_id)
+            if queued is None:
+                self._queued[todo_id] = write
+                continue
+            # A write queued behind one that was in flight at shutdown.
+            try:
+                merged = _coalesce(queued, write.op, write.payload)
+            except ValueError:
+                merged = queued
+            self._delete_rows([write])
+            if merged is None:
+                del self._queued[todo_id]
+                self._delete_rows([queued])
+            else:
+                self._save(merged)
+        if rows:
+            self.logger.info("write_behind_resumed", pending=len(self._queued))
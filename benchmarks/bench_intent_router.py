@@ -0,0 +1,66 @@
+"""Micro-benchmark: compiled IntentRouter vs. the original keyword scan.
+
+Run with ``python -m benchmarks.bench_intent_router``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import timeit
+from typing import Dict, List
+
+from agent.intent_router import IntentRouter
+
+MESSAGES: List[str] = [
+    "list todos",
+    "show me everything that is still open",
+    "create todo title: Buy milk; description: 2 litres",
+    "please add a reminder to call the bank",
+    "update todo id:42 status: done",
+    "edit id:7 title: Renamed task",
+    "delete todo id:3",
+    "remove the todo with id:9",
+    "what can you do?",
+    "change my shipping address before friday",
+    "create todo title: " + "a very long pasted description of the task " * 20,
+]
+
+
+def legacy_decide_action(message: str) -> Dict[str, str]:
+    """The substring scan ``TodoOrchestrator._decide_action`` used before."""
+
+    lowered = message.lower()
+    if any(unsafe in lowered for unsafe in ["/rm", "drop table", "delete from"]):
+        raise ValueError("Unsafe instruction detected. Please rephrase your request.")
+    if "list" in lowered or "show" in lowered:
+        return {"action": "list"}
+    if "create" in lowered or "add" in lowered:
+        return {"action": "create"}
+    if "update" in lowered or "edit" in lowered:
+        return {"action": "update"}
+    if "delete" in lowered or "remove" in lowered:
+        return {"action": "delete"}
+    return {"action": "clarify"}
+
+
+def run(number: int) -> Dict[str, float]:
+    router = IntentRouter()
+    results: Dict[str, float] = {}
+    for name, fn in (("legacy", legacy_decide_action), ("router", router.route)):
+        elapsed = timeit.timeit(
+            lambda fn=fn: [fn(message) for message in MESSAGES], number=number
+        )
+        results[name] = elapsed / (number * len(MESSAGES)) * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20_000)
+    args = parser.parse_args()
+    for name, per_message_us in run(args.number).items():
+        print(f"{name:>8}: {per_message_us:.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
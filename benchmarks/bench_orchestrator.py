@@ -0,0 +1,228 @@
+"""End-to-end latency and throughput of ``TodoOrchestrator`` against a fake API.
+
+Starts ``benchmarks.fake_todo_api`` in a child process, drives
+``TodoOrchestrator.handle`` from ``--concurrency`` threads (one session each)
+and reports p50/p95/p99 latency, throughput and peak RSS per scenario. Results
+are written as JSON; pass ``--compare`` with an earlier file to see the deltas.
+
+Run with ``make bench`` or ``python -m benchmarks.bench_orchestrator``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from agent.config import Config
+from agent.main import Message, TodoOrchestrator
+from agent.observability import configure_logging, configure_tracing
+from benchmarks.fake_todo_api import FakeTodoAPI
+
+ERROR_REPLY_PREFIX = "I ran into an error"
+SCENARIOS = ("list", "list_cached", "create", "update", "delete")
+
+
+def build_agent(base_url: str, cache_ttl_seconds: int) -> TodoOrchestrator:
+    config = Config(
+        todo_api_base_url=base_url,
+        vertex_location="us-central1",
+        vertex_project_id="bench",
+        google_application_credentials=None,
+        max_context_tokens=2048,
+        rate_limit_per_minute=1_000_000_000,
+        cache_ttl_seconds=cache_ttl_seconds,
+    )
+    return TodoOrchestrator(config)
+
+
+def percentile(sorted_ms: List[float], q: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    index = min(len(sorted_ms) - 1, max(0, round(q * len(sorted_ms)) - 1))
+    return sorted_ms[index]
+
+
+def drive(
+    agent: TodoOrchestrator,
+    queries: Callable[[int], str],
+    requests: int,
+    concurrency: int,
+) -> Dict[str, Any]:
+    """Send ``requests`` messages from ``concurrency`` threads and time each one."""
+
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker(session: int) -> None:
+        nonlocal errors
+        while True:
+            index = next(counter)
+            if index >= requests:
+                return
+            message = Message(
+                role="user", content=queries(index), session_id=f"bench-{session}"
+            )
+            start = time.perf_counter()
+            reply = agent.handle(message)
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+                if reply.startswith(ERROR_REPLY_PREFIX):
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(worker, session) for session in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "concurrency": concurrency,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    api = FakeTodoAPI(
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        collection_size=args.collection_size,
+    )
+    base_url = api.start(args.port)
+    agent = build_agent(base_url, cache_ttl_seconds=0)
+    cached_agent = build_agent(base_url, cache_ttl_seconds=3600)
+    first_new_id = args.collection_size + 1
+    scenarios: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "list": lambda: drive(
+            agent, lambda i: "list todos", args.requests, args.concurrency
+        ),
+        "list_cached": lambda: drive(
+            cached_agent, lambda i: "list todos", args.requests, args.concurrency
+        ),
+        "create": lambda: drive(
+            agent,
+            lambda i: f"create todo title: Bench {i}",
+            args.requests,
+            args.concurrency,
+        ),
+        # Created todos get consecutive ids, so update and delete exactly those.
+        "update": lambda: drive(
+            agent,
+            lambda i: f"update todo id:{first_new_id + i} status: done",
+            args.requests,
+            args.concurrency,
+        ),
+        "delete": lambda: drive(
+            agent,
+            lambda i: f"delete todo id:{first_new_id + i}",
+            args.requests,
+            args.concurrency,
+        ),
+    }
+    results: Dict[str, Any] = {}
+    try:
+        cached_agent.handle(Message(role="user", content="list todos"))  # warm up
+        for name in SCENARIOS:
+            if name in args.scenarios:
+                results[name] = scenarios[name]()
+                print(_format_row(name, results[name]))
+    finally:
+        agent.close()
+        cached_agent.close()
+        api.stop()
+    return {"meta": _metadata(args), "scenarios": results}
+
+
+def _metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=False,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "args": {key: value for key, value in vars(args).items() if key != "compare"},
+    }
+
+
+def _format_row(name: str, result: Dict[str, Any]) -> str:
+    return (
+        f"{name:<12} p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms"
+        f"  p99 {result['p99_ms']:7.2f} ms  {result['throughput_rps']:8.1f} req/s"
+        f"  errors {result['errors']}  rss {result['max_rss_kb'] / 1024:.0f} MiB"
+    )
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    print(f"\nchange vs {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        deltas = [
+            f"{metric} {_delta(before[metric], result[metric])}"
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        ]
+        print(f"{name:<12} " + "  ".join(deltas))
+
+
+def _delta(before: float, after: float) -> str:
+    return f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--collection-size", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--output", default="bench_results/orchestrator.json")
+    parser.add_argument("--compare", help="earlier results file to diff against")
+    args = parser.parse_args(argv)
+
+    # Keep the real logging path (queue + background writer) but discard output.
+    configure_logging(stream=open(os.devnull, "w"))
+    configure_tracing(exporter="none")
+    results = run(args)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as handle:
+        json.dump(results, handle, indent=2)
+    print(f"results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            compare(results, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Micro-benchmark: PayloadParser vs. the original per-field regex scans.
+
+Run with ``python -m benchmarks.bench_payload_parser``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import timeit
+from typing import Dict, Optional
+
+from agent.payload_parser import PayloadParser
+
+SHORT = "update todo id:42 status: done; title: Pay rent"
+LONG = (
+    "create todo title: Quarterly report; description: "
+    + "notes pasted from the planning doc, " * 400
+    + "; status: open"
+)
+
+
+def legacy_extract(text: str) -> Dict[str, str]:
+    """``_extract_payload`` followed by ``_extract_id`` as they used to run."""
+
+    payload: Dict[str, str] = {}
+    patterns = {
+        "title": r"title:\s*([^;]+)",
+        "description": r"description:\s*([^;]+)",
+        "status": r"status:\s*([^;]+)",
+        "id": r"id:\s*([^;\s]+)",
+    }
+    for key, pattern in patterns.items():
+        match = re.search(pattern, text, flags=re.IGNORECASE)
+        if match:
+            payload[key] = match.group(1).strip()
+    id_match: Optional[re.Match[str]] = re.search(
+        r"id:\s*([^;\s]+)", text, flags=re.IGNORECASE
+    )
+    if id_match:
+        payload["id"] = id_match.group(1)
+    return payload
+
+
+def run(number: int) -> Dict[str, Dict[str, float]]:
+    parser = PayloadParser()
+    results: Dict[str, Dict[str, float]] = {}
+    for label, text in (("short", SHORT), ("long", LONG)):
+        results[label] = {}
+        for name, fn in (("legacy", legacy_extract), ("parser", parser.parse)):
+            elapsed = timeit.timeit(lambda fn=fn: fn(text), number=number)
+            results[label][name] = elapsed / number * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=5_000)
+    args = parser.parse_args()
+    for label, timings in run(args.number).items():
+        for name, per_call_us in timings.items():
+            print(f"{label:>6} {name:>7}: {per_call_us:.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Throughput of the compiled SafetyPolicy vs. the per-token substring scan.
+
+Runs both over realistic messages, near-miss and blocked adversarial inputs,
+with the default rules and with synthetic rule sets of growing size.
+
+Run with ``python -m benchmarks.bench_safety``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import timeit
+from typing import Callable, Dict, List, Optional, Sequence
+
+from agent.safety import DEFAULT_BLOCKED_PHRASES, SafetyPolicy
+from benchmarks.bench_intent_router import MESSAGES
+
+ADVERSARIAL: List[str] = [
+    "drop tabl " * 200,  # near misses on every offset
+    "-" + " -" * 500,
+    "/r" * 500,
+    "delete fro" * 100 + "m",  # blocked, but only at the very end
+    "list todos; DROP\t\tTABLE users",
+    "create todo title: " + "ünïcödé ✓ " * 100,
+    "x" * 10_000,
+]
+
+PATTERNS: Dict[str, str] = {
+    "sql_union": r"\bunion\s+select\b",
+    "shell_subst": r"\$\([^)]*\)",
+    "path_traversal": r"\.\./\.\./",
+    "script_tag": r"<\s*script\b",
+}
+
+
+def synthetic_phrases(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    phrases = list(DEFAULT_BLOCKED_PHRASES)
+    while len(phrases) < count:
+        words = [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        phrases.append(" ".join(words))
+    return phrases
+
+
+def legacy_scan(phrases: Sequence[str]) -> Callable[[str], Optional[str]]:
+    """The lower-then-``in`` loop ``TodoServiceTool._sanitize`` used before."""
+
+    def scan(text: str) -> Optional[str]:
+        lowered = text.lower()
+        for phrase in phrases:
+            if phrase in lowered:
+                return phrase
+        return None
+
+    return scan
+
+
+def run(number: int, sizes: Sequence[int]) -> Dict[str, Dict[str, float]]:
+    """Microseconds per input for each checker, rule-set size and corpus."""
+
+    corpora = {"realistic": MESSAGES, "adversarial": ADVERSARIAL}
+    results: Dict[str, Dict[str, float]] = {}
+    for size in sizes:
+        phrases = synthetic_phrases(size)
+        checkers = {
+            "legacy": legacy_scan(phrases),
+            "policy": SafetyPolicy(phrases).check,
+            "policy+regex": SafetyPolicy(phrases, PATTERNS).check,
+        }
+        for name, check in checkers.items():
+            row = results.setdefault(f"{name}/{size}", {})
+            for corpus_name, corpus in corpora.items():
+                elapsed = timeit.timeit(
+                    lambda check=check, corpus=corpus: [check(t) for t in corpus],
+                    number=number,
+                )
+                row[corpus_name] = elapsed / (number * len(corpus)) * 1e6
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=500)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 100, 500])
+    args = parser.parse_args()
+    print(f"{'rules':>18}  {'realistic':>12}  {'adversarial':>12}  (us/input)")
+    for name, result in run(args.number, args.sizes).items():
+        print(f"{name:>18}  {result['realistic']:12.2f}  {result['adversarial']:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
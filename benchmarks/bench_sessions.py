@@ -0,0 +1,54 @@
+"""Memory benchmark: bytes per session held by ``SessionStore``.
+
+Run with ``python -m benchmarks.bench_sessions``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import tracemalloc
+from typing import Dict
+
+from agent.sessions import SessionStore
+
+TURNS = [
+    ("user", "create todo title: Buy milk; description: 2 litres"),
+    ("assistant", "Created todo 'Buy milk' with id 42."),
+    ("user", "mark that one done"),
+    ("assistant", "Updated 1 todo (42) to status done."),
+]
+
+
+def run(sessions: int, rounds: int, max_context_tokens: int) -> Dict[str, float]:
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    store = SessionStore(max_context_tokens, max_sessions=sessions)
+    for index in range(sessions):
+        session_id = f"session-{index}"
+        for _ in range(rounds):
+            for role, content in TURNS:
+                # Fresh strings, as messages arriving over the wire would be.
+                store.record(session_id, role, "".join(content), ["42"])
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    turns = sum(len(store.get(f"session-{i}").turns) for i in range(sessions))
+    return {
+        "bytes_per_session": allocated / sessions,
+        "turns_per_session": turns / sessions,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=2_000)
+    parser.add_argument("--rounds", type=int, default=25)
+    parser.add_argument("--max-context-tokens", type=int, default=256)
+    args = parser.parse_args()
+    result = run(args.sessions, args.rounds, args.max_context_tokens)
+    print(f"bytes/session: {result['bytes_per_session']:.0f}")
+    print(f"turns/session: {result['turns_per_session']:.1f} (after trimming)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: ``TodoItem`` vs. the per-item dicts ``_normalize`` used to build.
+
+Reports construction time and retained memory at 10k and 100k todos. Run with
+``python -m benchmarks.bench_todo_items``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from agent.todo_tool import TodoItem
+
+STATUSES = ("open", "in_progress", "done")
+
+
+def legacy_normalize(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """The dict ``_TodoToolBase._normalize`` returned before ``TodoItem``."""
+
+    return {
+        "id": payload.get("id") or payload.get("ID"),
+        "title": payload.get("title"),
+        "description": payload.get("description", ""),
+        "status": payload.get("status", "open"),
+    }
+
+
+def api_payload(count: int) -> List[Dict[str, Any]]:
+    # Built the way json.loads would: every status is a separate string object.
+    return [
+        {
+            "id": str(index),
+            "title": f"Task {index}",
+            "description": "",
+            "status": "".join(STATUSES[index % 3]),
+        }
+        for index in range(count)
+    ]
+
+
+def measure(build: Callable[[Dict[str, Any]], Any], size: int) -> Tuple[float, int]:
+    payload = api_payload(size)
+    gc.collect()
+    start = time.perf_counter()
+    items = [build(item) for item in payload]
+    elapsed = time.perf_counter() - start
+    del items, payload
+    gc.collect()
+    # Retained memory is what survives once the decoded JSON is dropped, so
+    # strings the items still reference (e.g. per-item status) are counted.
+    tracemalloc.start()
+    payload = api_payload(size)
+    items = [build(item) for item in payload]
+    del payload
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return elapsed, retained
+
+
+def run(sizes: List[int]) -> List[Dict[str, Any]]:
+    rows = []
+    for size in sizes:
+        for name, build in (
+            ("dict", legacy_normalize),
+            ("TodoItem", TodoItem.from_api),
+        ):
+            elapsed, retained = measure(build, size)
+            rows.append(
+                {
+                    "size": size,
+                    "name": name,
+                    "us_per_item": elapsed / size * 1e6,
+                    "bytes_per_item": retained / size,
+                }
+            )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+    for row in run(args.sizes):
+        print(
+            f"{row['size']:>7} {row['name']:>8}: {row['us_per_item']:.2f} us/item, "
+            f"{row['bytes_per_item']:.0f} bytes/item"
+        )
+
+
+if __name__ == "__main__":
+    main()
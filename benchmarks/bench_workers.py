@@ -0,0 +1,173 @@
+"""HTTP throughput of ``serve_workers`` as the number of worker processes grows.
+
+Starts the fake Todo API, then for each ``--workers`` count launches the
+multi-process server, drives it over HTTP from ``--concurrency`` client
+connections for ``--seconds`` and reports throughput, latency, speedup over
+one worker and the request rate that reached the fake API, next to the
+``RATE_LIMIT_PER_MINUTE`` budget the workers share. Scaling can only be
+near-linear up to the number of CPUs left over by the client and fake API.
+
+Run with ``python -m benchmarks.bench_workers --workers 1 2 4``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import multiprocessing
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+import requests
+
+from agent.config import Config
+from agent.workers import serve_workers
+from benchmarks.bench_orchestrator import ERROR_REPLY_PREFIX, percentile
+from benchmarks.fake_todo_api import FakeTodoAPI
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_until_serving(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if requests.get(f"{url}/healthz", timeout=1).ok:
+                return
+        except requests.RequestException:
+            pass
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{url} did not come up")
+        time.sleep(0.1)
+
+
+def query(index: int, write_percent: int, collection_size: int) -> str:
+    if write_percent and index % 100 < write_percent:
+        return f"update todo id:{index % collection_size + 1} status: done"
+    return "list todos"
+
+
+async def drive(url: str, args: argparse.Namespace, seconds: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    deadline = time.perf_counter() + seconds
+
+    async def client(session: aiohttp.ClientSession, number: int) -> None:
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            body = {
+                "query": query(next(counter), args.write_percent, args.collection_size),
+                "session_id": f"bench-{number}",
+            }
+            start = time.perf_counter()
+            async with session.post(f"{url}/query", json=body) as response:
+                reply = await response.json()
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status != 200 or reply["reply"].startswith(ERROR_REPLY_PREFIX):
+                errors += 1
+
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    started = time.perf_counter()
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await asyncio.gather(
+            *(client(session, number) for number in range(args.concurrency))
+        )
+    wall = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": len(latencies) / wall,
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def run_pool(
+    api: FakeTodoAPI, workers: int, args: argparse.Namespace
+) -> Dict[str, Any]:
+    config = _config(api.base_url, args)
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    context = multiprocessing.get_context("spawn")
+    launcher = context.Process(
+        target=serve_workers,
+        args=(config, workers),
+        kwargs={"port": port},
+        daemon=False,
+    )
+    launcher.start()
+    try:
+        wait_until_serving(url)
+        asyncio.run(drive(url, args, args.warmup_seconds))
+        before = api.requests_served()
+        result = asyncio.run(drive(url, args, args.seconds))
+        upstream = api.requests_served() - before
+    finally:
+        launcher.terminate()
+        launcher.join()
+    result["upstream_rps"] = upstream / args.seconds
+    return result
+
+
+def _config(base_url: str, args: argparse.Namespace) -> Config:
+    return Config(
+        todo_api_base_url=base_url,
+        vertex_location="us-central1",
+        vertex_project_id="bench",
+        google_application_credentials=None,
+        max_context_tokens=2048,
+        rate_limit_per_minute=args.rate_limit_per_minute,
+        cache_ttl_seconds=args.cache_ttl_seconds,
+        tracing_enabled=False,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--warmup-seconds", type=float, default=2.0)
+    parser.add_argument("--rate-limit-per-minute", type=int, default=600)
+    parser.add_argument("--cache-ttl-seconds", type=int, default=1)
+    parser.add_argument("--write-percent", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--collection-size", type=int, default=100)
+    parser.add_argument("--api-port", type=int, default=8081)
+    args = parser.parse_args(argv)
+
+    api = FakeTodoAPI(latency_ms=args.latency_ms, collection_size=args.collection_size)
+    api.start(args.api_port)
+    limit_rps = args.rate_limit_per_minute / 60
+    print(f"cpus {os.cpu_count()}  upstream budget {limit_rps:.1f} req/s")
+    print(
+        f"{'workers':>7}  {'req/s':>9}  {'speedup':>7}  {'p50 ms':>8}  {'p99 ms':>8}"
+        f"  {'errors':>6}  {'upstream req/s':>14}"
+    )
+    baseline = None
+    try:
+        for workers in args.workers:
+            result = run_pool(api, workers, args)
+            baseline = baseline or result["throughput_rps"]
+            print(
+                f"{workers:>7}  {result['throughput_rps']:9.1f}"
+                f"  {result['throughput_rps'] / baseline:6.2f}x"
+                f"  {result['p50_ms']:8.2f}  {result['p99_ms']:8.2f}"
+                f"  {result['errors']:>6}  {result['upstream_rps']:14.2f}"
+            )
+    finally:
+        api.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Stand-in Todo API for benchmarks, with configurable latency and error rate.
+
+Serves the endpoints ``TodoServiceTool`` calls (``GET/POST /todos``,
+``PUT/DELETE /todos/{id}``) from an in-memory collection, including
+``status``/``limit``/``cursor`` filtering and ETag revalidation.
+``GET /_stats`` reports how many of those requests it has served. Run it on its
+own with ``python -m benchmarks.fake_todo_api --port 8081`` or start it in a
+child process with ``FakeTodoAPI.start()``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import random
+import time
+from typing import Any, Dict, Optional
+
+import requests
+from aiohttp import web
+
+STATUSES = ("open", "in_progress", "done")
+
+
+class FakeTodoAPI:
+    def __init__(
+        self,
+        latency_ms: float = 5.0,
+        error_rate: float = 0.0,
+        collection_size: int = 100,
+        etag: bool = True,
+        seed: int = 0,
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.collection_size = collection_size
+        self.etag = etag
+        self.seed = seed
+        self._process: Optional[multiprocessing.Process] = None
+        self.base_url = ""
+
+    # Server side -----------------------------------------------------------
+
+    def build_app(self) -> web.Application:
+        self._random = random.Random(self.seed)
+        self._todos: Dict[str, Dict[str, Any]] = {}
+        for index in range(1, self.collection_size + 1):
+            self._todos[str(index)] = {
+                "id": str(index),
+                "title": f"Todo {index}",
+                "description": "seeded by the benchmark",
+                "status": STATUSES[index % len(STATUSES)],
+            }
+        self._next_id = self.collection_size + 1
+        self._version = 0
+        self._requests = 0
+        app = web.Application(middlewares=[self._simulate])
+        app.router.add_get("/_stats", self.stats)
+        app.router.add_get("/todos", self.list_todos)
+        app.router.add_post("/todos", self.create_todo)
+        app.router.add_put("/todos/{todo_id}", self.update_todo)
+        app.router.add_delete("/todos/{todo_id}", self.delete_todo)
+        return app
+
+    @web.middleware
+    async def _simulate(self, request: web.Request, handler: Any) -> web.StreamResponse:
+        if request.path == "/_stats":
+            return await handler(request)
+        self._requests += 1
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if self.error_rate and self._random.random() < self.error_rate:
+            return web.json_response({"error": "injected failure"}, status=503)
+        return await handler(request)
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self._requests})
+
+    async def list_todos(self, request: web.Request) -> web.Response:
+        etag = f'"v{self._version}"'
+        if self.etag and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        todos = list(self._todos.values())
+        status = request.query.get("status")
+        if status:
+            todos = [todo for todo in todos if todo["status"] == status]
+        start = int(request.query.get("cursor", 0))
+        limit = request.query.get("limit")
+        headers = {"ETag": etag} if self.etag else {}
+        if limit is None:
+            return web.json_response(todos[start:], headers=headers)
+        end = start + int(limit)
+        body: Dict[str, Any] = {"items": todos[start:end]}
+        if end < len(todos):
+            body["next_cursor"] = str(end)
+        return web.json_response(body, headers=headers)
+
+    async def create_todo(self, request: web.Request) -> web.Response:
+        payload = await request.json()
+        todo_id = str(self._next_id)
+        self._next_id += 1
+        todo = {"id": todo_id, "status": "open", "description": "", **payload}
+        self._todos[todo_id] = todo
+        self._version += 1
+        return web.json_response(todo, status=201)
+
+    async def update_todo(self, request: web.Request) -> web.Response:
+        todo = self._todos.get(request.match_info["todo_id"])
+        if todo is None:
+            return web.json_response({"error": "not found"}, status=404)
+        todo.update(await request.json())
+        self._version += 1
+        return web.json_response(todo)
+
+    async def delete_todo(self, request: web.Request) -> web.Response:
+        todo = self._todos.pop(request.match_info["todo_id"], None)
+        if todo is None:
+            return web.json_response({"error": "not found"}, status=404)
+        self._version += 1
+        return web.json_response(todo)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 8081) -> None:
+        web.run_app(self.build_app(), host=host, port=port, print=None)
+
+    # Benchmark side --------------------------------------------------------
+
+    def start(self, port: int = 8081) -> str:
+        """Serve from a child process so it does not compete for our GIL."""
+
+        self._process = multiprocessing.Process(
+            target=self.serve, kwargs={"port": port}, daemon=True
+        )
+        self._process.start()
+        self.base_url = f"http://127.0.0.1:{port}"
+        _wait_until_up(self.base_url)
+        return self.base_url
+
+    def requests_served(self) -> int:
+        return requests.get(f"{self.base_url}/_stats", timeout=5).json()["requests"]
+
+    def stop(self) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+
+def _wait_until_up(base_url: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            requests.get(f"{base_url}/todos", params={"limit": 1}, timeout=1)
+            return
+        except requests.ConnectionError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--collection-size", type=int, default=100)
+    parser.add_argument("--no-etag", action="store_true")
+    args = parser.parse_args()
+    FakeTodoAPI(
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        collection_size=args.collection_size,
+        etag=not args.no_etag,
+    ).serve(port=args.port)
+
+
+if __name__ == "__main__":
+    main()
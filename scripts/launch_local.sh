@@ -5,4 +5,4 @@ if [ -f .env ]; then
   export $(grep -v '^#' .env | xargs)
 fi
 
-python -m agent.main
+python -m agent.main "$@"
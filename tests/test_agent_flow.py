@@ -1,17 +1,24 @@
-from typing import Dict
+import asyncio
+from typing import Any, Dict, List
 
 from agent.config import Config
 from agent.main import Message, TodoOrchestrator
+from agent.todo_tool import BulkResult, TodoItem
 
 
 class DummyTool:
     def __init__(self) -> None:
-        self.calls: Dict[str, Dict[str, str]] = {}
+        self.calls: Dict[str, Any] = {}
 
-    def list_todos(self, use_cache: bool = True):
-        self.calls["list"] = {}
+    def list_todos(self, use_cache: bool = True, **filters):
+        self.calls["list"] = {key: str(value) for key, value in filters.items()}
         return [{"id": "1", "title": "Test", "status": "open"}]
 
+    def iter_todos(self, limit=None, status=None):
+        self.calls["iter"] = {"limit": str(limit)}
+        todos = [{"id": str(i), "title": f"T{i}", "status": "open"} for i in range(250)]
+        return iter(todos[:limit])
+
     def create_todo(self, data: Dict[str, str]):
         self.calls["create"] = data
         return {"id": "2", **data}
@@ -24,6 +31,25 @@ class DummyTool:
         self.calls["delete"] = {"id": todo_id}
         return {"id": todo_id}
 
+    def bulk_update(self, updates: Dict[str, Dict[str, str]]):
+        self.calls["bulk_update"] = updates
+        return BulkResult(succeeded={key: TodoItem(key, None) for key in updates})
+
+    def bulk_delete(self, todo_ids: List[str]):
+        self.calls["bulk_delete"] = {"ids": todo_ids}
+        return BulkResult(
+            succeeded={key: TodoItem(key, None) for key in todo_ids[:-1]},
+            failed={todo_ids[-1]: "not found"},
+        )
+
+
+class AsyncDummyTool(DummyTool):
+    async def list_todos(self, use_cache: bool = True, **filters):  # type: ignore[override]
+        return DummyTool.list_todos(self, use_cache, **filters)
+
+    async def create_todo(self, data: Dict[str, str]):  # type: ignore[override]
+        return DummyTool.create_todo(self, data)
+
 
 def build_agent() -> TodoOrchestrator:
     cfg = Config(
@@ -37,6 +63,7 @@ def build_agent() -> TodoOrchestrator:
     )
     agent = TodoOrchestrator(cfg)
     agent.tool = DummyTool()  # type: ignore[assignment]
+    agent.async_tool = AsyncDummyTool()  # type: ignore[assignment]
     return agent
 
 
@@ -65,3 +92,104 @@ def test_agent_needs_id_for_delete():
     agent = build_agent()
     reply = agent.handle(Message(role="user", content="delete todo"))
     assert "provide the todo id" in reply
+
+
+def test_agent_handles_messages_async():
+    agent = build_agent()
+
+    async def converse():
+        return await asyncio.gather(
+            agent.handle_async(Message(role="user", content="list todos")),
+            agent.handle_async(Message(role="user", content="create todo title: New")),
+        )
+
+    listed, created = asyncio.run(converse())
+    assert "Here are your todos" in listed
+    assert "Created todo" in created
+    assert agent.async_tool.calls["create"]["title"] == "New"
+
+
+def test_agent_marks_a_range_done_in_bulk():
+    agent = build_agent()
+    reply = agent.handle(Message(role="user", content="mark 3-5 done"))
+    assert agent.tool.calls["bulk_update"] == {
+        todo_id: {"status": "done"} for todo_id in ("3", "4", "5")
+    }
+    assert reply == "Updated 3 todos (3, 4, 5) to status done."
+
+
+def test_agent_deletes_listed_ids_and_reports_failures():
+    agent = build_agent()
+    reply = agent.handle(Message(role="user", content="delete 1, 4 and 9"))
+    assert agent.tool.calls["bulk_delete"] == {"ids": ["1", "4", "9"]}
+    assert reply == "Deleted 2 todos (1, 4). Failed: 9: not found."
+
+
+def test_agent_resolves_that_one_within_a_session():
+    agent = build_agent()
+    agent.handle(
+        Message(role="user", content="create todo title: Milk", session_id="s1")
+    )
+    reply = agent.handle(
+        Message(role="user", content="delete that one", session_id="s1")
+    )
+    other = agent.handle(
+        Message(role="user", content="delete that one", session_id="s2")
+    )
+    assert agent.tool.calls["bulk_delete"] == {"ids": ["2"]}
+    assert reply.startswith("Deleted")
+    assert "provide the todo id" in other
+
+
+def test_an_explicit_id_wins_over_that_one():
+    agent = build_agent()
+    agent.handle(Message(role="user", content="mark 3 and 4 done", session_id="s1"))
+    reply = agent.handle(
+        Message(role="user", content="delete that todo id: 5", session_id="s1")
+    )
+    assert reply == "Deleted todo 5."
+    assert agent.tool.calls["delete"] == {"id": "5"}
+    assert "bulk_delete" not in agent.tool.calls
+
+    reply = agent.handle(
+        Message(
+            role="user",
+            content="update todo id: 6 title: fix it status: open",
+            session_id="s1",
+        )
+    )
+    assert agent.tool.calls["update"]["id"] == "6"
+
+
+def test_anonymous_messages_do_not_share_context():
+    agent = build_agent()
+    agent.handle(Message(role="user", content="create todo title: Milk"))
+    reply = agent.handle(Message(role="user", content="delete that one"))
+    assert "provide the todo id" in reply
+    assert len(agent.sessions) == 0
+
+
+def test_agent_streams_large_lists_in_chunks():
+    agent = build_agent()
+    chunks = list(agent.handle_stream(Message(role="user", content="list todos")))
+    assert len(chunks) == 3
+    assert chunks[0].startswith("Here are your todos:\n- 0 [open] T0\n")
+    assert "".join(chunks).count("\n- ") == 250
+
+    first = list(agent.handle_stream(Message(role="user", content="show first 2")))
+    assert agent.tool.calls["iter"] == {"limit": "2"}
+    assert "".join(first).endswith("- 1 [open] T1\nShowing the first 2 todos.\n")
+
+
+def test_agent_forwards_status_and_limit_filters():
+    agent = build_agent()
+    reply = agent.handle(Message(role="user", content="show my done todos, first 5"))
+    assert agent.tool.calls["list"] == {"status": "done", "limit": "5"}
+    assert reply.startswith("Here are your todos")
+
+
+def test_sql_comment_marker_in_a_message_is_not_blocked():
+    agent = build_agent()
+    reply = agent.handle(Message(role="user", content="delete id: 5; title: a -- b"))
+    assert reply == "Deleted todo 5."
+    assert agent.tool.calls["delete"] == {"id": "5"}
@@ -0,0 +1,131 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from agent.async_todo_tool import AsyncTodoServiceTool
+from agent.models import TodoItem
+from agent.todo_cache import TodoCache
+
+
+def build_app(calls: List[str]) -> web.Application:
+    failures = {"remaining": 1}
+
+    async def list_todos(request: web.Request) -> web.Response:
+        calls.append("GET")
+        return web.json_response([{"id": "1", "title": "Test", "status": "open"}])
+
+    async def create_todo(request: web.Request) -> web.Response:
+        calls.append("POST")
+        body = await request.json()
+        if body["title"] == "Bad":
+            return web.json_response({"error": "bad"}, status=400)
+        return web.json_response({"id": "2", **body}, status=201)
+
+    async def update_todo(request: web.Request) -> web.Response:
+        calls.append("PUT")
+        if failures["remaining"]:
+            failures["remaining"] -= 1
+            return web.json_response({"error": "boom"}, status=500)
+        body = await request.json()
+        return web.json_response({"id": request.match_info["todo_id"], **body})
+
+    async def delete_todo(request: web.Request) -> web.Response:
+        calls.append("DELETE")
+        return web.json_response({"id": request.match_info["todo_id"]})
+
+    app = web.Application()
+    app.router.add_get("/todos", list_todos)
+    app.router.add_post("/todos", create_todo)
+    app.router.add_put("/todos/{todo_id}", update_todo)
+    app.router.add_delete("/todos/{todo_id}", delete_todo)
+    return app
+
+
+def run_with_tool(
+    scenario: Callable[[AsyncTodoServiceTool, List[str]], Awaitable[Any]],
+) -> Any:
+    async def runner() -> Any:
+        calls: List[str] = []
+        async with TestServer(build_app(calls)) as server:
+            async with AsyncTodoServiceTool(
+                base_url=str(server.make_url("")),
+                rate_limit_per_minute=10,
+                cache_ttl_seconds=5,
+            ) as tool:
+                return await scenario(tool, calls)
+
+    return asyncio.run(runner())
+
+
+def test_async_list_todos_caches() -> None:
+    async def scenario(tool: AsyncTodoServiceTool, calls: List[str]) -> None:
+        first = await tool.list_todos()
+        second = await tool.list_todos()
+        assert first == second
+        assert calls == ["GET"]
+
+    run_with_tool(scenario)
+
+
+def test_async_iter_todos_streams_then_serves_cache() -> None:
+    async def scenario(tool: AsyncTodoServiceTool, calls: List[str]) -> None:
+        streamed = [todo async for todo in tool.iter_todos()]
+        cached = [todo async for todo in tool.iter_todos()]
+        assert (
+            streamed
+            == cached
+            == [{"id": "1", "title": "Test", "description": "", "status": "open"}]
+        )
+        assert calls == ["GET"]
+
+    run_with_tool(scenario)
+
+
+def test_async_iter_todos_serves_stale_list_when_api_is_down() -> None:
+    clock = {"now": 0.0}
+    cache: TodoCache[TodoItem] = TodoCache(ttl_seconds=1, clock=lambda: clock["now"])
+    cache.replace_all(
+        [TodoItem.from_api({"id": "1", "title": "Cached", "status": "open"})]
+    )
+    clock["now"] = 30
+
+    async def scenario() -> List[TodoItem]:
+        async with AsyncTodoServiceTool(
+            base_url="http://127.0.0.1:1", cache=cache, stale_if_error_seconds=60
+        ) as tool:
+            return [todo async for todo in tool.iter_todos()]
+
+    assert [todo["title"] for todo in asyncio.run(scenario())] == ["Cached"]
+
+
+def test_async_crud_round_trip_retries_5xx() -> None:
+    async def scenario(tool: AsyncTodoServiceTool, calls: List[str]) -> None:
+        created = await tool.create_todo({"title": "Hello"})
+        updated = await tool.update_todo("2", {"title": "Hello", "status": "done"})
+        deleted = await tool.delete_todo("2")
+        assert created["id"] == "2"
+        assert updated["status"] == "done"
+        assert deleted["id"] == "2"
+        assert calls == ["POST", "PUT", "PUT", "DELETE"]
+
+    run_with_tool(scenario)
+
+
+def test_async_400_errors_do_not_retry() -> None:
+    async def scenario(tool: AsyncTodoServiceTool, calls: List[str]) -> None:
+        with pytest.raises(aiohttp.ClientResponseError):
+            await tool.create_todo({"title": "Bad"})
+        assert calls == ["POST"]
+
+    run_with_tool(scenario)
+
+
+def test_async_prompt_injection_guard() -> None:
+    tool = AsyncTodoServiceTool(base_url="https://api.example.com")
+    payload: Dict[str, str] = {"title": "DROP TABLE users;"}
+    with pytest.raises(ValueError):
+        asyncio.run(tool.create_todo(payload))
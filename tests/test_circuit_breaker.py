@@ -0,0 +1,87 @@
+import pytest
+import requests
+import responses
+
+from agent.circuit_breaker import CircuitBreaker, CircuitOpenError
+from agent.todo_tool import TodoServiceTool
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_opens_after_threshold_and_recovers_through_half_open() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10
+    breaker.before_call()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_tool_fails_fast_while_open_and_ignores_client_errors() -> None:
+    tool = TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=10,
+        cache_ttl_seconds=0,
+        circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+    )
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.POST, "https://api.example.com/todos", status=400, json={})
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            body=requests.ConnectionError("api down"),
+        )
+        for _ in range(3):
+            with pytest.raises(requests.HTTPError):
+                tool.create_todo({"title": "Bad"})
+        assert tool.circuit_breaker.state == "closed"
+        for _ in range(2):
+            with pytest.raises(requests.ConnectionError):
+                tool.list_todos()
+        with pytest.raises(CircuitOpenError):
+            tool.list_todos()
+        assert len(rsps.calls) == 5
+
+
+def test_a_rate_limited_probe_frees_the_half_open_slot() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    tool = TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=10,
+        cache_ttl_seconds=0,
+        circuit_breaker=breaker,
+    )
+    breaker.record_failure()
+    clock.now = 10
+    tool.rate_limiter.tokens = 0
+    with pytest.raises(RuntimeError, match="Rate limit"):
+        tool.list_todos()
+    assert breaker.state == "half_open"
+
+    tool.rate_limiter.tokens = 10
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, "https://api.example.com/todos", json=[])
+        assert tool.list_todos() == []  # the probe, not CircuitOpenError
+    assert breaker.state == "closed"
@@ -0,0 +1,197 @@
+import asyncio
+import threading
+import time
+from typing import List, Optional
+
+import pytest
+import responses
+
+from agent.concurrency_limit import (
+    READ,
+    REFRESH,
+    WRITE,
+    AdaptiveConcurrencyLimiter,
+    LoadShedError,
+    retry_after_seconds,
+)
+from agent.observability import get_metrics
+from agent.todo_tool import TodoServiceTool
+
+BASE_URL = "https://api.example.com"
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_limit_grows_while_busy_and_fast_and_backs_off_once_per_window() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=2, max_wait=0)
+    for _ in range(8):  # rounds that fill the limit, all at baseline latency
+        for _ in range(limiter.limit):
+            limiter.acquire()
+        for _ in range(limiter.limit):
+            limiter.release(20.0)
+    grown = limiter.limit
+    assert grown > 4
+
+    limiter.acquire()
+    limiter.release(20.0)  # not busy: one call in flight does not grow it
+    assert limiter.limit == grown
+
+    for _ in range(3):  # a burst of slow replies cuts the limit only once
+        limiter.acquire()
+    for _ in range(3):
+        limiter.release(500.0)
+    assert int(grown * 0.7) <= limiter.limit < grown
+    for _ in range(10):
+        limiter.acquire()
+        limiter.release(None, overloaded=True)
+    assert limiter.limit == 2
+
+
+def test_refreshes_are_shed_before_reads_before_writes() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=10, max_wait=0)
+    for _ in range(5):
+        limiter.acquire(READ)
+    with pytest.raises(LoadShedError) as excinfo:
+        limiter.acquire(REFRESH)
+    assert excinfo.value.priority == REFRESH
+    for _ in range(4):
+        limiter.acquire(READ)
+    with pytest.raises(LoadShedError):
+        limiter.acquire(READ)
+    limiter.acquire(WRITE)
+    with pytest.raises(LoadShedError):
+        limiter.acquire(WRITE)
+    counters = get_metrics().snapshot()["counters"]
+    labels = (("limiter", "todo_api"), ("priority", "refresh"), ("reason", "saturated"))
+    assert counters[("todo_api_shed", labels)] >= 1
+
+
+def test_waiting_calls_get_the_next_free_slot_before_newcomers() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_wait=5)
+    limiter.acquire()
+    order = []
+
+    def call(name: str) -> None:
+        limiter.acquire()
+        order.append(name)
+
+    first = threading.Thread(target=call, args=("queued",))
+    first.start()
+    while not limiter._waiting[WRITE]:
+        time.sleep(0.001)
+    with pytest.raises(LoadShedError):
+        limiter.acquire(REFRESH)  # refreshes never wait
+    limiter.release(20.0)
+    first.join(timeout=5)
+    assert order == ["queued"]
+    assert limiter.in_flight == 1
+
+
+def test_retry_after_parses_seconds_and_dates() -> None:
+    assert retry_after_seconds("120") == 120.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert retry_after_seconds("soon") is None
+
+
+def test_retry_after_on_503_waits_out_the_server_and_sheds_new_calls() -> None:
+    clock = FakeClock()
+    limiter = AdaptiveConcurrencyLimiter(clock=clock)
+    tool = TodoServiceTool(
+        base_url=BASE_URL, rate_limit_per_minute=100, concurrency_limiter=limiter
+    )
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET, f"{BASE_URL}/todos", status=503, headers={"Retry-After": "0"}
+        )
+        rsps.add(responses.GET, f"{BASE_URL}/todos", json=[])
+        assert tool.list_todos(use_cache=False) == []  # retried straight away
+        rsps.add(
+            responses.PUT,
+            f"{BASE_URL}/todos/1",
+            status=503,
+            headers={"Retry-After": "30"},
+        )
+        with pytest.raises(Exception):
+            tool.update_todo("1", {"title": "a"})  # longer than we retry for
+        assert len(rsps.calls) == 3
+
+        with pytest.raises(LoadShedError) as excinfo:
+            tool.update_todo("1", {"title": "a"})
+        assert excinfo.value.retry_after == 30
+        assert len(rsps.calls) == 3
+        clock.now = 30
+        rsps.add(responses.PUT, f"{BASE_URL}/todos/1", json={"id": "1", "title": "a"})
+        assert tool.update_todo("1", {"title": "a"})["title"] == "a"
+    assert limiter.in_flight == 0
+
+
+def test_async_waiters_are_woken_by_a_release_from_another_thread() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_wait=5)
+    limiter.acquire()
+
+    async def wait_for_slot() -> float:
+        start = time.perf_counter()
+        waiter = asyncio.ensure_future(limiter.acquire_async())
+        while not limiter._waiting[WRITE]:
+            await asyncio.sleep(0)
+        threading.Timer(0.05, limiter.release, args=(20.0,)).start()
+        await waiter
+        return time.perf_counter() - start
+
+    assert asyncio.run(wait_for_slot()) < 1
+    assert limiter.in_flight == 1
+    assert not limiter._async_waiters
+
+
+class RecordingLimiter(AdaptiveConcurrencyLimiter):
+    def __init__(self, **options) -> None:
+        super().__init__(**options)
+        self.events: List[str] = []
+
+    def acquire(self, priority: str = WRITE) -> None:
+        super().acquire(priority)
+        self.events.append("acquire")
+
+    def release(
+        self,
+        latency_ms: Optional[float],
+        overloaded: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self.events.append("release")
+        super().release(latency_ms, overloaded, retry_after)
+
+
+def test_each_retry_takes_its_own_slot() -> None:
+    limiter = RecordingLimiter()
+    tool = TodoServiceTool(
+        base_url=BASE_URL, rate_limit_per_minute=100, concurrency_limiter=limiter
+    )
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET, f"{BASE_URL}/todos", status=503, headers={"Retry-After": "0"}
+        )
+        rsps.add(responses.GET, f"{BASE_URL}/todos", json=[])
+        assert tool.list_todos(use_cache=False) == []
+    assert limiter.events == ["acquire", "release"] * 2
+    assert limiter.in_flight == 0
+
+
+def test_a_shed_call_does_not_spend_a_rate_limit_token() -> None:
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_wait=0)
+    tool = TodoServiceTool(
+        base_url=BASE_URL, rate_limit_per_minute=1, concurrency_limiter=limiter
+    )
+    limiter.acquire()
+    with pytest.raises(LoadShedError):
+        tool.list_todos(use_cache=False)
+    limiter.release(20.0)
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, f"{BASE_URL}/todos", json=[])
+        assert tool.list_todos(use_cache=False) == []
@@ -0,0 +1,101 @@
+"""Cold-start guard: ``import agent.main`` must stay cheap."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Measured at roughly 80 ms here after making the heavy imports lazy (it was
+# about 540 ms before); the budget leaves room for slower CI machines.
+IMPORT_BUDGET_MS = 300
+HEAVY_MODULES = (
+    "aiohttp",
+    "requests",
+    "backoff",
+    "opentelemetry",
+    "structlog",
+    "agent.todo_tool",
+    "agent.async_todo_tool",
+)
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_time_ms() -> float:
+    """Cumulative ``agent.main`` import time reported by ``-X importtime``."""
+
+    stderr = run_python("-X", "importtime", "-c", "import agent.main").stderr
+    for line in stderr.splitlines():
+        # "import time: <self us> | <cumulative us> | <indented module name>"
+        _, cumulative, name = line.split("|")
+        if name.strip() == "agent.main":
+            return int(cumulative) / 1000
+    raise AssertionError("agent.main missing from -X importtime output")
+
+
+def test_import_does_not_load_heavy_dependencies() -> None:
+    script = (
+        "import json, sys, agent.main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    assert json.loads(run_python("-c", script).stdout) == []
+
+
+def test_import_time_stays_within_budget() -> None:
+    best = min(import_time_ms() for _ in range(3))
+    assert best < IMPORT_BUDGET_MS, f"import agent.main took {best:.0f} ms"
+
+
+def test_tools_are_built_on_first_use() -> None:
+    script = (
+        "from agent.config import Config; from agent.main import TodoOrchestrator; "
+        "agent = TodoOrchestrator(Config(todo_api_base_url='https://api.example.com', "
+        "vertex_location='l', vertex_project_id='p', "
+        "google_application_credentials=None, max_context_tokens=64, "
+        "rate_limit_per_minute=1, cache_ttl_seconds=0)); "
+        "print(type(agent.tool).__name__, type(agent.async_tool).__name__)"
+    )
+    output = run_python("-c", script).stdout.split()
+    assert output == ["TodoServiceTool", "AsyncTodoServiceTool"]
+
+
+HANDLE_ASYNC_SCRIPT = """
+import asyncio
+from aiohttp import web
+from agent.config import Config
+from agent.main import Message, TodoOrchestrator
+
+async def main():
+    app = web.Application()
+    app.router.add_get("/todos", lambda request: web.json_response([]))
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    port = runner.addresses[0][1]
+    agent = TodoOrchestrator(Config(
+        todo_api_base_url=f"http://127.0.0.1:{port}", vertex_location="l",
+        vertex_project_id="p", google_application_credentials=None,
+        max_context_tokens=64, rate_limit_per_minute=10, cache_ttl_seconds=0,
+    ))
+    print(await agent.handle_async(Message(role="user", content="list todos")))
+    await agent.aclose()
+    await runner.cleanup()
+
+asyncio.run(main())
+"""
+
+
+def test_handle_async_works_on_a_fresh_import() -> None:
+    # Tool errors become a generic reply, so check for the real list reply.
+    output = run_python("-c", HANDLE_ASYNC_SCRIPT).stdout.splitlines()
+    assert output[-1] == "You have no todos yet. Want me to add one?"
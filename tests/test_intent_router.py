@@ -0,0 +1,34 @@
+import json
+from pathlib import Path
+
+from agent.intent_router import BLOCKED, CLARIFY, IntentRouter
+
+
+def test_routes_on_whole_words_only() -> None:
+    router = IntentRouter()
+    assert router.route("change my address please").intent == CLARIFY
+    assert router.route("showcase an update to id:3").intent == "update"
+    assert router.route("Add a todo title: Buy milk").intent == "create"
+
+
+def test_first_matching_intent_wins_and_reports_spans() -> None:
+    router = IntentRouter()
+    match = router.route("create todo title: show and tell, then create another")
+    assert match.intent == "create"
+    assert match.spans == ((0, 6), (39, 45))
+
+
+def test_blocked_phrases_override_intents() -> None:
+    router = IntentRouter()
+    assert router.route("list todos; DROP   TABLE users").intent == BLOCKED
+    assert router.route("please /rmdir tmp").intent == BLOCKED
+
+
+def test_routes_are_table_driven(tmp_path: Path) -> None:
+    routes = tmp_path / "routes.json"
+    routes.write_text(json.dumps({"intents": {"list": ["ls"]}, "blocked": []}))
+    router = IntentRouter.from_file(str(routes))
+    assert router.route("ls my todos").intent == "list"
+    assert router.route("show my todos").intent == CLARIFY
+    router.register("list", "show")
+    assert router.route("show my todos").intent == "list"
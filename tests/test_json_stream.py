@@ -0,0 +1,27 @@
+import json
+
+import pytest
+
+from agent.json_stream import JSONArrayParser, iter_json_array
+
+
+def test_elements_split_across_chunks_are_reassembled() -> None:
+    items = [{"id": str(i), "title": f"Task é {i}", "n": i * 10} for i in range(50)]
+    raw = json.dumps(items).encode("utf-8")
+    chunks = [raw[i : i + 7] for i in range(0, len(raw), 7)]
+    assert list(iter_json_array(chunks)) == items
+    assert list(iter_json_array(["[12", "3, 4", "]"])) == [123, 4]
+
+
+def test_elements_are_yielded_before_the_array_closes() -> None:
+    parser = JSONArrayParser()
+    assert parser.feed('[{"id": "1"}, {"id"') == [{"id": "1"}]
+    assert parser.feed(': "2"}]') == [{"id": "2"}]
+    assert parser.close() == []
+
+
+def test_truncated_or_non_array_bodies_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        list(iter_json_array(['[{"id": "1"}']))
+    with pytest.raises(ValueError):
+        list(iter_json_array(['{"id": "1"}']))
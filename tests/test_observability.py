@@ -0,0 +1,161 @@
+import io
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, List
+
+from opentelemetry import trace
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (  # type: ignore[import-untyped]
+    ExportTraceServiceRequest,
+    ExportTraceServiceResponse,
+)
+
+from agent import observability
+from agent.observability import (
+    LogSink,
+    MetricAggregator,
+    configure_tracing,
+    note_retry,
+    stage_timings,
+    timed_stage,
+    traced_span,
+)
+
+
+def test_aggregator_sums_counters_per_label_set() -> None:
+    metrics = MetricAggregator()
+    metrics.increment("todo_cache", 1, result="hit")
+    metrics.increment("todo_cache", 1, result="hit")
+    metrics.increment("todo_cache", 1, result="miss")
+
+    counters = metrics.snapshot()["counters"]
+    assert counters[("todo_cache", (("result", "hit"),))] == 2
+    assert counters[("todo_cache", (("result", "miss"),))] == 1
+
+
+def test_histogram_tracks_latency_and_flush_resets() -> None:
+    metrics = MetricAggregator()
+    for latency in (1.0, 20.0, 20.0, 400.0):
+        metrics.observe("todo_tool_latency_ms", latency, method="get")
+
+    count, total, maximum = metrics.snapshot()["histograms"][
+        ("todo_tool_latency_ms", (("method", "get"),))
+    ]
+    assert (count, total, maximum) == (4, 441.0, 400.0)
+
+    metrics.flush()
+    assert metrics.snapshot() == {"counters": {}, "histograms": {}, "gauges": {}}
+
+
+def test_disabled_tracing_yields_non_recording_span() -> None:
+    configure_tracing(enabled=False)
+    try:
+        with traced_span("todo.get", url="http://x") as span:
+            assert span is observability.NON_RECORDING_SPAN
+            assert not span.is_recording()
+    finally:
+        observability._tracing_enabled = True
+
+
+def test_log_sink_drops_instead_of_blocking_when_full() -> None:
+    stream = io.StringIO()
+    sink = LogSink(queue_size=2, stream=stream)
+    logger = logging.getLogger("test_log_sink")
+    logger.propagate = False
+    logger.addHandler(sink.handler)
+    try:
+        for index in range(5):  # listener not started yet, so the queue fills up
+            logger.warning("event %d", index)
+        sink.start()
+        sink.stop()
+    finally:
+        logger.removeHandler(sink.handler)
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [line["event"] for line in lines] == ["event 0", "event 1"]
+    assert lines[0]["level"] == "warning"
+    assert sink.dropped == 3
+
+
+class _Receiver(BaseHTTPRequestHandler):
+    """Minimal OTLP/HTTP trace receiver that keeps every export request."""
+
+    received: List[ExportTraceServiceRequest] = []
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        request = ExportTraceServiceRequest()
+        request.ParseFromString(body)
+        self.received.append(request)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-protobuf")
+        self.end_headers()
+        self.wfile.write(ExportTraceServiceResponse().SerializeToString())
+
+    def log_message(self, *args: object) -> None:
+        pass
+
+
+def test_otlp_exporter_ships_spans_to_collector(monkeypatch) -> None:
+    monkeypatch.setattr(observability, "_tracing_enabled", True)
+    monkeypatch.setattr(observability, "_tracer", None)
+    # Keep the process-wide provider untouched for the rest of the suite.
+    monkeypatch.setattr(trace, "set_tracer_provider", lambda _: None)
+    server = HTTPServer(("127.0.0.1", 0), _Receiver)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        provider = configure_tracing(
+            service_name="todo-agent-test",
+            exporter="otlp",
+            otlp_endpoint=f"http://127.0.0.1:{server.server_port}/v1/traces",
+            max_export_batch_size=8,
+        )
+        assert provider is not None
+        with provider.get_tracer(__name__).start_as_current_span("todo.get"):
+            pass
+        assert provider.force_flush()
+        provider.shutdown()
+    finally:
+        server.shutdown()
+
+    spans = [
+        span.name
+        for request in _Receiver.received
+        for resource_spans in request.resource_spans
+        for scope_spans in resource_spans.scope_spans
+        for span in scope_spans.spans
+    ]
+    assert spans == ["todo.get"]
+
+
+class RecordingSpan:
+    def __init__(self) -> None:
+        self.attributes: Dict[str, Any] = {}
+
+    def is_recording(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+def test_stage_timings_become_span_attributes() -> None:
+    span = RecordingSpan()
+    with stage_timings(span):  # type: ignore[arg-type]
+        with timed_stage("http"):
+            pass
+        with timed_stage("http"):
+            pass
+        note_retry(0.25)
+    with timed_stage("render"):  # outside a request: not recorded anywhere
+        pass
+
+    assert set(span.attributes) == {
+        "stage.http_ms",
+        "stage.retry_wait_ms",
+        "stage.retries",
+    }
+    assert span.attributes["stage.retry_wait_ms"] == 250.0
+    assert span.attributes["stage.retries"] == 1
@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from agent.payload_parser import FieldSpec, PayloadParser, parse_id_list
+
+
+def test_parses_core_fields_like_the_old_patterns() -> None:
+    parsed = PayloadParser().parse("update todo id:1 status: done; title: New name")
+    assert parsed.fields == {"id": "1", "status": "done", "title": "New name"}
+
+
+def test_quoted_values_and_escaped_semicolons() -> None:
+    parsed = PayloadParser().parse(
+        r'create title: "Plan; then review: title: nope"; description: a\; b'
+    )
+    assert parsed.fields["title"] == "Plan; then review: title: nope"
+    assert parsed.fields["description"] == "a; b"
+
+
+def test_typed_fields_and_errors() -> None:
+    parsed = PayloadParser().parse(
+        "create title: Ship it; priority: 2; due date: 2026-11-01; tags: work, urgent"
+    )
+    assert parsed.fields["priority"] == 2
+    assert parsed.fields["due"] == date(2026, 11, 1)
+    assert parsed.fields["tags"] == ["work", "urgent"]
+    assert "priority" in PayloadParser().parse("priority: high").errors
+
+
+def test_field_names_need_a_word_boundary_and_can_be_registered() -> None:
+    parser = PayloadParser()
+    assert "id" not in parser.parse("title: valid: yes").fields
+    parser.register(FieldSpec("owner", aliases=("assignee",)))
+    assert parser.parse("assignee: sam; title: x").fields["owner"] == "sam"
+
+
+def test_id_lists_and_ranges_expand_in_order() -> None:
+    assert parse_id_list("mark 1, 4, 7 and 9 done") == ["1", "4", "7", "9"]
+    assert parse_id_list("delete 3-6 and 4") == ["3", "4", "5", "6"]
+    assert parse_id_list("id:12 v1.2") == []
+    with pytest.raises(ValueError):
+        parse_id_list("delete 1-1000")
@@ -0,0 +1,66 @@
+import os
+import pstats
+import threading
+import time
+
+from agent.profiling import CallProfiler, Profiler, StackSampler
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1_000))
+
+
+def test_stack_sampler_counts_collapsed_stacks(tmp_path) -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_loop, args=(stop,))
+    sampler = StackSampler(interval_seconds=0.001)
+    worker.start()
+    sampler.start()
+    time.sleep(0.1)
+    sampler.stop()
+    stop.set()
+    worker.join()
+
+    path = tmp_path / "profile.collapsed"
+    assert sampler.write(str(path)) > 0
+    lines = path.read_text().splitlines()
+    assert any(
+        line.split(" ")[0].endswith("test_profiling.py:busy_loop") for line in lines
+    )
+    assert not sampler.take()
+    empty = tmp_path / "empty.collapsed"
+    assert sampler.write(str(empty)) == 0
+    assert not empty.exists()
+
+
+def test_call_profiler_profiles_one_call_in_n(tmp_path) -> None:
+    profiler = CallProfiler(every=3)
+    for _ in range(7):
+        with profiler.profile():
+            sum(range(1_000))
+
+    path = tmp_path / "calls.pstats"
+    assert profiler.write(str(path)) == 2
+    assert pstats.Stats(str(path)).get_stats_profile().func_profiles
+    assert profiler.write(str(path)) == 0
+
+
+def test_profiler_dumps_into_its_directory(tmp_path) -> None:
+    profiler = Profiler("cprofile", dump_dir=str(tmp_path), every_n_calls=1)
+    profiler.start()
+    with profiler.call():
+        sum(range(1_000))
+    path = profiler.dump()
+
+    assert path is not None and path.startswith(str(tmp_path))
+    assert path.endswith(".pstats")
+    with profiler.call():
+        sum(range(1_000))
+    second = profiler.dump()
+    assert second is not None and second != path
+    assert profiler.dump() is None
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        [os.path.basename(path), os.path.basename(second)]
+    )
+    assert Profiler("off").dump() is None
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from typing import List
+
+from agent.rate_limit import RateLimiter
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_refills_continuously() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(60, clock=clock)
+    limiter.tokens = 0
+    assert not limiter.allow()
+    clock.now += 0.5
+    assert not limiter.allow()
+    clock.now += 0.5
+    assert limiter.allow()
+    assert not limiter.allow()
+
+
+def test_per_key_buckets_are_bounded_lru() -> None:
+    clock = FakeClock()
+    limiter = RateLimiter(100, per_key_rate_per_minute=1, max_keys=2, clock=clock)
+    assert limiter.allow("alice")
+    assert not limiter.allow("alice")
+    assert limiter.allow("bob")
+    assert limiter.allow("carol")  # evicts alice
+    assert limiter.allow("alice")
+    assert limiter.tokens == 96
+
+
+def test_acquire_waits_for_token() -> None:
+    limiter = RateLimiter(600)
+    limiter.tokens = 0
+    assert limiter.acquire(timeout=1)
+    assert not limiter.acquire(timeout=0.01)
+    assert asyncio.run(limiter.acquire_async(timeout=1))
+
+
+def test_concurrent_allow_never_overspends() -> None:
+    limiter = RateLimiter(50)
+    granted: List[bool] = []
+
+    def worker() -> None:
+        for _ in range(20):
+            granted.append(limiter.allow())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(granted) == 50
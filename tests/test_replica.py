@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+import requests
+import responses
+from responses import matchers
+
+from agent.replica import TodoReplica
+from agent.todo_tool import TodoItem, TodoServiceTool
+
+BASE_URL = "https://api.example.com"
+
+
+def todo(todo_id: str, title: str, status: str = "open") -> TodoItem:
+    return TodoItem.from_api({"id": todo_id, "title": title, "status": status})
+
+
+def make_tool(replica: TodoReplica, **options) -> TodoServiceTool:
+    return TodoServiceTool(
+        base_url=BASE_URL, rate_limit_per_minute=100, replica=replica, **options
+    )
+
+
+def test_sync_writes_only_changes_and_restart_warms_from_disk(tmp_path: Path) -> None:
+    path = str(tmp_path / "replica.db")
+    replica = TodoReplica(path)
+    assert not replica.ready
+
+    assert replica.apply_sync([todo("1", "a"), todo("2", "b")], etag='"v1"') == 2
+    assert replica.apply_sync([todo("1", "a"), todo("3", "c")], etag='"v2"') == 2
+
+    restarted = TodoReplica(path)
+    assert restarted.ready
+    assert restarted.validators() == ('"v2"', None)
+    assert [item.id for item in restarted.list()] == ["1", "3"]
+
+
+def test_inserts_and_moves_keep_their_order_across_restarts(tmp_path: Path) -> None:
+    path = str(tmp_path / "replica.db")
+    replica = TodoReplica(path)
+    replica.apply_sync([todo("1", "a"), todo("2", "b"), todo("3", "c")])
+    replica.apply_sync([todo("1", "a"), todo("4", "d"), todo("2", "b"), todo("3", "c")])
+    assert [item.id for item in TodoReplica(path).list()] == ["1", "4", "2", "3"]
+
+    replica.apply_sync([todo("3", "c"), todo("1", "a"), todo("4", "d")])
+    replica.begin_write("5", todo("5", "e"))
+    replica.commit_write("5", todo("5", "e"))
+    assert [item.id for item in TodoReplica(path).list()] == ["3", "1", "4", "5"]
+
+
+def test_reads_are_served_locally_and_sync_is_conditional(tmp_path: Path) -> None:
+    now = [0.0]
+    replica = TodoReplica(str(tmp_path / "replica.db"), clock=lambda: now[0])
+    replica.apply_sync([todo("1", "a", "done"), todo("2", "b")], etag='"v1"')
+    tool = make_tool(replica)
+
+    with responses.RequestsMock() as rsps:  # no API calls are registered
+        assert [item.id for item in tool.list_todos()] == ["1", "2"]
+        assert [item.id for item in tool.list_todos(status="open")] == ["2"]
+
+    now[0] = 10.0
+    assert replica.age() == 10.0
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            f"{BASE_URL}/todos",
+            status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+        )
+        assert [item.id for item in tool.list_todos(use_cache=False)] == ["1", "2"]
+    assert replica.age() == 0.0
+
+
+def test_reads_survive_an_api_outage(tmp_path: Path) -> None:
+    replica = TodoReplica(str(tmp_path / "replica.db"))
+    replica.apply_sync([todo("1", "a")])
+    tool = make_tool(replica)
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.GET, f"{BASE_URL}/todos", body=requests.ConnectionError())
+        tool._revalidate()  # the failed sync is logged, not raised
+        assert [item.id for item in tool.list_todos()] == ["1"]
+    assert replica.ready
+
+
+def test_failed_write_is_rolled_back(tmp_path: Path) -> None:
+    replica = TodoReplica(str(tmp_path / "replica.db"))
+    replica.apply_sync([todo("1", "a")])
+    tool = make_tool(replica)
+
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.DELETE, f"{BASE_URL}/todos/1", status=404)
+        with pytest.raises(requests.HTTPError):
+            tool.delete_todo("1")
+    assert replica.get("1") == todo("1", "a")
+
+
+def test_pending_write_survives_sync_until_committed(tmp_path: Path) -> None:
+    replica = TodoReplica(str(tmp_path / "replica.db"))
+    replica.apply_sync([todo("1", "a")])
+
+    replica.begin_write("1", todo("1", "a", "done"))
+    replica.apply_sync([todo("1", "a"), todo("2", "b")])  # predates the write
+    pending = replica.get("1")
+    assert pending is not None and pending["status"] == "done"
+
+    replica.commit_write("1", todo("1", "a", "done"))
+    replica.apply_sync([todo("1", "a", "in_progress"), todo("2", "b")])
+    synced = replica.get("1")
+    assert synced is not None and synced["status"] == "in_progress"
@@ -0,0 +1,63 @@
+import json
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+from agent.intent_router import BLOCKED, IntentRouter
+from agent.safety import (
+    ReloadingSafetyPolicy,
+    SafetyMatch,
+    SafetyPolicy,
+    UnsafeContentError,
+)
+from agent.todo_tool import TodoServiceTool
+
+
+def rule(match: Optional[SafetyMatch]) -> Optional[str]:
+    return None if match is None else match.rule
+
+
+def test_check_reports_the_matching_rule() -> None:
+    policy = SafetyPolicy(patterns={"sql_union": r"\bunion\s+select\b"})
+    assert rule(policy.check("please DROP\n TABLE users")) == "drop table"
+    assert rule(policy.check("1 UNION  SELECT password")) == "sql_union"
+    assert policy.check("union station, select a seat") is None
+
+
+def test_field_phrases_do_not_block_whole_messages() -> None:
+    policy = SafetyPolicy()
+    assert policy.check("delete id: 5; title: a -- b") is None
+    assert rule(policy.check("a -- b", in_field=True)) == "--"
+    with pytest.raises(UnsafeContentError):
+        policy.validate("a -- b", "title")
+
+
+def test_router_and_tool_share_one_policy() -> None:
+    policy = SafetyPolicy(phrases=["rm -rf"])
+    router = IntentRouter(policy=policy)
+    tool = TodoServiceTool(base_url="https://api.example.com", safety_policy=policy)
+
+    route = router.route("create todo title: rm  -rf /")
+    assert (route.intent, route.rule) == (BLOCKED, "rm -rf")
+    with pytest.raises(UnsafeContentError) as excinfo:
+        tool.create_todo({"title": "tidy up: RM -RF build"})
+    assert excinfo.value.match.rule == "rm -rf"
+    assert router.route("list todos -- all").intent == "list"
+
+
+def test_policy_file_is_reloaded_when_it_changes(tmp_path: Path) -> None:
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"phrases": ["drop table"]}))
+    now = [0.0]
+    policy = ReloadingSafetyPolicy(str(path), check_interval=5, clock=lambda: now[0])
+    assert policy.check("truncate users") is None
+
+    path.write_text(json.dumps({"phrases": ["drop table"], "patterns": {"t": "trunc"}}))
+    assert policy.check("truncate users") is None  # not due for a check yet
+    now[0] = 5.0
+    assert rule(policy.check("truncate users")) == "t"
+
+    path.write_text(json.dumps({"patterns": {"bad": "("}}))
+    now[0] = 10.0
+    assert rule(policy.check("truncate users")) == "t"  # broken file: keep rules
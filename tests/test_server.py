@@ -0,0 +1,134 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from agent.config import Config
+from agent.main import Message, TodoOrchestrator
+from agent.server import AgentServer
+
+
+class SlowAgent:
+    """Stands in for TodoOrchestrator; replies once ``release`` is set."""
+
+    def __init__(self) -> None:
+        self.release = asyncio.Event()
+        self.seen: List[str] = []
+        self.closed = False
+
+    async def handle_async(self, message: Message) -> str:
+        self.seen.append(message.content)
+        await self.release.wait()
+        return f"echo: {message.content}"
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+    def close(self) -> None:
+        pass
+
+
+def run_with_client(
+    scenario: Callable[[TestClient, AgentServer, SlowAgent], Awaitable[Any]],
+    **limits: Any,
+) -> Any:
+    async def runner() -> Any:
+        agent = SlowAgent()
+        server = AgentServer(agent, **limits)  # type: ignore[arg-type]
+        async with TestClient(TestServer(server.build_app())) as client:
+            return await scenario(client, server, agent)
+
+    return asyncio.run(runner())
+
+
+def test_query_returns_reply_contract() -> None:
+    async def scenario(client: TestClient, server: AgentServer, agent: SlowAgent):
+        agent.release.set()
+        resp = await client.post("/", json={"query": "list todos", "session_id": "a"})
+        bad = await client.post("/", json={"session_id": "a"})
+        return resp.status, await resp.json(), bad.status
+
+    status, body, bad_status = run_with_client(scenario)
+    assert status == 200
+    assert body == {"reply": "echo: list todos"}
+    assert bad_status == 400
+
+
+def test_full_queue_is_rejected_with_retry_after() -> None:
+    async def scenario(client: TestClient, server: AgentServer, agent: SlowAgent):
+        pending = [
+            asyncio.ensure_future(client.post("/", json={"query": f"list {i}"}))
+            for i in range(2)
+        ]
+        while server.stats()["waiting"] < 1:
+            await asyncio.sleep(0.01)
+        rejected = await client.post("/", json={"query": "list 3"})
+        agent.release.set()
+        accepted = await asyncio.gather(*pending)
+        return rejected, [resp.status for resp in accepted]
+
+    rejected, statuses = run_with_client(scenario, max_concurrency=1, max_queue=1)
+    assert rejected.status == 429
+    assert rejected.headers["Retry-After"] == "1"
+    assert statuses == [200, 200]
+
+
+def test_shutdown_drains_in_flight_requests() -> None:
+    async def scenario(client: TestClient, server: AgentServer, agent: SlowAgent):
+        in_flight = asyncio.ensure_future(client.post("/", json={"query": "list"}))
+        while not agent.seen:
+            await asyncio.sleep(0.01)
+        drain = asyncio.ensure_future(client.app.shutdown())
+        await asyncio.sleep(0.05)
+        refused = await client.post("/", json={"query": "list again"})
+        assert not drain.done()
+        agent.release.set()
+        await drain
+        return (await in_flight).status, refused.status
+
+    completed, refused = run_with_client(scenario)
+    assert completed == 200
+    assert refused == 503
+
+
+def test_unsafe_query_to_a_real_orchestrator_is_a_client_error() -> None:
+    config = Config(
+        todo_api_base_url="https://api.example.com",
+        vertex_location="us-central1",
+        vertex_project_id="project",
+        google_application_credentials=None,
+        max_context_tokens=1024,
+        rate_limit_per_minute=10,
+        cache_ttl_seconds=1,
+    )
+
+    async def runner() -> Any:
+        server = AgentServer(TodoOrchestrator(config))
+        async with TestClient(TestServer(server.build_app())) as client:
+            results = []
+            for stream in (False, True):
+                resp = await client.post(
+                    "/", json={"query": "please drop table todos", "stream": stream}
+                )
+                results.append((resp.status, await resp.json()))
+            return results
+
+    error = {"error": "Unsafe instruction detected. Please rephrase your request."}
+    assert asyncio.run(runner()) == [(400, error), (400, error)]
+
+
+def test_stream_requests_get_chunked_text() -> None:
+    class StreamingAgent(SlowAgent):
+        async def handle_stream_async(self, message: Message):
+            for index in range(3):
+                yield f"line {index}\n"
+
+    async def runner() -> Any:
+        server = AgentServer(StreamingAgent())  # type: ignore[arg-type]
+        async with TestClient(TestServer(server.build_app())) as client:
+            resp = await client.post("/", json={"query": "list", "stream": True})
+            return resp.headers.get("Transfer-Encoding"), await resp.text()
+
+    encoding, text = asyncio.run(runner())
+    assert encoding == "chunked"
+    assert text == "line 0\nline 1\nline 2\n"
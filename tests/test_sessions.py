@@ -0,0 +1,47 @@
+from agent.sessions import SessionStore, estimate_tokens
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_history_is_trimmed_to_the_token_budget() -> None:
+    store = SessionStore(max_context_tokens=3 * estimate_tokens("x" * 40))
+    for index in range(5):
+        store.record("a", "user", f"{index}" * 40)
+    session = store.get("a")
+    assert [content[0] for _, content in session.context()] == ["2", "3", "4"]
+    assert session.tokens <= store.max_context_tokens
+
+
+def test_idle_and_least_recently_used_sessions_are_evicted() -> None:
+    clock = FakeClock()
+    store = SessionStore(
+        max_context_tokens=100, max_sessions=2, idle_timeout=60, clock=clock
+    )
+    store.record("a", "user", "hi")
+    store.record("b", "user", "hi")
+    store.get("a")
+    store.record("c", "user", "hi")
+    assert sorted(store._sessions) == ["a", "c"]
+    clock.now += 61
+    assert store.evict_idle() == 2
+    assert len(store) == 0
+    assert store.get("c").context() == []
+
+
+def test_snapshot_survives_a_restart(tmp_path) -> None:
+    path = str(tmp_path / "sessions.db")
+    store = SessionStore(max_context_tokens=100, snapshot_path=path)
+    store.record("a", "user", "create todo title: Milk")
+    store.record("a", "assistant", "Created todo 'Milk' with id 7.", ["7"])
+    store.save()
+
+    restored = SessionStore(max_context_tokens=100, snapshot_path=path)
+    session = restored.get("a")
+    assert session.last_todo_ids == ("7",)
+    assert session.context()[0] == ("user", "create todo title: Milk")
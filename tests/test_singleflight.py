@@ -0,0 +1,66 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+
+from agent.singleflight import AsyncSingleFlight, SingleFlight
+
+
+def test_concurrent_threads_share_one_call() -> None:
+    flight = SingleFlight()
+    release = threading.Event()
+    upstream_calls: List[int] = []
+    results: List[str] = []
+
+    def fetch() -> str:
+        upstream_calls.append(1)
+        release.wait(timeout=5)
+        return "todos"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("todos", fetch)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while flight.coalesced < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(upstream_calls) == 1
+    assert results == ["todos"] * 5
+    assert flight.coalesced == 4
+
+
+def test_errors_propagate_and_are_not_cached() -> None:
+    flight = SingleFlight()
+
+    def boom() -> str:
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("todos", boom)
+    assert flight.do("todos", lambda: "recovered") == "recovered"
+
+
+def test_async_callers_share_one_task() -> None:
+    flight = AsyncSingleFlight()
+    upstream_calls: List[int] = []
+
+    async def fetch() -> str:
+        upstream_calls.append(1)
+        await asyncio.sleep(0.01)
+        return "todos"
+
+    async def scenario() -> List[str]:
+        return list(
+            await asyncio.gather(*(flight.do("todos", fetch) for _ in range(5)))
+        )
+
+    assert asyncio.run(scenario()) == ["todos"] * 5
+    assert len(upstream_calls) == 1
+    assert flight.coalesced == 4
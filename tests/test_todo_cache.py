@@ -0,0 +1,49 @@
+from agent.todo_cache import Todo, TodoCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def todo(todo_id: str, status: str = "open") -> Todo:
+    return {"id": todo_id, "title": f"T{todo_id}", "description": "", "status": status}
+
+
+def test_writes_patch_cached_collection() -> None:
+    cache: TodoCache[Todo] = TodoCache(ttl_seconds=10, clock=FakeClock())
+    assert cache.list() is None
+    cache.replace_all([todo("1"), todo("2")])
+    cache.put(todo("3"))
+    cache.put(todo("1", status="done"))
+    cache.remove("2")
+    assert [item["id"] for item in cache.list() or []] == ["1", "3"]
+    assert [item["id"] for item in cache.list(status="done") or []] == ["1"]
+    assert cache.get("1") == todo("1", status="done")
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl() -> None:
+    clock = FakeClock()
+    cache: TodoCache[Todo] = TodoCache(ttl_seconds=5, clock=clock)
+    cache.replace_all([todo("1")])
+    clock.now = 4
+    cache.put(todo("2"))
+    clock.now = 6
+    assert cache.list() is None
+    assert cache.get("1") is None
+    assert cache.get("2") is not None
+
+
+def test_eviction_is_lru_and_drops_completeness() -> None:
+    cache: TodoCache[Todo] = TodoCache(ttl_seconds=10, max_items=2, clock=FakeClock())
+    cache.replace_all([todo("1"), todo("2")])
+    cache.get("1")
+    cache.put(todo("3"))
+    assert cache.get("2") is None
+    assert cache.get("1") is not None
+    assert cache.list() is None
+    assert cache.stats()["evictions"] == 1
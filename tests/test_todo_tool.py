@@ -1,10 +1,14 @@
+import json
+import time
 from typing import Any
 
 import pytest
 import responses
+from responses import matchers
 import requests
 
-from agent.todo_tool import TodoServiceTool
+from agent.todo_cache import TodoCache
+from agent.todo_tool import TodoItem, TodoServiceTool, TodoStatus
 
 
 @pytest.fixture
@@ -109,3 +113,319 @@ def test_400_errors_do_not_retry(todo_tool: TodoServiceTool) -> None:
         with pytest.raises(requests.HTTPError):
             todo_tool.create_todo({"title": "Bad"})
         assert len(rsps.calls) == 1
+
+
+def test_requests_share_pooled_session() -> None:
+    with TodoServiceTool(
+        base_url="https://api.example.com", rate_limit_per_minute=5, cache_ttl_seconds=0
+    ) as tool:
+        with responses.RequestsMock() as rsps:
+            add_response(rsps, "GET", "https://api.example.com/todos", 200, [])
+            tool.list_todos()
+            tool.list_todos()
+            assert len(rsps.calls) == 2
+            assert rsps.calls[0].request.headers["Connection"] == "keep-alive"
+        stats = tool._session.pool_stats()  # type: ignore[attr-defined]
+    assert stats["hits"] + stats["misses"] == 2
+
+
+def test_create_then_list_is_served_from_write_through_cache(
+    todo_tool: TodoServiceTool,
+) -> None:
+    with responses.RequestsMock() as rsps:
+        add_response(
+            rsps,
+            "GET",
+            "https://api.example.com/todos",
+            200,
+            [{"id": "1", "title": "Test", "status": "open"}],
+        )
+        add_response(
+            rsps,
+            "POST",
+            "https://api.example.com/todos",
+            201,
+            {"id": "2", "title": "Hello", "status": "open"},
+        )
+        todo_tool.list_todos()
+        todo_tool.create_todo({"title": "Hello"})
+        todos = todo_tool.list_todos()
+        assert len(rsps.calls) == 2
+    assert [todo["id"] for todo in todos] == ["1", "2"]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_stale_tool(
+    clock: FakeClock,
+    stale_while_revalidate_seconds: float = 0,
+    stale_if_error_seconds: float = 0,
+) -> TodoServiceTool:
+    return TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=5,
+        cache=TodoCache(ttl_seconds=1, clock=clock),
+        stale_while_revalidate_seconds=stale_while_revalidate_seconds,
+        stale_if_error_seconds=stale_if_error_seconds,
+    )
+
+
+def test_stale_while_revalidate_serves_cache_and_refreshes() -> None:
+    clock = FakeClock()
+    tool = build_stale_tool(clock, stale_while_revalidate_seconds=30)
+    with responses.RequestsMock() as rsps:
+        add_response(
+            rsps,
+            "GET",
+            "https://api.example.com/todos",
+            200,
+            [{"id": "1", "title": "Old", "status": "open"}],
+        )
+        add_response(
+            rsps,
+            "GET",
+            "https://api.example.com/todos",
+            200,
+            [{"id": "1", "title": "New", "status": "open"}],
+        )
+        tool.list_todos()
+        clock.now = 5
+        assert tool.list_todos()[0]["title"] == "Old"
+        deadline = time.monotonic() + 5
+        while len(rsps.calls) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        while tool._inflight.in_flight("GET /todos"):
+            time.sleep(0.01)
+    assert tool.list_todos()[0]["title"] == "New"
+
+
+def test_stale_if_error_serves_last_good_list() -> None:
+    clock = FakeClock()
+    tool = build_stale_tool(clock, stale_if_error_seconds=60)
+    with responses.RequestsMock() as rsps:
+        add_response(
+            rsps,
+            "GET",
+            "https://api.example.com/todos",
+            200,
+            [{"id": "1", "title": "Cached", "status": "open"}],
+        )
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            body=requests.ConnectionError("api down"),
+        )
+        tool.list_todos()
+        clock.now = 30
+        assert tool.list_todos()[0]["title"] == "Cached"
+        clock.now = 120
+        with pytest.raises(requests.ConnectionError):
+            tool.list_todos()
+
+
+def test_iter_todos_revalidates_and_falls_back_like_list_todos() -> None:
+    clock = FakeClock()
+    tool = build_stale_tool(clock, stale_if_error_seconds=60)
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            json=[{"id": "1", "title": "Cached", "status": "open"}],
+            headers={"ETag": '"v1"'},
+        )
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+        )
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            body=requests.ConnectionError("api down"),
+        )
+        tool.list_todos()
+        clock.now = 5
+        assert [todo["title"] for todo in tool.iter_todos()] == ["Cached"]
+        clock.now = 30
+        assert [todo["title"] for todo in tool.iter_todos()] == ["Cached"]
+        assert len(rsps.calls) == 3
+
+
+def test_bulk_update_reports_partial_failures() -> None:
+    cache: TodoCache[TodoItem] = TodoCache(ttl_seconds=60)
+    cache.put(TodoItem.from_api({"id": "1", "title": "Keep me", "status": "open"}))
+    cache.put(TodoItem.from_api({"id": "2", "title": "Gone", "status": "open"}))
+    todo_tool = TodoServiceTool(
+        base_url="https://api.example.com", rate_limit_per_minute=5, cache=cache
+    )
+    with responses.RequestsMock() as rsps:
+        add_response(
+            rsps,
+            "PUT",
+            "https://api.example.com/todos/1",
+            200,
+            {"id": "1", "title": "Keep me", "status": "done"},
+        )
+        add_response(
+            rsps, "PUT", "https://api.example.com/todos/2", 404, {"error": "gone"}
+        )
+        result = todo_tool.bulk_update(
+            {"1": {"status": "done"}, "2": {"status": "done"}}
+        )
+        sent = [
+            call.request.body
+            for call in rsps.calls
+            if (call.request.url or "").endswith("/todos/1")
+        ]
+    assert isinstance(sent[0], bytes)
+    assert b'"title": "Keep me"' in sent[0]
+    assert list(result.succeeded) == ["1"]
+    assert list(result.failed) == ["2"]
+    # The whole batch is charged a single rate-limit token.
+    assert 3.9 < todo_tool.rate_limiter.tokens < 4.5
+
+
+@pytest.mark.parametrize("cache_ttl_seconds", [30, 0])
+def test_bulk_update_fetches_uncached_items_instead_of_sending_partial_bodies(
+    cache_ttl_seconds: int,
+) -> None:
+    todo_tool = TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=5,
+        cache_ttl_seconds=cache_ttl_seconds,
+    )
+    with responses.RequestsMock() as rsps:
+        add_response(
+            rsps,
+            "GET",
+            "https://api.example.com/todos",
+            200,
+            [{"id": "1", "title": "Keep me", "description": "d", "status": "open"}],
+        )
+        add_response(
+            rsps,
+            "PUT",
+            "https://api.example.com/todos/1",
+            200,
+            {"id": "1", "title": "Keep me", "description": "d", "status": "done"},
+        )
+        result = todo_tool.bulk_update(
+            {"1": {"status": "done"}, "7": {"status": "done"}}
+        )
+        put = rsps.calls[1].request
+        calls = len(rsps.calls)
+    assert put.method == "PUT"
+    assert json.loads(put.body or "") == {
+        "title": "Keep me",
+        "description": "d",
+        "status": "done",
+    }
+    assert list(result.succeeded) == ["1"]
+    assert result.failed == {"7": "todo 7 not found"}
+    assert calls == 2  # no PUT went out for the unknown item
+
+
+def test_iter_todos_streams_and_caches_only_complete_reads() -> None:
+    tool = TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=5,
+        cache_ttl_seconds=60,
+    )
+    body = [{"id": str(i), "title": f"T{i}", "status": "open"} for i in range(5)]
+    with responses.RequestsMock() as rsps:
+        add_response(rsps, "GET", "https://api.example.com/todos", 200, body)
+        add_response(rsps, "GET", "https://api.example.com/todos", 200, body)
+        first_two = list(tool.iter_todos(limit=2))
+        everything = list(tool.iter_todos())
+        cached = list(tool.iter_todos(limit=3))
+        assert len(rsps.calls) == 2
+    assert [todo["id"] for todo in first_two] == ["0", "1"]
+    assert [todo["title"] for todo in everything] == [f"T{i}" for i in range(5)]
+    assert [todo["id"] for todo in cached] == ["0", "1", "2"]
+
+
+def test_filtered_list_forwards_params_and_follows_cursor_lazily() -> None:
+    tool = TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=5,
+        cache_ttl_seconds=60,
+    )
+    page = [{"id": str(i), "title": f"T{i}", "status": "done"} for i in range(2)]
+    with responses.RequestsMock() as rsps:
+        for limit in ("2", "3"):
+            rsps.add(
+                responses.GET,
+                "https://api.example.com/todos",
+                json={"items": page, "next_cursor": "c2"},
+                match=[
+                    matchers.query_param_matcher({"status": "done", "limit": limit})
+                ],
+            )
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            json={"items": [{"id": "9", "title": "T9", "status": "done"}]},
+            match=[
+                matchers.query_param_matcher(
+                    {"status": "done", "limit": "3", "cursor": "c2"}
+                )
+            ],
+        )
+        first = tool.list_todos(status="done", limit=2)
+        everything = tool.list_todos(status="done", limit=3)
+        again = tool.list_todos(status="done", limit=3)
+        # limit=2 is satisfied by the first page, so its cursor is never followed.
+        assert len(rsps.calls) == 3
+    assert [todo["id"] for todo in first] == ["0", "1"]
+    assert [todo["id"] for todo in everything] == ["0", "1", "9"]
+    assert again == everything
+
+
+def test_unchanged_collection_is_revalidated_with_a_304() -> None:
+    clock = FakeClock()
+    tool = TodoServiceTool(
+        base_url="https://api.example.com",
+        rate_limit_per_minute=5,
+        cache=TodoCache(ttl_seconds=10, clock=clock),
+    )
+    body = [{"id": "1", "title": "Test", "status": "open"}]
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            json=body,
+            headers={"ETag": '"v1"'},
+        )
+        rsps.add(
+            responses.GET,
+            "https://api.example.com/todos",
+            status=304,
+            match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+        )
+        first = tool.list_todos()
+        clock.now += 11
+        second = tool.list_todos()
+        assert len(rsps.calls) == 2
+        revalidated = rsps.calls[1].response
+        assert isinstance(revalidated, requests.Response)
+        assert revalidated.status_code == 304
+    assert second == first
+
+
+def test_todo_item_is_compact_and_reads_like_a_dict() -> None:
+    first = TodoItem.from_api({"ID": 7, "title": "Milk", "status": "done"})
+    second = TodoItem.from_api({"id": 8, "title": "Eggs", "status": "done"})
+    assert first == {"id": 7, "title": "Milk", "description": "", "status": "done"}
+    assert first["title"] == "Milk" and first.get("missing") is None
+    assert first.status is second.status is TodoStatus.DONE
+    assert first.to_dict()["status"] == "done"
+    assert not hasattr(first, "__dict__")
+    with pytest.raises(AttributeError):
+        first.title = "changed"  # type: ignore[misc]
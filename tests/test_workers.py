@@ -0,0 +1,140 @@
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from agent.config import Config
+from agent.models import TodoItem
+from agent.workers import (
+    SharedCacheState,
+    SharedRateLimiter,
+    SharedTodoCache,
+    _RestartPolicy,
+    serve_workers,
+)
+
+
+def todo(todo_id: str, status: str = "open") -> TodoItem:
+    return TodoItem.from_api({"id": todo_id, "title": f"t{todo_id}", "status": status})
+
+
+def _take_tokens(limiter: SharedRateLimiter, attempts: int, results) -> None:
+    results.put(sum(limiter.allow(key="session") for _ in range(attempts)))
+
+
+def test_rate_limit_budget_is_shared_across_processes() -> None:
+    context = multiprocessing.get_context("spawn")
+    limiter = SharedRateLimiter(60, per_key_rate_per_minute=1000, context=context)
+    results = context.Queue()
+    processes = [
+        context.Process(target=_take_tokens, args=(limiter, 40, results))
+        for _ in range(2)
+    ]
+    for process in processes:
+        process.start()
+    allowed = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join()
+    # 60 tokens between them, plus at most a couple refilled while starting.
+    assert 60 <= sum(allowed) <= 63
+    assert not limiter.allow()
+
+
+def test_per_key_buckets_are_shared() -> None:
+    now = [0.0]
+    limiter = SharedRateLimiter(100, per_key_rate_per_minute=2, clock=lambda: now[0])
+    assert limiter.allow(key="a") and limiter.allow(key="a")
+    assert not limiter.allow(key="a")
+    assert limiter.allow(key="b")
+    now[0] = 30.0
+    assert limiter.allow(key="a")
+
+
+def test_complete_collection_is_adopted_and_patched_across_caches(
+    tmp_path: Path,
+) -> None:
+    state = SharedCacheState(str(tmp_path))
+    now = [0.0]
+    first = SharedTodoCache(10, state, clock=lambda: now[0])
+    second = SharedTodoCache(10, state, clock=lambda: now[0])
+    assert second.list() is None
+
+    first.replace_all([todo("1")], etag='"v1"')
+    adopted = second.list()
+    assert adopted == [todo("1")]
+    assert adopted is not None and isinstance(adopted[0], TodoItem)
+    assert second.validators() == ('"v1"', None)
+
+    second.put(todo("1", "done"))
+    assert first.list(status="done") == [todo("1", "done")]
+
+    now[0] = 11.0
+    assert first.list() is None and second.list() is None
+    assert second.revalidated() is not None
+    assert first.list() == [todo("1", "done")]
+
+
+def test_write_without_the_full_collection_invalidates_the_others(
+    tmp_path: Path,
+) -> None:
+    state = SharedCacheState(str(tmp_path))
+    first = SharedTodoCache(10, state)
+    first.replace_all([todo("1")])
+    second = SharedTodoCache(10, state, max_items=0)
+    second.remove("1")
+    assert first.list() is None
+
+
+def test_writes_are_journaled_and_replayed_instead_of_republished(
+    tmp_path: Path,
+) -> None:
+    state = SharedCacheState(str(tmp_path))
+    first = SharedTodoCache(10, state)
+    second = SharedTodoCache(10, state)
+    first.replace_all([todo(str(i)) for i in range(4)])
+    assert len(second.list() or []) == 4
+    snapshot = Path(state.snapshot_path).read_text()
+
+    first.put(todo("1", "done"))
+    first.remove("2")
+    first.put(todo("9"))
+    assert Path(state.snapshot_path).read_text() == snapshot
+    assert len(Path(state.journal_path).read_text().splitlines()) == 3
+    assert second.list() == [todo("0"), todo("1", "done"), todo("3"), todo("9")]
+
+    for i in range(3):
+        second.put(todo(str(i), "done"))  # the journal outgrows the collection
+    assert Path(state.journal_path).read_text().count("\n") < 4
+    third = SharedTodoCache(10, state)
+    assert third.list() == first.list() == second.list()
+
+
+def test_restart_policy_backs_off_and_gives_up_on_a_crash_loop() -> None:
+    policy = _RestartPolicy(max_crashes=4, min_uptime=10, base_delay=1)
+    policy.started(0.0)
+    assert policy.exited(1.0) == 2.0
+    policy.started(2.0)
+    assert policy.exited(3.0) == 5.0
+    policy.started(5.0)
+    assert policy.exited(30.0) == 30.0  # ran long enough: no delay, count reset
+    for started in (30.0, 31.0, 33.0):
+        policy.started(started)
+        assert policy.exited(started) is not None
+    policy.started(40.0)
+    assert policy.exited(40.0) is None
+
+
+def test_per_process_files_are_refused_with_several_workers(tmp_path: Path) -> None:
+    config = Config(
+        todo_api_base_url="https://api.example.com",
+        vertex_location="us-central1",
+        vertex_project_id="project",
+        google_application_credentials=None,
+        max_context_tokens=1024,
+        rate_limit_per_minute=60,
+        cache_ttl_seconds=10,
+        write_behind_path=str(tmp_path / "writes.db"),
+        replica_path=str(tmp_path / "replica.db"),
+    )
+    with pytest.raises(ValueError, match="WRITE_BEHIND_PATH, REPLICA_PATH"):
+        serve_workers(config, 2, port=0)
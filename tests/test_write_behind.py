@@ -0,0 +1,130 @@
+from pathlib import Path
+
+import responses
+from responses import matchers
+
+from agent.config import Config
+from agent.main import Message, TodoOrchestrator
+from agent.todo_tool import TodoServiceTool
+from agent.write_behind import WriteBehindQueue
+
+BASE_URL = "https://api.example.com"
+
+
+def make_tool() -> TodoServiceTool:
+    return TodoServiceTool(base_url=BASE_URL, rate_limit_per_minute=100)
+
+
+def test_writes_coalesce_survive_restart_and_flush(tmp_path: Path) -> None:
+    path = str(tmp_path / "writes.db")
+    tool = make_tool()
+    queue = WriteBehindQueue(lambda: tool, path)
+    queue.update_todo("1", {"title": "a", "status": "in_progress"})
+    queue.update_todo("1", {"title": "a", "status": "done"})
+    queue.update_todo("2", {"title": "b", "status": "done"})
+    queue.delete_todo("2")
+    dropped = queue.create_todo({"title": "never sent"})
+    queue.delete_todo(dropped["id"])
+    created = queue.create_todo({"title": "draft"})
+    queue.update_todo(created["id"], {"title": "final"})
+    assert queue.pending == 3
+
+    restarted = WriteBehindQueue(lambda: tool, path)
+    assert restarted.pending == 3
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.PUT,
+            f"{BASE_URL}/todos/1",
+            json={"id": "1", "title": "a", "status": "done"},
+            match=[
+                matchers.json_params_matcher({"status": "done"}, strict_match=False)
+            ],
+        )
+        rsps.add(responses.DELETE, f"{BASE_URL}/todos/2", json={"id": "2"})
+        rsps.add(
+            responses.POST,
+            f"{BASE_URL}/todos",
+            json={"id": "7", "title": "final", "status": "open"},
+            match=[
+                matchers.json_params_matcher({"title": "final"}, strict_match=False)
+            ],
+        )
+        restarted.start()
+        restarted.close(drain_seconds=5)
+        assert len(rsps.calls) == 3
+    assert restarted.pending == 0
+    assert WriteBehindQueue(lambda: tool, path).pending == 0
+
+
+def make_agent(tmp_path: Path) -> TodoOrchestrator:
+    config = Config(
+        todo_api_base_url=BASE_URL,
+        vertex_location="us-central1",
+        vertex_project_id="project",
+        google_application_credentials=None,
+        max_context_tokens=1024,
+        rate_limit_per_minute=100,
+        cache_ttl_seconds=0,
+        write_behind_path=str(tmp_path / "writes.db"),
+    )
+    return TodoOrchestrator(config)
+
+
+def test_rejected_write_is_reported_on_the_next_turn(tmp_path: Path) -> None:
+    agent = make_agent(tmp_path)
+    queue = agent.write_behind
+    assert queue is not None
+    with responses.RequestsMock() as rsps:
+        rsps.add(responses.PUT, f"{BASE_URL}/todos/9", status=404)
+        rsps.add(responses.PUT, f"{BASE_URL}/todos/8", status=404)
+        rsps.add(responses.GET, f"{BASE_URL}/todos", json=[])
+        message = Message(
+            role="user", content="update todo id:9 status: done", session_id="alice"
+        )
+        assert agent.handle(message).startswith("Updated todo 9")
+        anonymous = Message(role="user", content="update todo id:8 status: done")
+        assert agent.handle(anonymous).startswith("Updated todo 8")
+        queue.stop(drain_seconds=5)
+
+        listing = Message(role="user", content="list todos")
+        assert "did not go through" not in agent.handle(listing)
+        reply = agent.handle(
+            Message(role="user", content="list todos", session_id="alice")
+        )
+    assert "did not go through: update of todo 9 failed" in reply
+    assert "todo 8" not in reply
+    assert "did not go through" not in agent.handle(
+        Message(role="user", content="hello", session_id="alice")
+    )
+    agent.close()
+
+
+def test_bulk_update_fetches_uncached_items_first(tmp_path: Path) -> None:
+    agent = make_agent(tmp_path)
+    queue = agent.write_behind
+    assert queue is not None
+    queue.stop()  # hold the writes until the API is mocked for them
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.GET,
+            f"{BASE_URL}/todos",
+            json=[{"id": "3", "title": "Keep me", "status": "open"}],
+        )
+        reply = agent.handle(Message(role="user", content="mark 3 and 4 done"))
+        assert len(rsps.calls) == 1
+    assert "todo 4 not found" in reply
+    with responses.RequestsMock() as rsps:
+        rsps.add(
+            responses.PUT,
+            f"{BASE_URL}/todos/3",
+            json={"id": "3", "title": "Keep me", "status": "done"},
+            match=[
+                matchers.json_params_matcher(
+                    {"title": "Keep me", "status": "done"}, strict_match=False
+                )
+            ],
+        )
+        queue.start()
+        queue.stop(drain_seconds=5)
+        assert len(rsps.calls) == 1
+    agent.close()